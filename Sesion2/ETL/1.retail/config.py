@@ -1,38 +1,256 @@
-import socket
-
+# host None: IP de esta maquina, resuelta al crear la primera conexion (etl_utils/db.py)
 DATABASE_CONFIG = {
-    "host": socket.gethostbyname(socket.gethostname()),
+    "host": None,
     "port": 3310,
     "user": "root",
     "password": "<password>",
     "database": "retail_db"
 }
 
+# Esquema de cada archivo: 'dtypes' se aplica al parsear (llaves int32, textos de baja cardinalidad
+# como category, textos casi unicos y codigos postales como string para no perder los ceros a la
+# izquierda, precios en float64 para que el calculo del subtotal no pierda precision) y
+# 'date_columns' indica las columnas de fecha con su formato fijo.
 CSV_FILES = {
     'customers': {
         'path': r'./data/customers',
-        'header': ["customer_id","customer_fname","customer_lname","customer_email","customer_password","customer_street","customer_city","customer_state","customer_zipcode"]
+        'header': ["customer_id","customer_fname","customer_lname","customer_email","customer_password","customer_street","customer_city","customer_state","customer_zipcode"],
+        'dtypes': {
+            'customer_id': 'int32',
+            'customer_email': 'string',
+            'customer_password': 'string',
+            'customer_city': 'category',
+            'customer_state': 'category',
+            'customer_zipcode': 'string'
+        },
+        # Filas por bloque en modo streaming (--streaming)
+        'chunksize': 50000
     },
     'departments': {
         'path': r'./data/departments',
-        'header': ['department_id', 'department_name']
+        'header': ['department_id', 'department_name'],
+        'dtypes': {
+            'department_id': 'int32'
+        }
     },
     'order_items': {
         'path': r'./data/order_items',
-        'header': ["order_item_id","order_item_order_id","order_item_product_id","order_item_quantity","order_item_subtotal","order_item_product_price"]
+        'header': ["order_item_id","order_item_order_id","order_item_product_id","order_item_quantity","order_item_subtotal","order_item_product_price"],
+        'dtypes': {
+            'order_item_id': 'int32',
+            'order_item_order_id': 'int32',
+            'order_item_product_id': 'int32',
+            'order_item_quantity': 'int16',
+            'order_item_subtotal': 'float64',
+            'order_item_product_price': 'float64'
+        },
+        # Filas por bloque en modo streaming (--streaming)
+        'chunksize': 50000
     },
     'orders': {
         'path': r'./data/orders',
-        'header': ["order_id","order_date","order_customer_id","order_status"]
+        'header': ["order_id","order_date","order_customer_id","order_status"],
+        'dtypes': {
+            'order_id': 'int32',
+            'order_customer_id': 'int32',
+            'order_status': 'category'
+        },
+        'date_columns': {
+            'order_date': '%Y-%m-%d %H:%M:%S.%f'
+        },
+        # Filas por bloque en modo streaming (--streaming)
+        'chunksize': 50000
     },
     'products': {
         'path': r'./data/products',
-        'header': ["product_id","product_category_id","product_name","product_description","product_price","product_image"]
+        'header': ["product_id","product_category_id","product_name","product_description","product_price","product_image"],
+        'dtypes': {
+            'product_id': 'int32',
+            'product_category_id': 'int32',
+            'product_price': 'float64'
+        }
     },
     'categories': {
         'path': r'./data/categories',
-        'header': ["category_id", "category_department_id", "category_name"]
+        'header': ["category_id", "category_department_id", "category_name"],
+        'dtypes': {
+            'category_id': 'int32',
+            'category_department_id': 'int32',
+            'category_name': 'category'
+        }
+    },
+}
+
+# Opciones de lectura. engine: motor de pandas.read_csv, 'c' o 'pyarrow' (requiere pyarrow; no aplica
+# al modo --streaming). memory_report: registra la memoria de cada tabla con y sin el esquema (--memory-report).
+# parallel: los archivos de al menos min_bytes se parsean por rangos de bytes en workers procesos
+# (None = CPUs; etl_utils/parallel_csv.py). Con workers 1 siempre se lee en un solo proceso.
+CSV_READ = {
+    'engine': 'c',
+    'memory_report': False,
+    'parallel': {
+        'workers': None,
+        'min_bytes': 64 * 1024 * 1024
+    }
+}
+
+# Dimension de fechas generada por el pipeline (dimDate): un dia por fila, con llave entera AAAAMMDD,
+# desde la primera hasta la ultima order_date de orders. start y end extienden ese rango (None = solo
+# las fechas de orders). orders referencia esta tabla con order_date_key; en cada ejecucion solo se
+# cargan los dias que aun no estan en la tabla.
+DIM_DATE = {
+    'start': None,
+    'end': None
+}
+
+LOG_FILE = 'logs/pipeline.log'
+
+# Configuracion del bulk loader (etl_utils/bulk_loader.py).
+# strategy: 'auto', 'load_data_infile', 'executemany' o 'multi'.
+BULK_LOAD = {
+    'strategy': 'auto',
+    'batch_size': 10000
+}
+
+# Dependencias entre tablas (llaves foraneas): cada tabla se carga cuando
+# terminaron de cargarse las tablas a las que referencia.
+LOAD_DEPENDENCIES = {
+    'departments': [],
+    'categories': ['departments'],
+    'products': ['categories'],
+    'customers': [],
+    'dimDate': [],
+    'orders': ['customers', 'dimDate'],
+    'order_items': ['orders', 'products']
+}
+
+# Modo --fast-load (etl_utils/constraints.py): la carga se hace sin verificar llaves foraneas ni
+# unicas y sin indices secundarios; al terminar se reconstruyen los indices y se verifican estas
+# llaves con una consulta por tabla.
+FAST_LOAD = {
+    'foreign_keys': {
+        'categories': {'category_department_id': ('departments', 'department_id')},
+        'products': {'product_category_id': ('categories', 'category_id')},
+        'orders': {
+            'order_customer_id': ('customers', 'customer_id'),
+            'order_date_key': ('dimDate', 'date_key')
+        },
+        'order_items': {
+            'order_item_order_id': ('orders', 'order_id'),
+            'order_item_product_id': ('products', 'product_id')
+        }
     },
+    'unique_keys': {
+        'departments': 'department_id',
+        'categories': 'category_id',
+        'products': 'product_id',
+        'customers': 'customer_id',
+        'dimDate': 'date_key',
+        'orders': 'order_id',
+        'order_items': 'order_item_id'
+    }
+}
+
+# Numero maximo de tablas cargandose en paralelo (y de conexiones del pool).
+PARALLEL_LOAD = {
+    'max_workers': 2
 }
 
-LOG_FILE = 'logs/pipeline.log'
\ No newline at end of file
+# Carga incremental (--incremental): columna creciente usada como marca de agua en cada tabla.
+# source: 'db' lee la marca de agua de la base de datos destino, 'file' del archivo de estado.
+# Las demas tablas se insertan o actualizan por su llave (etl_utils/upsert.py); solo se envian las
+# filas nuevas o modificadas segun el cache de hashes de upsert_cache_dir. enabled lo activa --incremental.
+INCREMENTAL = {
+    'enabled': False,
+    'tables': {
+        'orders': 'order_id',
+        'order_items': 'order_item_id'
+    },
+    'source': 'db',
+    'state_file': 'state/watermarks.json',
+    'upsert_cache_dir': 'state/upsert'
+}
+
+# Cache de archivos parseados (etl_utils/parse_cache.py). Se desactiva con --no-cache y se
+# vacia con --clear-cache.
+PARSE_CACHE = {
+    'enabled': True,
+    'dir': '.cache/parsed',
+    'max_bytes': 512 * 1024 * 1024
+}
+
+# Cache de etapas (etl_utils/stage_cache.py): el resultado de cada transformacion se reutiliza si no
+# cambiaron sus entradas, su codigo ni su configuracion. Tambien se desactiva con --no-cache y se
+# vacia con --clear-cache.
+# stages: etapas que se memoizan. Calcular la huella de la entrada cuesta tanto como las
+# transformaciones sencillas, por lo que solo vale la pena en las costosas (orders y order_items).
+STAGE_CACHE = {
+    'enabled': True,
+    'dir': '.cache/stages',
+    'max_bytes': 1024 * 1024 * 1024,
+    'stages': {'transform_orders', 'transform_order_items'}
+}
+
+# Metricas por etapa en formato JSON-lines (None las desactiva). Con --profile ETAPA esa etapa se
+# ejecuta bajo cProfile o tracemalloc (--profiler) y el resultado se guarda junto al log.
+METRICS = {
+    'file': 'logs/metrics.jsonl'
+}
+
+# Ejecucion solapada (--pipelined): tablas o bloques transformados que pueden esperar a ser cargados.
+PIPELINED = {
+    'max_queue': 2
+}
+
+# Manifiesto de la ejecucion (etl_utils/manifest.py): tablas y bloques confirmados en la base de
+# datos. Con --resume se omiten y la ejecucion continua desde el ultimo bloque confirmado.
+RESUME = {
+    'manifest_file': 'state/run_manifest.json'
+}
+
+# Tablas de agregados (etl_utils/aggregates.py) calculadas durante la carga a partir de order_items
+# y orders: ventas por dia, departamento, categoria y estado (revenue_table) y ordenes por dia y
+# estado (orders_table), con la particion date_key de dimDate. Con --incremental solo se combinan
+# los dias que recibieron filas nuevas; en otro caso las tablas se reemplazan. state_file guarda las
+# sumas parciales de cada bloque para --resume.
+AGGREGATES = {
+    'enabled': True,
+    'revenue_table': 'agg_daily_revenue',
+    'orders_table': 'agg_daily_orders',
+    'state_file': 'state/aggregates.pkl'
+}
+
+# Reglas de calidad de datos por tabla (etl_utils/quality.py), evaluadas juntas sobre cada DataFrame
+# (o bloque) en la transformacion. severity: 'fail' detiene la ejecucion, 'warn' solo se reporta y
+# 'quarantine' separa las filas en quarantine_dir/<tabla>.csv (y quita sus llaves del indice de
+# llaves, de modo que las filas hijas que las referencian tampoco pasan). sample_size: filas de
+# ejemplo por regla en el log.
+QUALITY = {
+    'quarantine_dir': 'quarantine',
+    'sample_size': 5,
+    'rules': {
+        'departments': [
+            {'rule': 'unique', 'columns': ['department_name'], 'severity': 'fail'}
+        ],
+        'customers': [
+            {'rule': 'not_null', 'columns': ['customer_fname', 'customer_lname', 'customer_email'], 'severity': 'fail'}
+        ],
+        'products': [
+            {'rule': 'foreign_key', 'column': 'product_category_id', 'references': ('categories', 'category_id'), 'severity': 'fail'}
+        ],
+        'orders': [
+            {'rule': 'not_null', 'columns': ['order_date'], 'severity': 'fail'},
+            {'rule': 'foreign_key', 'column': 'order_customer_id', 'references': ('customers', 'customer_id'), 'severity': 'fail'},
+            {'rule': 'foreign_key', 'column': 'order_date_key', 'references': ('dimDate', 'date_key'), 'severity': 'fail'}
+        ],
+        'order_items': [
+            {'rule': 'foreign_key', 'column': 'order_item_order_id', 'references': ('orders', 'order_id'), 'severity': 'fail'},
+            {'rule': 'foreign_key', 'column': 'order_item_product_id', 'references': ('products', 'product_id'), 'severity': 'fail'},
+            {'rule': 'range', 'column': 'order_item_quantity', 'min': 1, 'severity': 'warn'},
+            # El subtotal se recalcula en transform_order_items; la regla solo reporta cuantos no coinciden
+            {'name': 'subtotal', 'rule': 'expression',
+             'expression': 'abs(order_item_subtotal - order_item_quantity * order_item_product_price) < 0.005',
+             'severity': 'warn'}
+        ]
+    }
+}
@@ -1,8 +1,26 @@
-from config import DATABASE_CONFIG, CSV_FILES, LOG_FILE
-from sqlalchemy import create_engine
+from config import DATABASE_CONFIG, CSV_FILES, LOG_FILE, BULK_LOAD, LOAD_DEPENDENCIES, PARALLEL_LOAD, INCREMENTAL, PARSE_CACHE, CSV_READ, METRICS, PIPELINED, FAST_LOAD, RESUME, DIM_DATE, AGGREGATES, QUALITY, STAGE_CACHE
+from contextlib import nullcontext
+import numpy as np
 import pandas as pd
+import argparse
 import logging
+import os
 import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from etl_utils.aggregates import AggregateBuilder, merge_partitions
+from etl_utils.errors import PipelineError
+from etl_utils.db import LazyEngine, database_url, get_engine
+from etl_utils.dates import parse_unique_dates, date_keys, build_dim_date
+from etl_utils import metrics, quality, stage_cache
+from etl_utils.parse_cache import read_with_cache, clear_cache
+from etl_utils.parallel_csv import read_csv_parallel
+from etl_utils.scheduler import run_dependency_graph
+from etl_utils.key_index import KeyIndexRegistry
+from etl_utils.manifest import RunManifest, delete_unrecorded
+from etl_utils.pipelined import run_pipelined
+from etl_utils.watermark import get_watermark, save_watermark, filter_new_rows, max_value, reset_tables, read_loaded_keys, filter_loaded_keys
 
 logging.basicConfig(
     filename=LOG_FILE,
@@ -12,96 +30,230 @@ logging.basicConfig(
 
 def create_db_engine(config):
     """
-    This method provides the connection to the mysql Data Base.
+    This method provides the connection to the mysql Data Base. Sin 'host' en la configuracion se
+    usa la IP de esta maquina, que se resuelve aqui y no al importar config.py.
     
     return MySQL connection object
     """
+    logging.info("Iniciando conexion a la base de datos de MySQL")
     try:
-        engine = create_engine(f"mysql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}")
+        # 'url' permite apuntar a otra base de datos (ej. sqlite:///retail.db) para pruebas locales
+        if config.get('url'):
+            engine = get_engine(config['url'])
+        else:
+            # local_infile habilita la estrategia LOAD DATA LOCAL INFILE del bulk loader
+            # El pool se acota al numero de tablas que se cargan en paralelo
+            engine = get_engine(database_url(config), connect_args={'local_infile': 1},
+                                pool_size=PARALLEL_LOAD['max_workers'], max_overflow=0)
         logging.info("Conexion a base de datos fue exitosa")
         return engine
     except Exception as e:
-        logging.error(f'Error al conectar a la base de datos: {e}')
-        sys.exit(1)
+        raise PipelineError(f'Error al conectar a la base de datos: {e}') from e
         
 
-def read_csv(file_path, columns):
+def csv_options(columns, dtypes=None, date_columns=None):
+    """
+    Construye los parametros de pd.read_csv para un archivo sin encabezado separado por '|',
+    aplicando el esquema (dtypes y columnas de fecha con formato fijo) al momento de parsear.
+    
+    return dict con los parametros de pd.read_csv
+    """
+    options = {'header': None, 'sep': '|', 'names': columns}
+    if dtypes:
+        options['dtype'] = dict(dtypes)
+    if date_columns:
+        # Las fechas se leen como categorias y parse_date_columns convierte solo los valores distintos
+        options.setdefault('dtype', {}).update({column: 'category' for column in date_columns})
+    return options
+
+def parse_date_columns(df, date_columns=None):
+    """
+    Convierte las columnas de fecha leidas por csv_options con su formato fijo, parseando una sola
+    vez cada fecha distinta.
+    
+    return DataFrame Object
+    """
+    for column, date_format in (date_columns or {}).items():
+        df[column] = parse_unique_dates(df[column], date_format)
+    return df
+
+def csv_engine():
+    """
+    Devuelve el motor de pd.read_csv configurado en CSV_READ; si es pyarrow y no esta instalado usa 'c'.
+    """
+    if CSV_READ['engine'] == 'pyarrow':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logging.warning("pyarrow no esta instalado, se usa el motor 'c' de pandas")
+            return 'c'
+    return CSV_READ['engine']
+
+def memory_footprint(df):
+    """
+    Memoria ocupada por el DataFrame en MB, incluyendo el contenido de los textos.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+@metrics.track_stage
+def read_csv(file_path, columns, dtypes=None, date_columns=None):
     """
-    Lee un archivo CSV y devuelve un DataFrame
+    Lee un archivo CSV y devuelve un DataFrame. Si se indican dtypes y date_columns el esquema se
+    aplica al parsear. Los archivos grandes se parsean en paralelo por rangos de bytes (CSV_READ['parallel']).
     
     return DataFrame Object
     """
     try:
-        df = pd.read_csv(file_path, header=None, sep='|', names=columns)
-        logging.info(f"Archivo {file_path} leido correctamente")
+        options = csv_options(columns, dtypes, date_columns)
+        options['engine'] = csv_engine()
+        parallel = CSV_READ['parallel']
+        parse = lambda: parse_date_columns(read_csv_parallel(file_path, options, parallel['workers'], parallel['min_bytes']), date_columns)
+        df = read_with_cache(file_path, parse,
+                             {'columns': columns, 'sep': '|', 'dtypes': dtypes, 'date_columns': date_columns}, PARSE_CACHE)
+        logging.info(f"Archivo {file_path} leido correctamente ({memory_footprint(df):.2f} MB en memoria)")
         return df    
     except Exception as e:
-        logging.error(f'Error al leer el archivo {file_path}: {e}')
-        sys.exit(1)
+        raise PipelineError(f'Error al leer el archivo {file_path}: {e}') from e
 
-def validate_ids(df_retail, df, id_retail, id_df):
+def read_csv_chunks(file_path, columns, chunksize, dtypes=None, date_columns=None):
+    """
+    Lee un archivo CSV por bloques de chunksize filas, sin cargarlo completo en memoria.
+    
+    return Iterador de DataFrames
+    """
     try:
-        valid_ids = set(df[id_df])
-        
-        if not df_retail[id_retail].isin(valid_ids).all():
-            logging.info(f"El id {id_retail} no existen en el campo {id_df} de la tabla a validad")
-            sys.exit(1)
+        with pd.read_csv(file_path, chunksize=chunksize, **csv_options(columns, dtypes, date_columns)) as reader:
+            for chunk in reader:
+                yield parse_date_columns(chunk, date_columns)
+        logging.info(f"Archivo {file_path} leido correctamente por bloques de {chunksize} filas")
     except Exception as e:
-        logging.error(f"Error a la hora de realizar las validaciones de id: {e}")
-        sys.exit(1)
-        
+        raise PipelineError(f'Error al leer el archivo {file_path}: {e}') from e
+
+def dim_date_range():
+    """
+    Rango de dimDate: desde la primera hasta la ultima order_date de orders (solo se lee esa
+    columna), extendido a DIM_DATE['start'] y DIM_DATE['end'] si estan configurados.
+    
+    return tupla (inicio, fin) de pd.Timestamp
+    """
+    dates = read_columns('orders', ['order_date'])['order_date']
+    starts = [pd.Timestamp(value) for value in (DIM_DATE['start'], dates.min()) if pd.notna(value)]
+    ends = [pd.Timestamp(value) for value in (DIM_DATE['end'], dates.max()) if pd.notna(value)]
+    if not starts or not ends:
+        raise PipelineError("No se puede generar dimDate: orders no tiene fechas validas y DIM_DATE no define el rango")
+    return min(starts).normalize(), max(ends).normalize()
+
+@metrics.track_stage
+def generate_dim_date():
+    """
+    Genera la dimension de fechas dimDate con un dia por fila en el rango de dim_date_range.
+    
+    return DataFrame Object
+    """
+    start, end = dim_date_range()
+    df = build_dim_date(start, end)
+    logging.info(f"Dimension dimDate generada: {len(df)} dias entre {start:%Y-%m-%d} y {end:%Y-%m-%d}")
+    return df
+
+# Tablas que genera el pipeline en lugar de leerse de un archivo
+GENERATED_TABLES = {
+    'dimDate': generate_dim_date,
+}
+
+def read_table(table_name):
+    """
+    Lee el archivo de una tabla aplicando el esquema definido en CSV_FILES, o genera la tabla si
+    esta en GENERATED_TABLES. Con CSV_READ['memory_report'] tambien parsea el archivo sin esquema
+    para registrar la reduccion de memoria.
+    
+    return DataFrame Object
+    """
+    if table_name in GENERATED_TABLES:
+        return GENERATED_TABLES[table_name]()
+    config = CSV_FILES[table_name]
+    df = read_csv(config['path'], config['header'], config.get('dtypes'), config.get('date_columns'))
+    if CSV_READ['memory_report']:
+        untyped = pd.read_csv(config['path'], **csv_options(config['header']))
+        logging.info(f"Memoria de la tabla {table_name}: {memory_footprint(untyped):.2f} MB sin esquema, "
+                     f"{memory_footprint(df):.2f} MB con esquema")
+    return df
+
+def check_quality(table_name, df, key_indexes=None):
+    """
+    Evalua juntas las reglas de calidad de QUALITY para la tabla (o bloque) y registra todas las
+    violaciones con su conteo y filas de ejemplo. Las filas en cuarentena se quitan del DataFrame y,
+    si la tabla es padre, sus llaves se quitan del indice de llaves. Si alguna regla con severidad
+    'fail' no se cumple detiene la ejecucion.
+    
+    return DataFrame sin las filas en cuarentena
+    """
+    rules = QUALITY['rules'].get(table_name)
+    if not rules:
+        return df
+    try:
+        df, report = quality.check(df, table_name, rules, key_indexes, QUALITY['quarantine_dir'], QUALITY['sample_size'])
+    except quality.DataQualityError as e:
+        raise PipelineError(f"Validacion de calidad de datos fallida: {e}") from e
+    except Exception as e:
+        raise PipelineError(f"Error a la hora de validar la calidad de datos de la tabla {table_name}: {e}") from e
+    
+    if len(report['quarantined']) and key_indexes is not None and table_name in PARENT_TABLES:
+        key_column = KEY_COLUMNS[table_name]
+        key_indexes.discard(table_name, key_column, report['quarantined'][key_column].to_numpy())
+    return df
 
-def transform_departments(df):
+@metrics.track_stage
+def transform_departments(df, key_indexes=None):
     """
     Realiza transformaciones en el dataframe departments
     """
     try:
-        if df['department_name'].duplicated().any():
-            logging.warning("Hay departamentos duplicados en el Dataframe")
-            sys.exit(1)
-        else:
-            return df
+        # Validacion de departamentos duplicados
+        return check_quality('departments', df, key_indexes)
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f"Error a la hora de realizar las transformaciones al dataframe departments: {e}")
+        raise PipelineError(f"Error a la hora de realizar las transformaciones al dataframe departments: {e}") from e
 
-def transform_customers(df):
+@metrics.track_stage
+def transform_customers(df, key_indexes=None):
     """
     Realiza transformaciones en el dataframe customers
     """
     try:
         # Validacion de Campos Obligatorios
-        if df[['customer_fname','customer_lname','customer_email']].isnull().any().any():
-            logging.warning("Datos Faltantes en el Dataframe")
-            sys.exit(1)
+        df = check_quality('customers', df, key_indexes)
         # Transformacion de campo customer_email
         df['customer_email'] =df['customer_email'].str.lower()
         
         return df
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f"Error a la hora de realizar las transformaciones al dataframe customers: {e}")
+        raise PipelineError(f"Error a la hora de realizar las transformaciones al dataframe customers: {e}") from e
 
-def transform_products(df, df_categories):
+@metrics.track_stage
+def transform_products(df, key_indexes):
     """
     Realiza transformaciones en el dataframe products
     """
     try:
         # Asegurar que product_category_id exista en categories
-        validate_ids(df,df_categories,'product_category_id','category_id')
-                
-        return df
+        return check_quality('products', df, key_indexes)
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f"Error a la hora de realizar las transformaciones al dataframe products: {e}")
+        raise PipelineError(f"Error a la hora de realizar las transformaciones al dataframe products: {e}") from e
 
-def transform_order_items(df, df_products, df_orders):
+@metrics.track_stage
+def transform_order_items(df, key_indexes):
     """
     Realiza transformaciones en el dataframe order_items
     """
     try:
-        # Asegurar que order_item_order_id exista en orders
-        validate_ids(df,df_orders,'order_item_order_id','order_id')
-        
-        # Asegurar que order_item_product_id exista en product
-        validate_ids(df,df_products,'order_item_product_id','product_id')
+        # Asegurar que order_item_order_id exista en orders y order_item_product_id exista en product,
+        # y reportar las cantidades y subtotales invalidos
+        df = check_quality('order_items', df, key_indexes)
         
         # Asegurar que el subtotal si sea la multiplicacion de la cantidad por su precio unitario.
         
@@ -110,72 +262,615 @@ def transform_order_items(df, df_products, df_orders):
             df['order_item_subtotal'] = calculate_subtotal
         
         return df
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f"Error a la hora de realizar las transformaciones al dataframe order_items: {e}")
+        raise PipelineError(f"Error a la hora de realizar las transformaciones al dataframe order_items: {e}") from e
 
-def transform_orders(df, df_customers):
+@metrics.track_stage
+def transform_orders(df, key_indexes):
     """
     Realiza transformaciones específicas en el DataFrame de orders.
     """
     try:
-        # Convertir order_date a datetime
-        df['order_date'] = pd.to_datetime(df['order_date'], errors='coerce')
-
-        if df['order_date'].isnull().any():
-            logging.error("Hay valores inválidos en order_date.")
-            sys.exit(1)
-        # Asegurar que order_customer_id exista en customers
-        validate_ids(df, df_customers, 'order_customer_id',  'customer_id' )
+        # Convertir order_date a datetime (ya lo es si se leyo con el esquema de CSV_FILES); solo se
+        # parsean las fechas distintas, con el formato fijo de la entrada
+        if not pd.api.types.is_datetime64_any_dtype(df['order_date']):
+            df['order_date'] = parse_unique_dates(df['order_date'], CSV_FILES['orders']['date_columns']['order_date'])
 
-        return df
+        # Llave entera (AAAAMMDD) de la fecha en dimDate (0 para fechas invalidas)
+        df['order_date_key'] = date_keys(df['order_date'])
+        # Asegurar que order_date sea valida, que order_customer_id exista en customers y la fecha en dimDate
+        return check_quality('orders', df, key_indexes)
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f"Error a la hora de realizar las transformaciones al dataframe orders: {e}")
+        raise PipelineError(f"Error a la hora de realizar las transformaciones al dataframe orders: {e}") from e
 
+@metrics.track_stage
 def load_data(engine, table_name, df):
     """
-    Realiza la carga de los datos transformados a la base de datos de MySQL
+    Realiza la carga de los datos transformados a la base de datos de MySQL. En modo incremental
+    las tablas sin marca de agua se insertan o actualizan por su llave en lugar de agregarse, de
+    modo que la carga se puede repetir sin duplicar filas.
     """
+    # El bulk loader y el upsert (y SQLAlchemy) se importan con la primera carga
+    from etl_utils.bulk_loader import bulk_load
+    from etl_utils.upsert import upsert
     try:
-        df.to_sql(name = table_name, con = engine, if_exists = 'append', index = False)
+        if upserted(table_name):
+            upsert(engine, table_name, df, KEY_COLUMNS[table_name], INCREMENTAL['upsert_cache_dir'],
+                   strategy=BULK_LOAD['strategy'], batch_size=BULK_LOAD['batch_size'])
+        else:
+            bulk_load(engine, table_name, df, strategy=BULK_LOAD['strategy'], batch_size=BULK_LOAD['batch_size'])
         logging.info(f"Se cargo correctamente la informacion a la tabla {table_name}")
     except Exception as e:
-        logging.error(f"Error a la hora de cargar datos a la tabla {table_name}: {e}")
-        sys.exit(1)
+        raise PipelineError(f"Error a la hora de cargar datos a la tabla {table_name}: {e}") from e
 
-if __name__ == '__main__':
+def upserted(table_name):
+    """
+    Indica si la tabla se inserta o actualiza por llave (modo incremental, tablas sin marca de
+    agua) en lugar de agregarse.
+    """
+    return INCREMENTAL['enabled'] and table_name not in INCREMENTAL['tables'] and table_name not in GENERATED_TABLES
+
+def get_watermarks(engine, full_refresh):
+    """
+    Obtiene la marca de agua de cada tabla incremental. Con full_refresh se vacian todas las tablas
+    que se recargan (primero las de agregados, que referencian a dimDate, y luego las hijas antes que
+    las padre, en una sola transaccion), se descartan las sumas parciales de los agregados y se
+    cargan todas las filas nuevamente; si alguna no se puede vaciar se detiene la ejecucion.
     
-    logging.info("Iniciando ejecucion de Pipeline")
-    # Crear la conexion a la base de datos MySQL
-    logging.info("Iniciando conexion a la base de datos de MySQL")
-    engine = create_db_engine(DATABASE_CONFIG)
+    return dict tabla -> marca de agua (None si se deben cargar todas las filas)
+    """
+    from etl_utils.upsert import clear_hash_cache
     
-    # Cargar y validar todos los archivos de su respectivo CSV.
-    logging.info("Iniciando lectura y validacion de archivos CSV")
-    load_order = ['departments', 'categories', 'customers', 'products', 'orders', 'order_items']
-    dataframes = {}
+    tables = list(INCREMENTAL['tables'])
+    if full_refresh:
+        logging.info("Recarga completa: se vacian todas las tablas")
+        try:
+            reset_tables(engine, [AGGREGATES['revenue_table'], AGGREGATES['orders_table']] + list(reversed(TRANSFORM_ORDER)),
+                         INCREMENTAL['state_file'])
+        except Exception as e:
+            raise PipelineError(f"No se pudieron vaciar las tablas para la recarga completa: {e}") from e
+        AggregateBuilder(AGGREGATES['state_file']).clear()
+        for table_name in TRANSFORM_ORDER:
+            clear_hash_cache(INCREMENTAL['upsert_cache_dir'], table_name)
+        return {table: None for table in tables}
+    return {table: get_watermark(engine, table, INCREMENTAL['tables'][table], INCREMENTAL['state_file'], INCREMENTAL['source'])
+            for table in tables}
+
+def filter_incremental(table_name, df, watermarks):
+    """
+    Descarta las filas que ya se cargaron en ejecuciones anteriores (modo incremental).
+    """
+    if table_name not in watermarks:
+        return df
+    new_df = filter_new_rows(df, INCREMENTAL['tables'][table_name], watermarks[table_name])
+    logging.info(f"Tabla {table_name}: {len(new_df)} de {len(df)} filas son nuevas")
+    return new_df
+
+def save_table_watermark(table_name, df):
+    """
+    Guarda la marca de agua de una tabla incremental despues de cargarla.
+    """
+    if table_name in INCREMENTAL['tables'] and not df.empty:
+        column = INCREMENTAL['tables'][table_name]
+        save_watermark(INCREMENTAL['state_file'], table_name, column, max_value(df, column))
+
+def missing_rows(engine, table_name, df):
+    """
+    Descarta las filas cuya llave ya esta en la tabla destino.
+    
+    return DataFrame con las filas que faltan
+    """
+    key_column = KEY_COLUMNS[table_name]
+    try:
+        loaded = read_loaded_keys(engine.get(), table_name, key_column)
+    except Exception as e:
+        raise PipelineError(f"Error al leer las llaves cargadas de la tabla {table_name}: {e}") from e
+    new_df = filter_loaded_keys(df, key_column, loaded)
+    logging.info(f"Tabla {table_name}: {len(new_df)} de {len(df)} filas no estaban cargadas")
+    return new_df
+
+def clean_unrecorded_rows(engine, table_name, df, manifest):
+    """
+    Al reanudar, elimina las filas del bloque que pudieron quedar cargadas sin registrarse en el
+    manifiesto. Las tablas que se cargan por llave (upsert y tablas generadas) no lo necesitan.
+    """
+    if upserted(table_name) or table_name in GENERATED_TABLES:
+        return
+    key_column = KEY_COLUMNS[table_name]
+    try:
+        delete_unrecorded(engine.get(), manifest, table_name, key_column, df[key_column].to_numpy())
+    except Exception as e:
+        raise PipelineError(f"Error al eliminar las filas sin registrar de la tabla {table_name}: {e}") from e
+
+def load_table(engine, table_name, df, manifest, aggregates, chunk=0):
+    """
+    Carga el dataframe (o un bloque de la tabla) en la tabla, actualiza su marca de agua, guarda
+    las sumas parciales de los agregados del bloque y lo registra en el manifiesto de la ejecucion.
+    Al reanudar, antes del primer bloque pendiente se eliminan las filas que pudieron quedar
+    cargadas sin registrarse. Las tablas generadas (dimDate) se generan completas en cada
+    ejecucion, por lo que solo se cargan las llaves que faltan.
+    """
+    key_column = KEY_COLUMNS[table_name]
+    if manifest.needs_cleanup(table_name):
+        clean_unrecorded_rows(engine, table_name, df, manifest)
+    if table_name in GENERATED_TABLES:
+        df = missing_rows(engine, table_name, df)
+    load_data(engine.get(), table_name, df)
+    save_table_watermark(table_name, df)
+    add_partial_aggregates(aggregates, table_name, df, chunk)
+    if len(df):
+        manifest.record_chunk(table_name, chunk, len(df), df[key_column].min(), df[key_column].max())
+    else:
+        manifest.record_chunk(table_name, chunk, 0)
+
+def load_complete_table(engine, table_name, df, manifest, aggregates):
+    """
+    Carga una tabla completa como un solo bloque y la registra como terminada en el manifiesto.
+    """
+    load_table(engine, table_name, df, manifest, aggregates)
+    manifest.complete_table(table_name)
+
+def read_columns(table_name, columns):
+    """
+    Lee solo algunas columnas del archivo de una tabla, aplicando el esquema de CSV_FILES; se usa
+    para construir el indice de llaves y el lookup de agregados de una tabla padre que ya se cargo
+    en la ejecucion reanudada.
+    
+    return DataFrame Object
+    """
+    if table_name in GENERATED_TABLES:
+        return GENERATED_TABLES[table_name]()[columns]
+    config = CSV_FILES[table_name]
+    dtypes = {column: dtype for column, dtype in config.get('dtypes', {}).items() if column in columns}
+    date_columns = {column: fmt for column, fmt in config.get('date_columns', {}).items() if column in columns}
+    try:
+        df = pd.read_csv(config['path'], usecols=columns, **csv_options(config['header'], dtypes, date_columns))
+        return parse_date_columns(df, date_columns)
+    except Exception as e:
+        raise PipelineError(f"Error al leer las columnas {columns} del archivo {config['path']}: {e}") from e
+
+def read_keys(table_name):
+    """
+    Lee solo la columna de llave primaria del archivo de una tabla.
+    
+    return Series con las llaves
+    """
+    column = KEY_COLUMNS[table_name]
+    return read_columns(table_name, [column])[column]
+
+@metrics.track_stage
+def aggregate_order_items(df, aggregates):
+    """
+    Suma parcial de ventas, unidades y lineas de order_items por dia, departamento, categoria y
+    estado de la orden. La fecha y el estado se toman de orders, y la categoria y el departamento de
+    products y categories, con los lookups de AggregateBuilder.
     
-    df_categories = read_csv(CSV_FILES['categories']['path'],CSV_FILES['categories']['header'])
-    dataframes['categories'] = df_categories
+    return DataFrame Object
+    """
+    category_id = aggregates.lookup('products', 'product_category_id', df['order_item_product_id'])
+    order_ids = df['order_item_order_id']
+    partial = pd.DataFrame({
+        'date_key': aggregates.lookup('orders', 'date_key', order_ids),
+        'department_id': aggregates.lookup('categories', 'category_department_id', category_id),
+        'category_id': category_id,
+        'order_status': aggregates.lookup('orders', 'order_status', order_ids),
+        'revenue': df['order_item_subtotal'].to_numpy(),
+        'quantity': df['order_item_quantity'].to_numpy().astype('int64'),
+        'items': 1,
+    })
+    return partial.groupby(REVENUE_KEYS, as_index=False, observed=True)[REVENUE_MEASURES].sum()
+
+@metrics.track_stage
+def aggregate_orders(df):
+    """
+    Suma parcial de ordenes por dia y estado.
     
-    df_customers = read_csv(CSV_FILES['customers']['path'],CSV_FILES['customers']['header'])
-    dataframes['customers'] = transform_customers(df_customers)
+    return DataFrame Object
+    """
+    return (df.groupby(['order_date_key', 'order_status'], observed=True).size()
+              .reset_index(name='orders').rename(columns={'order_date_key': 'date_key'}))
+
+def lookup_frame(table_name, df):
+    """
+    Columnas de una tabla padre (o de un bloque) que necesitan los agregados; de orders se guarda
+    la llave de fecha en lugar de la fecha.
     
-    df_departments = read_csv(CSV_FILES['departments']['path'],CSV_FILES['departments']['header'])
-    dataframes['departments'] = transform_departments(df_departments)
+    return DataFrame Object
+    """
+    df = df[LOOKUP_COLUMNS[table_name]]
+    if table_name == 'orders':
+        # Las fechas invalidas detienen la ejecucion en transform_orders
+        df = df[df['order_date'].notna()]
+        df = pd.DataFrame({'order_id': df['order_id'], 'date_key': date_keys(df['order_date']),
+                           'order_status': df['order_status']})
+    return df
+
+def register_lookup(aggregates, table_name, df):
+    """
+    Registra el lookup de una tabla padre en aggregates (df puede ser una lista de bloques de
+    lookup_frame). Las tablas sin columnas en LOOKUP_COLUMNS se ignoran.
+    """
+    if aggregates is None or table_name not in LOOKUP_COLUMNS:
+        return
+    if isinstance(df, list):
+        df = pd.concat(df, ignore_index=True) if df else lookup_frame(table_name, read_columns(table_name, LOOKUP_COLUMNS[table_name]))
+    else:
+        df = lookup_frame(table_name, df)
+    aggregates.register_lookup(table_name, KEY_COLUMNS[table_name], df)
+
+def add_partial_aggregates(aggregates, table_name, df, chunk):
+    """
+    Guarda las sumas parciales de un bloque de orders u order_items.
+    """
+    if aggregates is None or df.empty:
+        return
+    try:
+        if table_name == 'order_items':
+            aggregates.add(AGGREGATES['revenue_table'], chunk, aggregate_order_items(df, aggregates))
+        elif table_name == 'orders':
+            aggregates.add(AGGREGATES['orders_table'], chunk, aggregate_orders(df))
+    except Exception as e:
+        raise PipelineError(f"Error a la hora de calcular los agregados de la tabla {table_name}: {e}") from e
+
+@metrics.track_stage
+def write_aggregates(engine, aggregates, manifest, incremental):
+    """
+    Escribe las tablas de agregados en una sola transaccion: con incremental solo se combinan los
+    dias que recibieron filas nuevas; si no, las tablas se reemplazan.
+    """
+    if aggregates is None or manifest.table_completed('aggregates'):
+        return
+    try:
+        with engine.get().begin() as conn:
+            for table_name, keys, measures in [(AGGREGATES['revenue_table'], REVENUE_KEYS, REVENUE_MEASURES),
+                                               (AGGREGATES['orders_table'], ORDER_KEYS, ORDER_MEASURES)]:
+                df = aggregates.result(table_name, keys, measures)
+                if df is not None:
+                    merge_partitions(conn, table_name, df, 'date_key', keys, measures, replace=not incremental,
+                                     batch_size=BULK_LOAD['batch_size'])
+    except Exception as e:
+        raise PipelineError(f"Error a la hora de escribir las tablas de agregados: {e}") from e
+    manifest.complete_table('aggregates')
+    aggregates.clear()
+
+def passthrough(df, key_indexes=None):
+    """
+    Transformacion de las tablas que se cargan sin cambios
+    """
+    return df
+
+# Funcion de transformacion de cada tabla; recibe el DataFrame (o bloque) y el registro de indices
+# de llaves
+TRANSFORMS = {
+    'departments': transform_departments,
+    'dimDate': passthrough,
+    'categories': passthrough,
+    'customers': transform_customers,
+    'products': transform_products,
+    'orders': transform_orders,
+    'order_items': transform_order_items,
+}
+
+# Tablas sin transformacion, que no pasan por el cache de etapas
+PASSTHROUGH_TABLES = {'dimDate', 'categories'}
+
+# Llave primaria de cada tabla, usada para construir los indices de llaves
+KEY_COLUMNS = {
+    'departments': 'department_id',
+    'categories': 'category_id',
+    'customers': 'customer_id',
+    'dimDate': 'date_key',
+    'products': 'product_id',
+    'orders': 'order_id',
+    'order_items': 'order_item_id',
+}
+
+# Orden de lectura en memoria (las tablas padre antes que las hijas) y tablas padre cuyas llaves se
+# indexan para validar las llaves foraneas de sus hijas
+TRANSFORM_ORDER = ['departments', 'categories', 'customers', 'dimDate', 'products', 'orders', 'order_items']
+PARENT_TABLES = {'categories', 'customers', 'dimDate', 'products', 'orders'}
+
+# Columnas de las tablas padre que necesitan los agregados de order_items, y grupos y medidas de
+# cada tabla de agregados
+LOOKUP_COLUMNS = {
+    'categories': ['category_id', 'category_department_id'],
+    'products': ['product_id', 'product_category_id'],
+    'orders': ['order_id', 'order_date', 'order_status'],
+}
+REVENUE_KEYS = ['date_key', 'department_id', 'category_id', 'order_status']
+REVENUE_MEASURES = ['revenue', 'quantity', 'items']
+ORDER_KEYS = ['date_key', 'order_status']
+ORDER_MEASURES = ['orders']
+
+def load_table_streaming(engine, table_name, key_indexes, watermarks, manifest, aggregates, pipelined=False):
+    """
+    Lee, transforma y carga una tabla bloque por bloque: cada bloque se escribe en la base de datos
+    antes de leer el siguiente (con pipelined, el bloque siguiente se lee y transforma mientras se
+    carga el actual). Las tablas sin 'chunksize' en CSV_FILES se leen en un solo bloque.
+    Si es una tabla padre, al terminar registra en key_indexes el indice de su llave primaria, que
+    es lo unico que necesitan las tablas hijas para validar sus llaves foraneas; de las demas tablas
+    no se guardan llaves, para que la memoria no crezca con el tamano del archivo. El indice incluye
+    las filas ya cargadas en ejecuciones anteriores (modo incremental), igual que el lookup de
+    agregados de la tabla. Al reanudar se omiten la tabla, si ya estaba terminada, o los bloques ya
+    confirmados en el manifiesto.
+    """
+    key_column = KEY_COLUMNS[table_name]
+    is_parent = table_name in PARENT_TABLES
+    if manifest.table_completed(table_name):
+        if is_parent:
+            key_indexes.register(table_name, key_column, read_keys(table_name))
+        register_lookup(aggregates, table_name, [])
+        logging.info(f"Tabla {table_name} ya cargada en la ejecucion reanudada; se omite")
+        return
+    
+    config = CSV_FILES.get(table_name, {})
+    if config.get('chunksize'):
+        chunks = read_csv_chunks(config['path'], config['header'], config['chunksize'],
+                                 config.get('dtypes'), config.get('date_columns'))
+    else:
+        chunks = [read_table(table_name)]
+
+    keys = []
+    lookups = []
+    rows = []
+
+    def transformed_chunks():
+        for i, chunk in enumerate(chunks):
+            if is_parent:
+                keys.append(chunk[key_column].to_numpy())
+            if aggregates is not None and table_name in LOOKUP_COLUMNS:
+                lookups.append(lookup_frame(table_name, chunk))
+            if manifest.chunk_completed(table_name, i):
+                continue
+            chunk = filter_incremental(table_name, chunk, watermarks)
+            if chunk.empty:
+                continue
+            yield i, TRANSFORMS[table_name](chunk, key_indexes)
+
+    def load_chunk(item):
+        i, chunk = item
+        load_table(engine, table_name, chunk, manifest, aggregates, i)
+        rows.append(len(chunk))
+
+    if pipelined:
+        run_pipelined(transformed_chunks(), load_chunk, PIPELINED['max_queue'], table_name)
+    else:
+        for chunk in transformed_chunks():
+            load_chunk(chunk)
+
+    if is_parent:
+        key_indexes.register(table_name, key_column, np.concatenate(keys))
+    register_lookup(aggregates, table_name, lookups)
+    manifest.complete_table(table_name)
+    logging.info(f"Tabla {table_name} procesada en modo streaming: {sum(rows)} filas")
+
+def run_streaming(engine, watermarks, manifest, aggregates, pipelined=False):
+    """
+    Ejecuta el pipeline en modo streaming: la memoria queda acotada por el tamano de bloque y por
+    los indices de llaves, sin importar el tamano de los archivos.
+    """
+    logging.info("Iniciando lectura, validacion y carga por bloques")
+    key_indexes = KeyIndexRegistry()
+    tasks = {table: (lambda table=table: load_table_streaming(engine, table, key_indexes, watermarks, manifest, aggregates, pipelined)) for table in LOAD_DEPENDENCIES}
+    run_dependency_graph(tasks, LOAD_DEPENDENCIES, max_workers=PARALLEL_LOAD['max_workers'])
+    logging.info("Terminada la lectura, validacion y carga por bloques")
+
+def transform_tables(watermarks, key_indexes, manifest, aggregates):
+    """
+    Lee, valida y transforma cada archivo CSV en orden de dependencias (las tablas padre antes que
+    las hijas), registrando en key_indexes los indices de llaves de las tablas padre y en aggregates
+    sus lookups. Las tablas terminadas en la ejecucion reanudada no se leen ni se devuelven; de las
+    tablas padre solo se leen la columna de llave y las columnas de LOOKUP_COLUMNS. Sin manifest
+    (--validate-only) se leen todas las tablas.
     
-    df_orders = read_csv(CSV_FILES['orders']['path'],CSV_FILES['orders']['header'])
-    dataframes['orders'] = transform_orders(df_orders, df_customers)
+    return Iterador de tuplas (tabla, DataFrame)
+    """
+    for table_name in TRANSFORM_ORDER:
+        key_column = KEY_COLUMNS[table_name]
+        if manifest is not None and manifest.table_completed(table_name):
+            logging.info(f"Tabla {table_name} ya cargada en la ejecucion reanudada; se omite")
+            if table_name in PARENT_TABLES:
+                key_indexes.register(table_name, key_column, read_keys(table_name))
+                register_lookup(aggregates, table_name, [])
+            continue
+        
+        df = read_table(table_name)
+        if table_name in PARENT_TABLES:
+            key_indexes.register(table_name, key_column, df[key_column])
+            register_lookup(aggregates, table_name, df)
+        yield table_name, transform_table(table_name, filter_incremental(table_name, df, watermarks), key_indexes)
+
+def transform_table(table_name, df, key_indexes):
+    """
+    Transforma una tabla completa, o devuelve el resultado guardado en el cache de etapas si no
+    cambiaron el DataFrame de entrada, los indices de llaves que validan sus llaves foraneas, el
+    codigo de la transformacion ni su esquema y reglas de calidad. Como en un acierto no se evaluan
+    las reglas, las llaves de las filas en cuarentena se quitan del indice comparando la entrada
+    con el resultado.
     
-    df_products = read_csv(CSV_FILES['products']['path'],CSV_FILES['products']['header'])
-    dataframes['products'] = transform_products(df_products, df_categories)
+    return DataFrame Object
+    """
+    if table_name in PASSTHROUGH_TABLES:
+        return TRANSFORMS[table_name](df, key_indexes)
+    transform = TRANSFORMS[table_name]
+    rules = QUALITY['rules'].get(table_name, [])
+    parents = [rule['references'] for rule in rules if rule['rule'] == 'foreign_key']
+    result = stage_cache.memoize(
+        f"transform_{table_name}",
+        lambda: transform(df, key_indexes),
+        {'df': df, 'parent_keys': [key_indexes.get(*parent).keys for parent in parents]},
+        [transform, check_quality, quality, parse_unique_dates, date_keys],
+        {'csv': CSV_FILES.get(table_name), 'rules': rules},
+        STAGE_CACHE)
     
-    df_order_items = read_csv(CSV_FILES['order_items']['path'],CSV_FILES['order_items']['header'])
-    dataframes['order_items'] = transform_order_items(df_order_items,df_products,df_orders)
+    if table_name in PARENT_TABLES and len(result) < len(df):
+        key_column = KEY_COLUMNS[table_name]
+        key_indexes.discard(table_name, key_column, np.setdiff1d(df[key_column].to_numpy(), result[key_column].to_numpy()))
+    return result
+
+def run_in_memory(engine, watermarks, manifest, aggregates):
+    """
+    Ejecuta el pipeline leyendo y validando todos los archivos en memoria antes de iniciar la carga.
+    """
+    # Cargar y validar todos los archivos de su respectivo CSV.
+    logging.info("Iniciando lectura y validacion de archivos CSV")
+    # Indices de llaves de las tablas padre, construidos una sola vez y compartidos por las validaciones
+    dataframes = dict(transform_tables(watermarks, KeyIndexRegistry(), manifest, aggregates))
     logging.info("Terminada la lectura y validacion de archivos CSV")
     
     logging.info("Iniciada la carga de datos a la base de datos de MySQL")
-    for table in load_order:
-        load_data(engine, table, dataframes[table])
+    # Las tablas independientes se cargan en paralelo respetando las llaves foraneas
+    # Las tablas terminadas en la ejecucion reanudada no tienen DataFrame y su tarea no hace nada
+    tasks = {table: (lambda table=table: load_complete_table(engine, table, dataframes[table], manifest, aggregates))
+             if table in dataframes else (lambda: None) for table in LOAD_DEPENDENCIES}
+    run_dependency_graph(tasks, LOAD_DEPENDENCIES, max_workers=PARALLEL_LOAD['max_workers'])
         
     logging.info("Terminada la carga de datos a la base de datos de MySQL")
-    logging.info("Pipeline de datos se ejecuto correctamente")
\ No newline at end of file
+
+def run_overlapped(engine, watermarks, manifest, aggregates):
+    """
+    Ejecuta el pipeline solapando la lectura y transformacion de cada tabla con la carga de la tabla
+    anterior. Las tablas se producen en orden de dependencias, por lo que se cargan respetando las
+    llaves foraneas; la cola acotada de PIPELINED limita cuantas tablas esperan en memoria.
+    """
+    logging.info("Iniciando lectura, validacion y carga solapadas")
+    run_pipelined(transform_tables(watermarks, KeyIndexRegistry(), manifest, aggregates),
+                  lambda item: load_complete_table(engine, *item, manifest, aggregates), PIPELINED['max_queue'], 'retail')
+    logging.info("Terminada la lectura, validacion y carga solapadas")
+
+def run_validate_only():
+    """
+    Lee, valida y transforma todos los archivos sin conectarse a la base de datos ni escribir el
+    manifiesto, las marcas de agua o los agregados; las reglas de QUALITY se evaluan sobre todas
+    las filas.
+    """
+    logging.info("Iniciando validacion de archivos CSV sin carga (--validate-only)")
+    rows = {table_name: len(df) for table_name, df in transform_tables({}, KeyIndexRegistry(), None, None)}
+    logging.info(f"Validacion terminada sin errores, filas validas por tabla: {rows}")
+
+def load_mode(engine, fast_load):
+    """
+    Contexto de la carga: con fast_load la base de datos no verifica llaves ni mantiene indices
+    secundarios mientras se carga, y al terminar se reconstruyen los indices y se verifica la
+    integridad de FAST_LOAD en una sola pasada.
+    """
+    if not fast_load:
+        return nullcontext()
+    from etl_utils.constraints import relaxed_constraints
+    return relaxed_constraints(engine.get(), list(LOAD_DEPENDENCIES), FAST_LOAD['foreign_keys'], FAST_LOAD['unique_keys'])
+
+def main(argv=None):
+    """
+    Punto de entrada del pipeline de retail; argv permite ejecutarlo desde otros scripts.
+    """
+    parser = argparse.ArgumentParser(description="Pipeline ETL de retail")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Lee, valida y carga por bloques (chunksize de CSV_FILES) para acotar la memoria")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Solo carga las filas de orders y order_items posteriores a la marca de agua; "
+                             "las demas tablas se insertan o actualizan por llave")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Vacia todas las tablas y las recarga completas")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Parsea y transforma los archivos sin usar el cache de parseo ni el de etapas")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Vacia el cache de parseo y el de etapas antes de ejecutar")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="Registra la memoria de cada tabla con y sin el esquema de CSV_FILES")
+    parser.add_argument('--profile', metavar='ETAPA',
+                        help="Perfila la etapa indicada (ej. transform_orders, load_data)")
+    parser.add_argument('--profiler', choices=['cprofile', 'tracemalloc'], default='cprofile',
+                        help="Perfilador usado con --profile")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="Solapa la lectura y transformacion de la siguiente tabla (o bloque) con la carga de la actual")
+    parser.add_argument('--fast-load', action='store_true',
+                        help="Carga sin verificar llaves ni mantener indices secundarios y verifica la integridad al final")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reanuda la ultima ejecucion fallida omitiendo las tablas y bloques ya cargados")
+    parser.add_argument('--validate-only', action='store_true',
+                        help="Solo lee y valida los archivos, sin conectarse a la base de datos")
+    args = parser.parse_args(argv)
+    try:
+        run_pipeline(args)
+    except PipelineError as e:
+        logging.error(e)
+        sys.exit(1)
+
+def run_pipeline(args):
+    """
+    Ejecuta el pipeline de retail con las opciones de main(); los errores de las etapas llegan
+    aqui como PipelineError, incluidos los de los hilos del scheduler y del productor solapado.
+    """
+    metrics.configure(METRICS['file'], args.profile, args.profiler)
+    
+    if args.clear_cache:
+        clear_cache(PARSE_CACHE['dir'])
+        clear_cache(STAGE_CACHE['dir'], 'Cache de etapas')
+    if args.no_cache:
+        PARSE_CACHE['enabled'] = False
+        STAGE_CACHE['enabled'] = False
+    if args.memory_report:
+        CSV_READ['memory_report'] = True
+    if args.incremental:
+        INCREMENTAL['enabled'] = True
+    
+    logging.info("Iniciando ejecucion de Pipeline")
+    if args.validate_only:
+        if args.incremental or args.resume:
+            logging.info("Con --validate-only se validan todas las filas; se ignoran --incremental y --resume")
+        run_validate_only()
+        stage_cache.log_stats()
+        return
+    
+    # La conexion a la base de datos MySQL (y la resolucion del host) se crea con el primer acceso
+    engine = LazyEngine(lambda: create_db_engine(DATABASE_CONFIG))
+    
+    # Los bloques dependen del modo y de los tamanos de bloque; al reanudar deben ser los mismos
+    options = {
+        'streaming': args.streaming,
+        'incremental': args.incremental,
+        'full_refresh': args.full_refresh,
+        'chunksize': {table: config.get('chunksize') for table, config in CSV_FILES.items()},
+    }
+    try:
+        manifest = RunManifest(RESUME['manifest_file'], options, args.resume)
+    except ValueError as e:
+        raise PipelineError(f"No se puede reanudar la ejecucion: {e}") from e
+    
+    watermarks = {}
+    if args.full_refresh and manifest.resuming:
+        # La ejecucion reanudada ya vacio las tablas
+        watermarks = {table: None for table in INCREMENTAL['tables']}
+    elif args.incremental or args.full_refresh:
+        # Al reanudar se usan las marcas de agua del intento fallido: las calculadas ahora ya
+        # incluirian las filas que ese intento alcanzo a cargar
+        watermarks = manifest.remember('watermarks', lambda: get_watermarks(engine.get(), args.full_refresh))
+    
+    # Lookups de las tablas padre y sumas parciales de los agregados (AGGREGATES)
+    aggregates = AggregateBuilder(AGGREGATES['state_file'], manifest.resuming) if AGGREGATES['enabled'] else None
+    
+    start = time.perf_counter()
+    try:
+        with load_mode(engine, args.fast_load):
+            if args.streaming:
+                run_streaming(engine, watermarks, manifest, aggregates, args.pipelined)
+            elif args.pipelined:
+                run_overlapped(engine, watermarks, manifest, aggregates)
+            else:
+                run_in_memory(engine, watermarks, manifest, aggregates)
+    except RuntimeError as e:
+        raise PipelineError(f"Error en la carga de datos: {e}") from e
+    logging.info(f"Lectura, validacion y carga en {time.perf_counter() - start:.3f}s "
+                 f"({'con' if args.fast_load else 'sin'} --fast-load)")
+    # Despues de una recarga completa los agregados se reemplazan aunque tambien se use --incremental
+    write_aggregates(engine, aggregates, manifest, args.incremental and not args.full_refresh)
+    stage_cache.log_stats()
+    manifest.complete()
+    logging.info("Pipeline de datos se ejecuto correctamente")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,15 +1,14 @@
-import socket
-
+# host None: IP de esta maquina, resuelta al crear la primera conexion (etl_utils/db.py)
 DATABASE_CONFIG = {
     "transact": {
-        "host": socket.gethostbyname(socket.gethostname()),
+        "host": None,
         "port": 3310,
         "user": "root",
         "password": "<password>",
         "database": "db_movies_netflix_transact"
     },
     "warehouse": {
-        "host": socket.gethostbyname(socket.gethostname()),
+        "host": None,
         "port": 3310,
         "user": "root",
         "password": "<password>",
@@ -24,6 +23,135 @@ CSV_FILES = {
 }
 
 LOG_FILE = 'logs/pipeline.log'
+# Cache de archivos parseados (etl_utils/parse_cache.py). Se desactiva con --no-cache y se
+# vacia con --clear-cache.
+PARSE_CACHE = {
+    'enabled': True,
+    'dir': '.cache/parsed',
+    'max_bytes': 512 * 1024 * 1024
+}
+
+# Cache de etapas (etl_utils/stage_cache.py): el resultado de cada transformacion se reutiliza si no
+# cambiaron sus entradas, su codigo ni su configuracion. Tambien se desactiva con --no-cache y se
+# vacia con --clear-cache.
+# stages: etapas que se memoizan. Calcular la huella de la entrada cuesta tanto como las
+# transformaciones sencillas, por lo que solo vale la pena en las costosas (dimMovie y FactWatchs).
+STAGE_CACHE = {
+    'enabled': True,
+    'dir': '.cache/stages',
+    'max_bytes': 1024 * 1024 * 1024,
+    'stages': {'transform_movie_data', 'transform_watch_data'}
+}
+# Metricas por etapa en formato JSON-lines (None las desactiva). Con --profile ETAPA esa etapa se
+# ejecuta bajo cProfile o tracemalloc (--profiler) y el resultado se guarda junto al log.
+METRICS = {
+    'file': 'logs/metrics.jsonl'
+}
+
+# Generacion sintetica de la tabla de hechos FactWatchs.
+# seed: semilla del generador de NumPy (None para resultados distintos en cada ejecucion).
+# rating: 'uniform' entre min y max, o 'normal' con mean y std recortada a [min, max].
+WATCH_DATA = {
+    'seed': 42,
+    'start_date': '2024-01-01',
+    'end_date': '2024-12-31',
+    'rating': {
+        'distribution': 'uniform',
+        'min': 0,
+        'max': 5,
+        'mean': 3.5,
+        'std': 1.0
+    },
+    # Modo --out-of-core: usuarios por bloque del cross join y procesos generadores (None = CPUs)
+    'users_per_block': 1000,
+    'workers': None
+}
+
+# Configuracion del bulk loader (etl_utils/bulk_loader.py).
+# strategy: 'auto', 'load_data_infile', 'executemany' o 'multi'.
+BULK_LOAD = {
+    'strategy': 'auto',
+    'batch_size': 10000
+}
+
+# Extraccion de la base de datos transaccional (--extract):
+#   'full': pd.read_sql del QUERY completo.
+#   'stream': cursor del lado del servidor, bloques de chunksize filas.
+#   'keyset': paginas de page_size llaves de key_table.key_column leidas en paralelo por workers
+#             conexiones del pool.
+EXTRACT = {
+    'mode': 'full',
+    'chunksize': 10000,
+    'page_size': 10000,
+    'workers': 4,
+    'key_table': 'movie',
+    'key_column': 'movieID'
+}
+
+# Carga idempotente de dimensiones (etl_utils/upsert.py, --upsert): staging + INSERT ... ON DUPLICATE
+# KEY UPDATE (ON CONFLICT en SQLite). Las filas sin cambios se omiten usando el cache de hashes por
+# llave guardado en cache_dir.
+UPSERT = {
+    'enabled': False,
+    'tables': {
+        'dimMovie': 'movieID',
+        'dimUser': 'userID'
+    },
+    'cache_dir': 'state/upsert'
+}
+
+# Modo --fast-load (etl_utils/constraints.py): la carga se hace sin verificar llaves foraneas ni
+# unicas y sin indices secundarios; al terminar se reconstruyen los indices y se verifican estas
+# llaves con una consulta por tabla.
+FAST_LOAD = {
+    'tables': ['dimMovie', 'dimUser', 'FactWatchs'],
+    'foreign_keys': {
+        'FactWatchs': {
+            'movieID': ('dimMovie', 'movieID'),
+            'userID': ('dimUser', 'userID')
+        }
+    },
+    'unique_keys': {
+        'dimMovie': 'movieID',
+        'dimUser': 'userID'
+    }
+}
+
+# Ejecucion solapada (--pipelined): tablas o bloques transformados que pueden esperar a ser cargados.
+PIPELINED = {
+    'max_queue': 2
+}
+# Manifiesto de la ejecucion (etl_utils/manifest.py): tablas y bloques confirmados en la Data
+# Warehouse. Con --resume se omiten y la ejecucion continua desde el ultimo bloque confirmado.
+RESUME = {
+    'manifest_file': 'state/run_manifest.json'
+}
+
+# Reglas de calidad de datos por tabla (etl_utils/quality.py), evaluadas juntas sobre cada DataFrame.
+# severity: 'fail' detiene la ejecucion, 'warn' solo se reporta y 'quarantine' separa las filas en
+# quarantine_dir/<tabla>.csv. sample_size: filas de ejemplo por regla en el log.
+QUALITY = {
+    'quarantine_dir': 'quarantine',
+    'sample_size': 5,
+    'rules': {
+        'movie_award': [
+            {'rule': 'unique', 'columns': ['movieID'], 'severity': 'fail'},
+            {'rule': 'not_null', 'columns': ['movieID', 'IdAward', 'Aware'], 'severity': 'fail'}
+        ],
+        # Se evalua sobre movie_award cuando ya se conocen las peliculas de dimMovie
+        'movie_award_movies': [
+            {'rule': 'foreign_key', 'column': 'movieID', 'references': ('dimMovie', 'movieID'), 'severity': 'fail'}
+        ],
+        'movie_data': [
+            {'rule': 'unique', 'columns': ['movieID'], 'severity': 'fail'},
+            {'rule': 'not_null', 'columns': ['movieID', 'title', 'releaseDate', 'gender', 'participantName', 'roleparticipant'], 'severity': 'fail'}
+        ],
+        'users': [
+            {'rule': 'unique', 'columns': ['idUser'], 'severity': 'fail'},
+            {'rule': 'not_null', 'columns': ['idUser', 'username', 'country', 'subscription'], 'severity': 'fail'}
+        ]
+    }
+}
 
 QUERY = """
     SELECT 
@@ -1,10 +1,23 @@
-from config import DATABASE_CONFIG, CSV_FILES, LOG_FILE, QUERY
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine
+from config import DATABASE_CONFIG, CSV_FILES, LOG_FILE, QUERY, BULK_LOAD, WATCH_DATA, PARSE_CACHE, METRICS, EXTRACT, PIPELINED, UPSERT, FAST_LOAD, RESUME, QUALITY, STAGE_CACHE
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+import argparse
 import logging
-import random
+import os
 import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from etl_utils.errors import PipelineError
+from etl_utils.db import LazyEngine, database_url, get_engine
+from etl_utils import metrics, quality, stage_cache
+from etl_utils.parse_cache import read_with_cache, clear_cache
+from etl_utils.key_index import KeyIndexRegistry
+from etl_utils.manifest import RunManifest, delete_unrecorded
+from etl_utils.pipelined import run_pipelined
 
 
 logging.basicConfig(
@@ -13,24 +26,31 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def create_db_engine(config):
+def create_db_engine(config, pool_size=5):
     """
     Establece la conexión con la base de datos MySQL utilizando SQLAlchemy.
 
     Parameters:
         config (dict): Configuración de la base de datos (host, port, user, password, database).
+        pool_size (int): Conexiones que mantiene abiertas el pool.
 
     Returns:
         sqlalchemy.engine.base.Engine: Objeto de conexión a la base de datos.
     """
     try:
-        engine = create_engine(f"mysql://{config['user']}:{config['password']}@{config['host']}:{config['port']}/{config['database']}")
+        # 'url' permite apuntar a otra base de datos (ej. sqlite:///retail.db) para pruebas locales
+        if config.get('url'):
+            engine = get_engine(config['url'])
+        else:
+            # local_infile habilita la estrategia LOAD DATA LOCAL INFILE del bulk loader. Sin 'host'
+            # se usa la IP de esta maquina, que se resuelve aqui y no al importar config.py
+            engine = get_engine(database_url(config), connect_args={'local_infile': 1}, pool_size=pool_size)
         logging.info(f"Conexion a base de datos {config['database']} fue exitosa")
         return engine
     except Exception as e:
-        logging.error(f'Error al conectar a la base de datos {config['database']}: {e}')
-        sys.exit(1)
+        raise PipelineError(f"Error al conectar a la base de datos {config['database']}: {e}") from e
 
+@metrics.track_stage
 def get_data_from_db(conn):
     """
     This method executes the query that has been created in the config.py file and return the query as a 
@@ -43,9 +63,102 @@ def get_data_from_db(conn):
         logging.info("Se obtiene exitosamente los datos del query del archivo config.py")
         return df
     except Exception as e:
-        logging.error(f"Error al obtener los datos de la base de datos: {e}")
-        sys.exit(1)
+        raise PipelineError(f"Error al obtener los datos de la base de datos: {e}") from e
 
+def get_data_from_db_stream(engine, chunksize=EXTRACT['chunksize']):
+    """
+    Ejecuta el query del archivo config.py con un cursor del lado del servidor (stream_results) y
+    devuelve el resultado por bloques, sin cargarlo completo en la memoria del cliente.
+    
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de la base de datos transaccional.
+        chunksize (int): Filas por bloque.
+    
+    Returns:
+        Iterador de pd.DataFrame.
+    """
+    from sqlalchemy import text
+    
+    try:
+        with engine.connect().execution_options(stream_results=True) as conn:
+            for chunk in pd.read_sql(sql=text(QUERY), con=conn, chunksize=chunksize):
+                yield chunk
+        logging.info("Se obtiene exitosamente por bloques los datos del query del archivo config.py")
+    except Exception as e:
+        raise PipelineError(f"Error al obtener los datos de la base de datos: {e}") from e
+
+def get_key_pages(engine, page_size=EXTRACT['page_size']):
+    """
+    Recorre la llave de EXTRACT['key_table'] con paginacion por llave (keyset) y devuelve los
+    limites de cada pagina. Cada consulta lee solo la llave usando su indice.
+    
+    Returns:
+        Iterador de tuplas (desde, hasta): la pagina incluye las llaves > desde y <= hasta;
+        None indica que no hay limite.
+    """
+    from sqlalchemy import text
+    
+    quote = engine.dialect.identifier_preparer.quote
+    key, table = quote(EXTRACT['key_column']), quote(EXTRACT['key_table'])
+    with engine.connect() as conn:
+        lower = None
+        while True:
+            where = f"WHERE {key} > :lower " if lower is not None else ""
+            upper = conn.execute(text(f"SELECT {key} FROM {table} {where}ORDER BY {key} LIMIT 1 OFFSET :offset"),
+                                 {'lower': lower, 'offset': page_size - 1}).scalar()
+            yield lower, upper
+            if upper is None:
+                return
+            lower = upper
+
+def get_page(engine, lower, upper):
+    """
+    Ejecuta el query del archivo config.py solo para las llaves de una pagina.
+    
+    Returns:
+        pd.DataFrame: Filas de la pagina.
+    """
+    from sqlalchemy import text
+    
+    key = EXTRACT['key_column']
+    conditions = []
+    if lower is not None:
+        conditions.append(f"page.{key} > :lower")
+    if upper is not None:
+        conditions.append(f"page.{key} <= :upper")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = text(f"SELECT * FROM ({QUERY}) page {where}")
+    with engine.connect() as conn:
+        return pd.read_sql(sql=sql, con=conn, params={'lower': lower, 'upper': upper})
+
+def get_data_from_db_keyset(engine, page_size=EXTRACT['page_size'], workers=EXTRACT['workers']):
+    """
+    Ejecuta el query del archivo config.py por paginas de llaves de movieID, leyendo hasta
+    'workers' paginas a la vez con conexiones del pool. Como maximo hay 2 * workers paginas en
+    memoria y se devuelven en orden de llave.
+    
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de la base de datos transaccional.
+        page_size (int): Llaves por pagina.
+        workers (int): Paginas leidas en paralelo.
+    
+    Returns:
+        Iterador de pd.DataFrame.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for lower, upper in get_key_pages(engine, page_size):
+                pending.append(executor.submit(get_page, engine, lower, upper))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        logging.info("Se obtiene exitosamente por paginas los datos del query del archivo config.py")
+    except Exception as e:
+        raise PipelineError(f"Error al obtener los datos de la base de datos: {e}") from e
+
+@metrics.track_stage
 def read_csv(file_path, sep=','):
     """
     Este método lee un archivo CSV y devuelve los datos como un DataFrame.
@@ -58,96 +171,94 @@ def read_csv(file_path, sep=','):
         pd.DataFrame: DataFrame con los datos del archivo CSV.
     """
     try:
-        df = pd.read_csv(file_path, sep=sep)
+        df = read_with_cache(file_path, lambda: pd.read_csv(file_path, sep=sep), {'sep': sep}, PARSE_CACHE)
         logging.info(f"El archivo {file_path} se ha leído correctamente.")
         return df    
     except Exception as e:
-        logging.error(f"Error al leer el archivo {file_path}: {e}")
-        sys.exit(1)
+        raise PipelineError(f"Error al leer el archivo {file_path}: {e}") from e
 
-def gen_rating():
+def gen_ratings(rng, size, config=WATCH_DATA['rating']):
     """
-    Genera una calificación aleatoria entre 0 y 5 con un decimal.
+    Genera en bloque calificaciones aleatorias con un decimal, siguiendo la distribucion configurada
+    en WATCH_DATA['rating'].
     
-    Returns:
-        float: Calificación aleatoria de película.
-    """
-    return round(random.uniform(0, 5), 1)
-
-def gen_timestamp():
-    """
-    Genera un timestamp aleatorio dentro del año 2024.
+    Parameters:
+        rng (np.random.Generator): Generador de numeros aleatorios.
+        size (int): Cantidad de calificaciones a generar.
+        config (dict): Distribucion ('uniform' o 'normal') y sus parametros.
     
     Returns:
-        datetime: Fecha y hora aleatoria.
+        np.ndarray: Calificaciones entre config['min'] y config['max'].
     """
-    start_date = datetime(2024, 1, 1)
-    end_date = datetime(2024, 12, 31)
-
-    random_date = start_date + timedelta(seconds=random.randint(0, int((end_date - start_date).total_seconds())))
-    return random_date
-
-def validate_ids(df_transact, df, id_transact, id_df):
+    if config['distribution'] == 'normal':
+        ratings = rng.normal(config['mean'], config['std'], size)
+    elif config['distribution'] == 'uniform':
+        ratings = rng.uniform(config['min'], config['max'], size)
+    else:
+        raise ValueError(f"Distribucion de rating desconocida: {config['distribution']}")
+    return np.clip(np.round(ratings, 1), config['min'], config['max'])
+
+def gen_timestamps(rng, size, start_date=WATCH_DATA['start_date'], end_date=WATCH_DATA['end_date']):
     """
-    Valida la existencia de los IDs de un DataFrame en otro DataFrame.
+    Genera en bloque timestamps aleatorios (con resolucion de segundos) entre start_date y end_date.
     
     Parameters:
-        df_transact (pd.DataFrame): DataFrame de transacciones.
-        df (pd.DataFrame): DataFrame con los IDs a validar.
-        id_transact (str): Nombre de la columna en df_transact que contiene los IDs.
-        id_df (str): Nombre de la columna en df que contiene los IDs válidos.
+        rng (np.random.Generator): Generador de numeros aleatorios.
+        size (int): Cantidad de timestamps a generar.
+        start_date (str): Fecha inicial del rango.
+        end_date (str): Fecha final del rango.
     
-    Raises:
-        SystemExit: Si algún ID no es válido, se muestra un mensaje de advertencia y se detiene la ejecución.
+    Returns:
+        pd.DatetimeIndex: Fechas y horas aleatorias.
     """
-    try:
-        valid_ids = set(df[id_df])
+    start = pd.Timestamp(start_date)
+    total_seconds = int((pd.Timestamp(end_date) - start).total_seconds())
+    seconds = rng.integers(0, total_seconds, size, endpoint=True)
+    return start + pd.to_timedelta(seconds, unit='s')
 
-        if not df_transact[id_transact].isin(valid_ids).all():
-            logging.warning(f"Algunos IDs en '{id_transact}' no existen en '{id_df}' en el DataFrame de referencia.")
-            sys.exit(1)
-    except Exception as e:
-        logging.error(f"Error al validar los IDs: {e}")
-        sys.exit(1)
-
-def validate_duplicates(df, column):
+def check_quality(table_name, df, rules=None, key_indexes=None):
     """
-    Valida si existen valores duplicados en la columna especificada de un DataFrame.
+    Evalua juntas las reglas de calidad de una tabla (por defecto las de QUALITY) y registra todas
+    las violaciones con su conteo y filas de ejemplo. Las filas que no cumplen reglas con severidad
+    'quarantine' se quitan del DataFrame y se guardan en el archivo de cuarentena de la tabla.
     
     Parameters:
-        df (pd.DataFrame): DataFrame en el que se valida la columna.
-        column (str): Nombre de la columna donde se buscarán los duplicados.
+        table_name (str): Nombre de la tabla en QUALITY['rules'].
+        df (pd.DataFrame): DataFrame a validar.
+        rules (list): Reglas a evaluar en lugar de las de QUALITY.
+        key_indexes (KeyIndexRegistry): Indices de llaves de las tablas padre (reglas foreign_key).
+    
+    Returns:
+        pd.DataFrame: DataFrame sin las filas en cuarentena.
     
     Raises:
-        SystemExit: Si se encuentran duplicados en la columna, se muestra un mensaje de advertencia y se detiene la ejecución.
+        PipelineError: Si alguna regla con severidad 'fail' no se cumple.
     """
+    rules = QUALITY['rules'].get(table_name) if rules is None else rules
+    if not rules:
+        return df
     try:
-        if df[column].duplicated().any():
-            logging.warning(f"Se encontraron movieID duplicados en la columna '{column}' del DataFrame.")
-            sys.exit(1)
+        df, _ = quality.check(df, table_name, rules, key_indexes, QUALITY['quarantine_dir'], QUALITY['sample_size'])
+        return df
+    except quality.DataQualityError as e:
+        raise PipelineError(f"Validacion de calidad de datos fallida: {e}") from e
     except Exception as e:
-        logging.error(f"Error al validar los duplicados: {e}")
-        sys.exit(1)
+        raise PipelineError(f"Error al validar la calidad de datos de la tabla {table_name}: {e}") from e
 
-def validate_columns(df, columns):
+def check_award_movies(df_movies_award, df_movies):
     """
-    Valida si existen valores nulos en las columnas especificadas de un DataFrame.
-    
-    Parameters:
-        df (pd.DataFrame): DataFrame donde se realizará la validación.
-        columns (list): Lista con los nombres de las columnas a validar.
+    Valida con las reglas de QUALITY['rules']['movie_award_movies'] que los movieID de
+    'movie_award' existan en las peliculas de dimMovie, buscandolos en el indice de llaves de
+    dimMovie.
     
     Raises:
-        SystemExit: Si se encuentran valores nulos, se muestra un mensaje de advertencia y se detiene la ejecución.
+        PipelineError: Si algun movieID de 'movie_award' no existe en dimMovie.
     """
-    try:
-        if df[columns].isnull().any().any():
-            logging.warning(f"Se encontraron datos faltantes en las columnas {columns} del DataFrame.")
-            sys.exit(1)
-    except Exception as e:
-        logging.error(f"Error al validar los datos en las columnas: {e}")
-        sys.exit(1)
+    key_indexes = KeyIndexRegistry()
+    key_indexes.register('dimMovie', 'movieID', df_movies['movieID'])
+    check_quality('movie_award', df_movies_award, QUALITY['rules']['movie_award_movies'], key_indexes)
 
+@metrics.track_stage
 def transform_movie_award(df):
     """
     Realiza la validación y transformación de los datos en el dataframe 'movie_award'.
@@ -158,43 +269,42 @@ def transform_movie_award(df):
         pd.DataFrame: DataFrame transformado.
     """
     try:
-        # Validación de duplicados en movieID
-        validate_duplicates(df, 'movieID')
-
-        # Validación de campos obligatorios
-        validate_columns(df, ['movieID', 'IdAward', 'Aware'])
+        # Validación de duplicados en movieID y de campos obligatorios
+        df = check_quality('movie_award', df)
 
         # Transformación del tipo de dato de 'movieID' y renombramiento de la columna 'Aware'
         df['movieID'] = df['movieID'].astype('int')
         df.rename(columns={"Aware": "Award"}, inplace=True)
 
         return df
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f'Error al transformar el dataframe movie_award: {e}')
-        sys.exit(1)
+        raise PipelineError(f'Error al transformar el dataframe movie_award: {e}') from e
 
-def transform_movie_data(df, df_movies_award):
+@metrics.track_stage
+def transform_movie_data(df, df_movies_award, validate_awards=True):
     """
     Realiza la validación y transformación de los datos en el dataframe 'movie_data'.
     Valida los duplicados, revisa los valores nulos, organiza los tipos de datos,
     valida que los IDs de 'movieID' existan en 'movie_award', y realiza una unión
     de ambos dataframes, renombrando algunas columnas y eliminando 'IdAward'.
+    Con validate_awards=False se omite la validacion de 'movie_award' (cuando df es
+    solo un bloque de las peliculas, ver load_movie_data_chunks).
     
     Returns:
         pd.DataFrame: DataFrame transformado y combinado con movie_award.
     """
     try:
-        # Validación de duplicados en movieID
-        validate_duplicates(df, 'movieID')
-
-        # Validación de campos obligatorios
-        validate_columns(df, ['movieID', 'title', 'releaseDate', 'gender', 'participantName', 'roleparticipant'])
+        # Validación de duplicados en movieID y de campos obligatorios
+        df = check_quality('movie_data', df)
 
         # Transformación del tipo de dato de 'movieID'
         df['movieID'] = df['movieID'].astype('int')
 
         # Validación de que 'movieID' de movie_award exista en movie_data
-        validate_ids(df_movies_award, df, 'movieID', 'movieID')
+        if validate_awards:
+            check_award_movies(df_movies_award, df)
 
         # Unión de los DataFrames 'df' y 'df_movies_award'
         df_merge = pd.merge(df, df_movies_award, on='movieID')
@@ -204,10 +314,53 @@ def transform_movie_data(df, df_movies_award):
         df_merge = df_merge.drop(columns=['IdAward'])
 
         return df_merge
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f'Error al transformar el dataframe movie_data: {e}')
-        sys.exit(1)
+        raise PipelineError(f'Error al transformar el dataframe movie_data: {e}') from e
 
+def load_movie_data_chunks(chunks, df_movies_award, engine, manifest, pipelined=False):
+    """
+    Transforma y carga en la tabla dimMovie cada bloque extraido de la base de datos
+    transaccional, conservando en memoria solo los movieID. Al terminar valida que no haya
+    movieID repetidos entre bloques y que los IDs de 'movie_award' existan en las peliculas
+    cargadas; a diferencia del modo 'full', estas validaciones ocurren despues de la carga.
+    
+    Parameters:
+        chunks (iterable): Bloques del query del archivo config.py.
+        df_movies_award (pd.DataFrame): Premios por pelicula ya transformados.
+        engine (LazyEngine): Motor de la Data Warehouse, creado con el primer bloque cargado.
+        manifest (RunManifest): Manifiesto de la ejecucion; los bloques ya confirmados no se cargan.
+        pipelined (bool): Extrae y transforma el bloque siguiente mientras se carga el actual.
+    
+    Returns:
+        pd.DataFrame: Columna movieID de las peliculas cargadas.
+    """
+    movie_ids = []
+    transformed = ((i, transform_movie_data(chunk, df_movies_award, validate_awards=False))
+                   for i, chunk in enumerate(chunks))
+    
+    def load_chunk(item):
+        i, df = item
+        if not manifest.chunk_completed('dimMovie', i):
+            load_table(engine, 'dimMovie', df, manifest, i)
+        movie_ids.append(df['movieID'].to_numpy())
+    
+    if pipelined:
+        run_pipelined(transformed, load_chunk, PIPELINED['max_queue'], 'dimMovie')
+    else:
+        for df in transformed:
+            load_chunk(df)
+    
+    df_movie_ids = pd.DataFrame({'movieID': np.concatenate(movie_ids) if movie_ids else np.array([], dtype=int)})
+    # Los bloques ya se cargaron: un movieID repetido entre bloques solo puede detener la ejecucion
+    check_quality('dimMovie', df_movie_ids, [{'rule': 'unique', 'columns': ['movieID'], 'severity': 'fail'}])
+    check_award_movies(df_movies_award, df_movie_ids)
+    manifest.complete_table('dimMovie')
+    logging.info(f"Se cargaron por bloques {len(df_movie_ids)} peliculas en la tabla dimMovie")
+    return df_movie_ids
+
+@metrics.track_stage
 def transform_users(df):
     """
     Gets the dataframe users, validates the columns of the dataframe and the data, and then renames
@@ -216,26 +369,31 @@ def transform_users(df):
     return Dataframe object
     """
     try:
-        # Valida si existen Ids duplicados
-        validate_duplicates(df,'idUser')
-
-        # Validacion de Campos Obligatiorios
-        validate_columns(df,['idUser','username','country','subscription'])
+        # Valida si existen Ids duplicados y los Campos Obligatiorios
+        df = check_quality('users', df)
 
         # Renombrar el campo de userID
         df = df.rename(columns={'idUser': 'userID'})
         
         return df
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f'Error al transformar el dataframe users: {e}')
-        sys.exit(1)
+        raise PipelineError(f'Error al transformar el dataframe users: {e}') from e
 
-def transform_watch_data(df_users, df_movie_data):
+@metrics.track_stage
+def transform_watch_data(df_users, df_movie_data, seed=WATCH_DATA['seed']):
     """
     Realiza la transformación de los datos para crear la tabla de hechos 'watch_data'.
     Se genera un cross join entre los IDs de usuarios y películas, simulando que 
     cada usuario vio todas las películas. Luego, se asignan calificaciones y 
-    marcas de tiempo aleatorias a cada registro.
+    marcas de tiempo aleatorias a cada registro, generadas en bloque con un
+    generador de NumPy para que la ejecucion sea reproducible con la misma semilla.
+    
+    Parameters:
+        df_users (pd.DataFrame): Dimension de usuarios.
+        df_movie_data (pd.DataFrame): Dimension de peliculas.
+        seed (int): Semilla del generador aleatorio.
     
     Returns:
         pd.DataFrame: DataFrame transformado con los datos de watch_data.
@@ -249,53 +407,388 @@ def transform_watch_data(df_users, df_movie_data):
         df = pd.merge(users_id, movies_id, how="cross")
 
         # Asignar un rating aleatorio y un timestamp para cada combinación de usuario y película
-        df["rating"] = df["movieID"].apply(lambda x: gen_rating())
-        df["timestamp"] = df["userID"].apply(lambda x: gen_timestamp())
+        rng = np.random.default_rng(seed)
+        df["rating"] = gen_ratings(rng, len(df))
+        df["timestamp"] = gen_timestamps(rng, len(df))
         
         return df
+    except PipelineError:
+        raise
     except Exception as e:
-        logging.error(f'Error al transformar el dataframe watch_data: {e}')
-        sys.exit(1)
+        raise PipelineError(f'Error al transformar el dataframe watch_data: {e}') from e
 
+def gen_watch_block(user_ids, movie_ids, seed_sequence):
+    """
+    Genera un bloque de la tabla de hechos 'watch_data': el cross join de un rango de usuarios con
+    todas las peliculas, con calificaciones y marcas de tiempo aleatorias. Se ejecuta en un proceso
+    del pool, por lo que cada bloque usa su propia semilla derivada de WATCH_DATA['seed'].
+    
+    Parameters:
+        user_ids (np.ndarray): IDs de los usuarios del bloque.
+        movie_ids (np.ndarray): IDs de todas las peliculas.
+        seed_sequence (np.random.SeedSequence): Semilla del bloque.
+    
+    Returns:
+        tuple: (DataFrame del bloque, segundos que tomo generarlo).
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed_sequence)
+    df = pd.DataFrame({
+        'userID': np.repeat(user_ids, len(movie_ids)),
+        'movieID': np.tile(movie_ids, len(user_ids)),
+    })
+    df["rating"] = gen_ratings(rng, len(df))
+    df["timestamp"] = gen_timestamps(rng, len(df))
+    return df, time.perf_counter() - start
+
+def load_watch_data_blocks(engine, df_users, df_movie_data, manifest, table_name='FactWatchs',
+                           users_per_block=WATCH_DATA['users_per_block'], workers=WATCH_DATA['workers'],
+                           seed=WATCH_DATA['seed']):
+    """
+    Genera y carga la tabla de hechos 'watch_data' por bloques de usuarios sin materializar el
+    cross join completo. Los bloques se generan en un pool de procesos y se cargan en cuanto estan
+    listos; como maximo hay dos bloques en vuelo por proceso, de modo que la memoria queda acotada
+    por el tamano de bloque.
+    
+    Parameters:
+        engine (LazyEngine): Motor de la Data Warehouse, creado con el primer bloque cargado.
+        df_users (pd.DataFrame): Dimension de usuarios.
+        df_movie_data (pd.DataFrame): Dimension de peliculas.
+        manifest (RunManifest): Manifiesto de la ejecucion; los bloques ya confirmados no se generan.
+        table_name (str): Tabla destino.
+        users_per_block (int): Usuarios por bloque.
+        workers (int): Procesos generadores (None para usar todas las CPUs).
+        seed (int): Semilla base del generador aleatorio.
+    
+    Returns:
+        int: Total de filas cargadas.
+    """
+    try:
+        user_ids = df_users["userID"].to_numpy()
+        movie_ids = df_movie_data["movieID"].to_numpy()
+        user_blocks = [user_ids[i:i + users_per_block] for i in range(0, len(user_ids), users_per_block)]
+        seeds = np.random.SeedSequence(seed).spawn(len(user_blocks))
+        workers = workers or os.cpu_count()
+        max_in_flight = 2 * workers
+        # Cada bloque tiene su propia semilla, por lo que al reanudar los bloques pendientes son
+        # los mismos que se habrian generado en la ejecucion original
+        pending = [block_id for block_id in range(len(user_blocks)) if not manifest.chunk_completed(table_name, block_id)]
+        if len(pending) < len(user_blocks):
+            logging.info(f"Tabla {table_name}: {len(user_blocks) - len(pending)} bloques ya cargados se omiten")
+        
+        total_rows = 0
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = []
+            next_block = 0
+            for block_id in pending:
+                # Mantener acotado el numero de bloques generados que esperan ser cargados
+                while next_block < len(pending) and len(in_flight) < max_in_flight:
+                    submitted = pending[next_block]
+                    in_flight.append(executor.submit(gen_watch_block, user_blocks[submitted], movie_ids, seeds[submitted]))
+                    next_block += 1
+                
+                df, gen_seconds = in_flight.pop(0).result()
+                load_start = time.perf_counter()
+                load_table(engine, table_name, df, manifest, block_id)
+                load_seconds = time.perf_counter() - load_start
+                total_rows += len(df)
+                logging.info(f"Bloque {block_id + 1}/{len(user_blocks)} de {table_name}: {len(df)} filas, "
+                             f"generacion {gen_seconds:.3f}s, carga {load_seconds:.3f}s")
+                del df
+        
+        manifest.complete_table(table_name)
+        seconds = time.perf_counter() - start
+        logging.info(f"Tabla {table_name}: {total_rows} filas en {len(pending)} bloques, {seconds:.3f}s "
+                     f"({total_rows / seconds if seconds > 0 else 0:.0f} filas/s) con {workers} procesos")
+        return total_rows
+    except PipelineError:
+        raise
+    except Exception as e:
+        raise PipelineError(f'Error al generar por bloques el dataframe watch_data: {e}') from e
+
+@metrics.track_stage
 def load_data(engine, table_name, df):
     """
     Gets the data of a dataframe and loads it to the table in the MySQL Data Warehouse.
+    With UPSERT enabled, the dimension tables are inserted or updated by key instead of appended.
     """
+    # Los modulos de carga importan SQLAlchemy; se importan solo al cargar (ver etl_utils/db.py)
+    from etl_utils.bulk_loader import bulk_load
+    from etl_utils.upsert import upsert
+    
     try:
-        df.to_sql(name = table_name, con = engine, if_exists = 'append', index = False)
+        if UPSERT['enabled'] and table_name in UPSERT['tables']:
+            upsert(engine, table_name, df, UPSERT['tables'][table_name], UPSERT['cache_dir'],
+                   strategy=BULK_LOAD['strategy'], batch_size=BULK_LOAD['batch_size'])
+        else:
+            bulk_load(engine, table_name, df, strategy=BULK_LOAD['strategy'], batch_size=BULK_LOAD['batch_size'])
         logging.info(f"Se cargo correctamente la informacion a la tabla {table_name}")
     except Exception as e:
-        logging.error(f"Error a la hora de cargar datos a la tabla {table_name}: {e}")
+        raise PipelineError(f"Error a la hora de cargar datos a la tabla {table_name}: {e}") from e
+
+# Columna que identifica las filas de cada bloque, usada al reanudar para eliminar un bloque cargado
+# sin registrarse en el manifiesto (los bloques de FactWatchs son rangos de usuarios)
+KEY_COLUMNS = {
+    'dimMovie': 'movieID',
+    'dimUser': 'userID',
+    'FactWatchs': 'userID'
+}
+
+def clean_unrecorded_rows(engine, table_name, df, manifest):
+    """
+    Al reanudar, elimina las filas del bloque que pudieron quedar cargadas sin registrarse en el
+    manifiesto. Las dimensiones cargadas con upsert no lo necesitan.
+    """
+    if UPSERT['enabled'] and table_name in UPSERT['tables']:
+        return
+    key_column = KEY_COLUMNS[table_name]
+    try:
+        delete_unrecorded(engine.get(), manifest, table_name, key_column, df[key_column].to_numpy())
+    except Exception as e:
+        raise PipelineError(f"Error al eliminar las filas sin registrar de la tabla {table_name}: {e}") from e
+
+def load_table(engine, table_name, df, manifest, chunk=0):
+    """
+    Carga el dataframe (o un bloque de la tabla) y registra el bloque en el manifiesto de la
+    ejecucion. Al reanudar, antes del primer bloque pendiente se eliminan las filas que pudieron
+    quedar cargadas sin registrarse.
+    """
+    key_column = KEY_COLUMNS[table_name]
+    if manifest.needs_cleanup(table_name):
+        clean_unrecorded_rows(engine, table_name, df, manifest)
+    load_data(engine.get(), table_name, df)
+    if len(df):
+        manifest.record_chunk(table_name, chunk, len(df), df[key_column].min(), df[key_column].max())
+    else:
+        manifest.record_chunk(table_name, chunk, 0)
+
+def load_complete_table(engine, table_name, df, manifest):
+    """
+    Carga una tabla completa como un solo bloque y la registra como terminada en el manifiesto.
+    """
+    load_table(engine, table_name, df, manifest)
+    manifest.complete_table(table_name)
+
+def read_loaded_keys(engine, table_name):
+    """
+    Lee de la Data Warehouse las llaves de una dimension ya cargada en la ejecucion reanudada;
+    son lo unico que necesita la tabla de hechos.
+    
+    return DataFrame con la columna llave
+    """
+    from sqlalchemy import text
+    
+    column = KEY_COLUMNS[table_name]
+    try:
+        engine = engine.get()
+        quote = engine.dialect.identifier_preparer.quote
+        df = pd.read_sql(text(f"SELECT {quote(column)} FROM {quote(table_name)}"), engine)
+        logging.info(f"Tabla {table_name} ya cargada en la ejecucion reanudada; se leen sus {len(df)} llaves")
+        return df
+    except Exception as e:
+        raise PipelineError(f"Error al leer las llaves de la tabla {table_name}: {e}") from e
+
+def memoize_stage(function, inputs, config, code=()):
+    """
+    Ejecuta una transformacion, o devuelve su resultado guardado en el cache de etapas si no
+    cambiaron sus entradas, su codigo (y el de code) ni su configuracion.
+    
+    Parameters:
+        function (callable): Transformacion; recibe los valores de inputs como argumentos.
+        inputs (dict): Argumentos de la transformacion.
+        config (dict): Configuracion de la que depende el resultado.
+        code (tuple): Otras funciones o modulos que usa la transformacion.
+    
+    Returns:
+        pd.DataFrame: Resultado de la transformacion.
+    """
+    return stage_cache.memoize(function.__name__, lambda: function(**inputs), inputs,
+                               [function, check_quality, quality, *code], config, STAGE_CACHE)
+
+def transform_tables(transact_engine, warehouse_engine, df_movie_awards, dataframes, manifest, args):
+    """
+    Extrae y transforma las tablas de la Data Warehouse en orden de carga. Con una extraccion
+    por bloques dimMovie se carga a medida que llegan los bloques y no se devuelve.
+    Los DataFrames transformados se guardan tambien en dataframes. Las tablas terminadas en la
+    ejecucion reanudada no se devuelven; de las dimensiones se leen sus llaves de la Data Warehouse.
+    
+    return Iterador de tuplas (tabla, DataFrame)
+    """
+    if manifest.table_completed('dimMovie'):
+        dataframes['dimMovie'] = read_loaded_keys(warehouse_engine, 'dimMovie')
+    elif args.extract == 'full':
+        df_movie_data = get_data_from_db(transact_engine.get())
+        dataframes['dimMovie'] = memoize_stage(transform_movie_data, {'df': df_movie_data, 'df_movies_award': df_movie_awards},
+                                               {'query': QUERY, 'rules': QUALITY['rules']['movie_data'],
+                                                'award_rules': QUALITY['rules']['movie_award_movies']}, (check_award_movies,))
+        yield 'dimMovie', dataframes['dimMovie']
+    else:
+        if args.extract == 'stream':
+            chunks = get_data_from_db_stream(transact_engine.get())
+        else:
+            chunks = get_data_from_db_keyset(transact_engine.get())
+        dataframes['dimMovie'] = load_movie_data_chunks(chunks, df_movie_awards, warehouse_engine, manifest, args.pipelined)
+    
+    if manifest.table_completed('dimUser'):
+        dataframes['dimUser'] = read_loaded_keys(warehouse_engine, 'dimUser')
+    else:
+        df_users = read_csv(CSV_FILES['users'],sep='|')
+        dataframes['dimUser'] = memoize_stage(transform_users, {'df': df_users}, {'rules': QUALITY['rules']['users']})
+        yield 'dimUser', dataframes['dimUser']
+    
+    if not args.out_of_core and not manifest.table_completed('FactWatchs'):
+        if WATCH_DATA['seed'] is None:
+            # Sin semilla el resultado cambia en cada ejecucion y no se guarda en el cache de etapas
+            dataframes['FactWatchs'] = transform_watch_data(dataframes['dimUser'],dataframes['dimMovie'])
+        else:
+            dataframes['FactWatchs'] = memoize_stage(
+                transform_watch_data,
+                {'df_users': dataframes['dimUser'][['userID']], 'df_movie_data': dataframes['dimMovie'][['movieID']],
+                 'seed': WATCH_DATA['seed']},
+                WATCH_DATA, (gen_ratings, gen_timestamps))
+        yield 'FactWatchs', dataframes['FactWatchs']
+
+def run_validate_only():
+    """
+    Lee y valida los archivos CSV (premios y usuarios) con sus reglas de QUALITY, sin conectarse
+    a ninguna base de datos ni escribir el manifiesto. dimMovie y FactWatchs se extraen de la base
+    de datos transaccional, por lo que no se validan en este modo.
+    """
+    logging.info("Iniciando validacion de archivos CSV sin carga (--validate-only)")
+    df_movie_awards = memoize_stage(transform_movie_award, {'df': read_csv(CSV_FILES['award_movie'])},
+                                    {'rules': QUALITY['rules']['movie_award']})
+    df_users = memoize_stage(transform_users, {'df': read_csv(CSV_FILES['users'], sep='|')},
+                             {'rules': QUALITY['rules']['users']})
+    logging.info("dimMovie y FactWatchs requieren la base de datos transaccional; no se validan")
+    logging.info(f"Validacion terminada sin errores, filas validas: movie_awards {len(df_movie_awards)}, "
+                 f"dimUser {len(df_users)}")
+
+def load_mode(engine, fast_load):
+    """
+    Contexto de la carga: con fast_load la Data Warehouse no verifica llaves ni mantiene indices
+    secundarios mientras se carga, y al terminar se reconstruyen los indices y se verifica la
+    integridad de FAST_LOAD en una sola pasada.
+    """
+    if not fast_load:
+        return nullcontext()
+    from etl_utils.constraints import relaxed_constraints
+    return relaxed_constraints(engine.get(), FAST_LOAD['tables'], FAST_LOAD['foreign_keys'], FAST_LOAD['unique_keys'])
+
+def main(argv=None):
+    """
+    Punto de entrada del pipeline de netflix; argv permite ejecutarlo desde otros scripts.
+    """
+    parser = argparse.ArgumentParser(description="Pipeline ETL de netflix")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="Genera y carga FactWatchs por bloques de usuarios sin materializar el cross join")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Parsea y transforma los archivos sin usar el cache de parseo ni el de etapas")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="Vacia el cache de parseo y el de etapas antes de ejecutar")
+    parser.add_argument('--profile', metavar='ETAPA',
+                        help="Perfila la etapa indicada (ej. transform_orders, load_data)")
+    parser.add_argument('--profiler', choices=['cprofile', 'tracemalloc'], default='cprofile',
+                        help="Perfilador usado con --profile")
+    parser.add_argument('--extract', choices=['full', 'stream', 'keyset'], default=EXTRACT['mode'],
+                        help="Modo de extraccion de la base de datos transaccional")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="Solapa la extraccion y transformacion de la siguiente tabla (o bloque) con la carga de la actual")
+    parser.add_argument('--upsert', action='store_true',
+                        help="Inserta o actualiza dimMovie y dimUser por llave, omitiendo las filas sin cambios")
+    parser.add_argument('--fast-load', action='store_true',
+                        help="Carga sin verificar llaves ni mantener indices secundarios y verifica la integridad al final")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reanuda la ultima ejecucion fallida omitiendo las tablas y bloques ya cargados")
+    parser.add_argument('--validate-only', action='store_true',
+                        help="Solo lee y valida los archivos CSV, sin conectarse a las bases de datos")
+    args = parser.parse_args(argv)
+    try:
+        run_pipeline(args)
+    except PipelineError as e:
+        logging.error(e)
         sys.exit(1)
 
-if __name__ == '__main__':
+def run_pipeline(args):
+    """
+    Ejecuta el pipeline de netflix con las opciones de main(); los errores de las etapas llegan
+    aqui como PipelineError, incluidos los de los hilos del scheduler y del productor solapado.
+    """
+    metrics.configure(METRICS['file'], args.profile, args.profiler)
+    
+    if args.clear_cache:
+        clear_cache(PARSE_CACHE['dir'])
+        clear_cache(STAGE_CACHE['dir'], 'Cache de etapas')
+    if args.no_cache:
+        PARSE_CACHE['enabled'] = False
+        STAGE_CACHE['enabled'] = False
+    if args.upsert:
+        UPSERT['enabled'] = True
     
     logging.info("Iniciando ejecucion de Pipeline")
-    # Crea la conexion a la base de datos transaccional de MySQL
-    logging.info("Iniciando conexion a la base de datos transaccional de MySQL")
-    transact_engine = create_db_engine(DATABASE_CONFIG['transact'])
+    if args.validate_only:
+        run_validate_only()
+        stage_cache.log_stats()
+        return
+    
+    # Los bloques dependen del modo de extraccion y de los tamanos de bloque; al reanudar deben ser los mismos
+    options = {
+        'extract': args.extract,
+        'out_of_core': args.out_of_core,
+        'chunksize': EXTRACT['chunksize'],
+        'page_size': EXTRACT['page_size'],
+        'users_per_block': WATCH_DATA['users_per_block'],
+    }
+    try:
+        manifest = RunManifest(RESUME['manifest_file'], options, args.resume)
+    except ValueError as e:
+        raise PipelineError(f"No se puede reanudar la ejecucion: {e}") from e
+    
+    # Las conexiones (y la resolucion del host) se crean con el primer acceso a cada base de datos:
+    # con la extraccion completa la Data Warehouse no se conecta hasta la carga
+    def connect_transact():
+        logging.info("Iniciando conexion a la base de datos transaccional de MySQL")
+        return create_db_engine(DATABASE_CONFIG['transact'], pool_size=EXTRACT['workers'])
+    
+    def connect_warehouse():
+        logging.info("Iniciando conexion a la Data Warehouse de MySQL")
+        return create_db_engine(DATABASE_CONFIG['warehouse'])
+    
+    transact_engine = LazyEngine(connect_transact)
+    warehouse_engine = LazyEngine(connect_warehouse)
     
     # Cargar y tranformacion todos los datos.
     logging.info("Iniciando lectura y transformacion de datos")
     dataframes = {}
     
     df_movie_awards = read_csv(CSV_FILES['award_movie'])
-    dataframes['movie_awards'] = transform_movie_award(df_movie_awards)
-    
-    df_movie_data = get_data_from_db(transact_engine)
-    dataframes['dimMovie'] = transform_movie_data(df_movie_data,df_movie_awards)
-    
-    df_users = read_csv(CSV_FILES['users'],sep='|')
-    dataframes['dimUser'] = transform_users(df_users)
+    dataframes['movie_awards'] = memoize_stage(transform_movie_award, {'df': df_movie_awards},
+                                               {'rules': QUALITY['rules']['movie_award']})
     
-    dataframes['FactWatchs'] = transform_watch_data(dataframes['dimUser'],dataframes['dimMovie'])
-    logging.info("Terminada la lectura y tranformacion de data")
-    
-    logging.info("Iniciando conexion a la Data Warehouse de MySQL")
-    warehouse_engine = create_db_engine(DATABASE_CONFIG['warehouse'])
-    load_order = ['dimMovie','dimUser','FactWatchs']
-    for table in load_order:
-        load_data(warehouse_engine, table, dataframes[table])
+    start = time.perf_counter()
+    try:
+        with load_mode(warehouse_engine, args.fast_load):
+            tables = transform_tables(transact_engine, warehouse_engine, dataframes['movie_awards'], dataframes, manifest, args)
+            if args.pipelined:
+                run_pipelined(tables, lambda item: load_complete_table(warehouse_engine, *item, manifest),
+                              PIPELINED['max_queue'], 'netflix')
+                logging.info("Terminada la lectura y tranformacion de data")
+            else:
+                tables = list(tables)
+                logging.info("Terminada la lectura y tranformacion de data")
+                for table, df in tables:
+                    load_complete_table(warehouse_engine, table, df, manifest)
+            
+            if args.out_of_core and not manifest.table_completed('FactWatchs'):
+                load_watch_data_blocks(warehouse_engine, dataframes['dimUser'], dataframes['dimMovie'], manifest)
+    except RuntimeError as e:
+        raise PipelineError(f"Error en la carga de datos a la Data Warehouse: {e}") from e
     
-    logging.info("Terminada la carga de datos a la Data Warehouse de MySQL")
-    logging.info("Pipeline de datos se ejecuto correctamente")
\ No newline at end of file
+    logging.info(f"Terminada la carga de datos a la Data Warehouse de MySQL en {time.perf_counter() - start:.3f}s "
+                 f"({'con' if args.fast_load else 'sin'} --fast-load)")
+    stage_cache.log_stats()
+    manifest.complete()
+    logging.info("Pipeline de datos se ejecuto correctamente")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
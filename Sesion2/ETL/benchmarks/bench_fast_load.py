@@ -0,0 +1,92 @@
+"""
+Benchmark del modo --fast-load (etl_utils/constraints.py).
+
+Crea en SQLite el esquema de mysql/data_warehouse_netflix.sql (llaves
+primarias, llaves foraneas de FactWatchs e indices sobre ellas, como los que
+crea InnoDB), carga las dimensiones y mide la carga de FactWatchs:
+
+    - normal: con PRAGMA foreign_keys = ON y los indices mantenidos fila por fila.
+    - fast-load: dentro de relaxed_constraints, incluyendo la reconstruccion de
+      indices y la verificacion de integridad.
+
+Uso (desde Sesion2/ETL):
+    python benchmarks/bench_fast_load.py --users 2000 --movies 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from etl_utils.bulk_loader import bulk_load
+from etl_utils.constraints import relaxed_constraints
+
+SCHEMA = [
+    "CREATE TABLE dimMovie (movieID INTEGER PRIMARY KEY, title VARCHAR(100))",
+    "CREATE TABLE dimUser (userID INTEGER PRIMARY KEY, username VARCHAR(100))",
+    "CREATE TABLE FactWatchs (userID INTEGER, movieID INTEGER, rating DECIMAL(2,1), timestamp TIMESTAMP, "
+    "CONSTRAINT fk_factwatchs_movie FOREIGN KEY (movieID) REFERENCES dimMovie (movieID), "
+    "CONSTRAINT fk_factwatchs_user FOREIGN KEY (userID) REFERENCES dimUser (userID))",
+    "CREATE INDEX ix_factwatchs_movie ON FactWatchs (movieID)",
+    "CREATE INDEX ix_factwatchs_user ON FactWatchs (userID)",
+]
+FOREIGN_KEYS = {'FactWatchs': {'movieID': ('dimMovie', 'movieID'), 'userID': ('dimUser', 'userID')}}
+UNIQUE_KEYS = {'dimMovie': 'movieID', 'dimUser': 'userID'}
+
+
+def create_warehouse(path, users, movies):
+    engine = create_engine(f"sqlite:///{path}")
+
+    # Sin el modo, SQLite verifica las llaves foraneas en cada fila (como InnoDB)
+    @event.listens_for(engine, 'connect')
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+    bulk_load(engine, 'dimMovie', pd.DataFrame({'movieID': movies, 'title': [f"Movie {i}" for i in movies]}))
+    bulk_load(engine, 'dimUser', pd.DataFrame({'userID': users, 'username': [f"user{i}" for i in users]}))
+    return engine
+
+
+def load(engine, df, fast_load):
+    start = time.perf_counter()
+    if fast_load:
+        with relaxed_constraints(engine, ['FactWatchs'], FOREIGN_KEYS, UNIQUE_KEYS):
+            bulk_load(engine, 'FactWatchs', df)
+    else:
+        bulk_load(engine, 'FactWatchs', df)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark del modo --fast-load")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--movies', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    users = np.arange(1, args.users + 1)
+    movies = np.arange(1, args.movies + 1)
+    df = pd.merge(pd.DataFrame({'userID': users}), pd.DataFrame({'movieID': movies}), how='cross')
+    df['rating'] = np.round(rng.uniform(0, 5, len(df)), 1)
+    df['timestamp'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, len(df)), unit='s')
+
+    seconds = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('normal', 'fast-load'):
+            engine = create_warehouse(os.path.join(tmp, f"{mode}.db"), users, movies)
+            seconds[mode] = load(engine, df, mode == 'fast-load')
+            engine.dispose()
+
+    print(f"Filas: {len(df)}")
+    for mode, value in seconds.items():
+        print(f"{mode + ':':<11} {value:.3f}s ({len(df) / value:.0f} filas/s)")
+    print(f"Aceleracion: {seconds['normal'] / seconds['fast-load']:.2f}x")
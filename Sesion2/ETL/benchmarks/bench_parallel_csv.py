@@ -0,0 +1,61 @@
+"""
+Benchmark de la lectura en paralelo por rangos de bytes (etl_utils/parallel_csv.py).
+
+Genera los archivos de 1.retail con generate_data.py y mide, para orders,
+customers y order_items, pandas.read_csv en un solo proceso contra
+read_csv_parallel con distinto numero de procesos, usando el esquema de
+CSV_FILES. Verifica ademas que ambos resultados sean identicos.
+
+Uso (desde Sesion2/ETL):
+    python benchmarks/bench_parallel_csv.py --scale 100 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ETL_DIR = os.path.dirname(BENCHMARKS_DIR)
+RETAIL_DIR = os.path.join(ETL_DIR, '1.retail')
+sys.path.insert(0, ETL_DIR)
+sys.path.insert(0, RETAIL_DIR)
+from etl_utils.parallel_csv import read_csv_parallel
+from generate_data import generate_retail
+
+TABLES = ['customers', 'orders', 'order_items']
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de la lectura en paralelo de 1.retail")
+    parser.add_argument('--scale', type=float, default=10)
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    # config.py de 1.retail define el esquema y usa rutas relativas a su carpeta
+    os.chdir(RETAIL_DIR)
+    from config import CSV_FILES
+    from main import csv_options
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_retail(tmp, args.scale)
+        print(f"CPUs: {os.cpu_count()}, escala {args.scale}x")
+        for table in TABLES:
+            config = CSV_FILES[table]
+            path = os.path.join(tmp, 'data', table)
+            options = csv_options(config['header'], config.get('dtypes'), config.get('date_columns'))
+            expected, serial = timed(pd.read_csv, path, **options)
+            print(f"{table}: {os.path.getsize(path) / 1024 ** 2:.0f} MB, {len(expected)} filas, "
+                  f"un proceso {serial:.3f}s")
+            for workers in args.workers:
+                df, seconds = timed(read_csv_parallel, path, options, workers, 0)
+                pd.testing.assert_frame_equal(df, expected)
+                print(f"    {workers:>3} procesos: {seconds:.3f}s ({serial / seconds:.2f}x)")
@@ -0,0 +1,82 @@
+"""
+Benchmark del tiempo de arranque en frio de etl.py.
+
+Ejecuta cada comando en un proceso nuevo (sobre una copia de Sesion2/ETL con
+datos de generate_data.py, para no escribir logs ni caches en el repositorio)
+y reporta el minimo y la mediana del tiempo de pared:
+
+    - <pipeline> --help: solo la importacion del pipeline y el parseo de opciones.
+    - <pipeline> --validate-only --no-cache: lectura y validacion de los CSV
+      sin conexion a la base de datos.
+
+Tambien indica si SQLAlchemy llego a importarse (python -X importtime) y, como
+referencia, cuanto cuesta importarlo.
+
+Uso (desde Sesion2/ETL):
+    python benchmarks/bench_startup.py --repeat 5 --scale 1
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_data import generate_retail, generate_netflix
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ETL_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+GENERATORS = {
+    'retail': ('1.retail', generate_retail),
+    'netflix': ('2.netflix', generate_netflix),
+}
+COMMANDS = {
+    'help': ['--help'],
+    'validate-only': ['--validate-only', '--no-cache'],
+}
+
+
+def run(cwd, argv, repeat):
+    """
+    Ejecuta argv repeat veces en procesos nuevos.
+
+    Returns:
+        tuple: (tiempos en segundos, True si SQLAlchemy se importo).
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        seconds.append(time.perf_counter() - start)
+    imports = subprocess.run([sys.executable, '-X', 'importtime'] + argv, cwd=cwd, check=True,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    return seconds, 'sqlalchemy' in imports
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark del arranque en frio de etl.py")
+    parser.add_argument('--pipeline', nargs='+', choices=['retail', 'netflix'], default=['retail', 'netflix'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = os.path.join(tmp, 'ETL')
+        shutil.copytree(ETL_DIR, workdir,
+                        ignore=shutil.ignore_patterns('benchmarks', '.cache', 'state', 'quarantine', '__pycache__'))
+        for pipeline in args.pipeline:
+            directory, generate = GENERATORS[pipeline]
+            generate(os.path.join(workdir, directory), args.scale)
+
+        baseline, _ = run(workdir, ['-c', 'pass'], args.repeat)
+        sqlalchemy, _ = run(workdir, ['-c', 'import sqlalchemy'], args.repeat)
+        print(f"{'python -c pass':<32} min {min(baseline):.3f}s  mediana {statistics.median(baseline):.3f}s")
+        print(f"{'python -c import sqlalchemy':<32} min {min(sqlalchemy):.3f}s  mediana {statistics.median(sqlalchemy):.3f}s")
+        for pipeline in args.pipeline:
+            for name, options in COMMANDS.items():
+                seconds, imported = run(workdir, ['etl.py', pipeline] + options, args.repeat)
+                print(f"{f'etl.py {pipeline} {name}':<32} min {min(seconds):.3f}s  mediana "
+                      f"{statistics.median(seconds):.3f}s  sqlalchemy {'importado' if imported else 'no importado'}")
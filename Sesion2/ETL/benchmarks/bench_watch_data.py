@@ -0,0 +1,98 @@
+"""
+Benchmark de la generacion sintetica de FactWatchs en 2.netflix/main.py.
+
+Compara la generacion fila por fila original (gen_rating / gen_timestamp con
+apply, que se conservan aqui como implementacion de referencia) contra la
+generacion vectorizada con numpy.random.Generator que usa transform_watch_data.
+
+Uso (desde Sesion2/ETL):
+    python benchmarks/bench_watch_data.py --users 2000 --movies 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+NETFLIX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '2.netflix')
+
+
+def gen_rating():
+    """
+    Genera una calificación aleatoria entre 0 y 5 con un decimal.
+
+    Returns:
+        float: Calificación aleatoria de película.
+    """
+    return round(random.uniform(0, 5), 1)
+
+
+def gen_timestamp():
+    """
+    Genera un timestamp aleatorio dentro del año 2024.
+
+    Returns:
+        datetime: Fecha y hora aleatoria.
+    """
+    start_date = datetime(2024, 1, 1)
+    end_date = datetime(2024, 12, 31)
+
+    random_date = start_date + timedelta(seconds=random.randint(0, int((end_date - start_date).total_seconds())))
+    return random_date
+
+
+def per_row(df):
+    df = df.copy()
+    df["rating"] = df["movieID"].apply(lambda x: gen_rating())
+    df["timestamp"] = df["userID"].apply(lambda x: gen_timestamp())
+    return df
+
+
+def vectorized(df, main, seed):
+    df = df.copy()
+    rng = np.random.default_rng(seed)
+    df["rating"] = main.gen_ratings(rng, len(df))
+    df["timestamp"] = main.gen_timestamps(rng, len(df))
+    return df
+
+
+def best_of(repeat, fn, *args):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de la generacion de FactWatchs")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--movies', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    # main.py usa rutas relativas a su carpeta (config y logs)
+    os.chdir(NETFLIX_DIR)
+    sys.path.insert(0, NETFLIX_DIR)
+    import main
+
+    users = pd.DataFrame({'userID': np.arange(args.users)})
+    movies = pd.DataFrame({'movieID': np.arange(args.movies)})
+    df = pd.merge(users, movies, how='cross')
+
+    per_row_seconds = best_of(args.repeat, per_row, df)
+    vectorized_seconds = best_of(args.repeat, vectorized, df, main, args.seed)
+
+    # Misma semilla, mismos datos
+    assert vectorized(df, main, args.seed).equals(vectorized(df, main, args.seed))
+
+    print(f"Filas: {len(df)}")
+    print(f"Fila por fila: {per_row_seconds:.3f}s ({len(df) / per_row_seconds:.0f} filas/s)")
+    print(f"Vectorizado:   {vectorized_seconds:.3f}s ({len(df) / vectorized_seconds:.0f} filas/s)")
+    print(f"Aceleracion:   {per_row_seconds / vectorized_seconds:.1f}x")
@@ -0,0 +1,196 @@
+"""
+Generador de datos sinteticos compatibles con los pipelines de ETL.
+
+Genera, para un factor de escala dado, los archivos de entrada de 1.retail
+(customers, departments, categories, products, orders, order_items separados
+por '|' y sin encabezado) y de 2.netflix (users.csv, Awards_movie.csv y una
+base de datos SQLite con las tablas transaccionales que consulta QUERY).
+
+La escala 1 corresponde al tamano de los datos de ejemplo del repositorio.
+
+Uso (desde Sesion2/ETL):
+    python benchmarks/generate_data.py --pipeline retail --scale 10 --output /tmp/retail_10x
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+# Filas de cada tabla con escala 1
+RETAIL_BASE_ROWS = {
+    'departments': 6,
+    'categories': 58,
+    'products': 1345,
+    'customers': 12435,
+    'orders': 68883,
+    'order_items': 172198,
+}
+NETFLIX_BASE_ROWS = {
+    'users': 20,
+    'movies': 3,
+}
+
+ORDER_STATUS = ['CLOSED', 'PENDING_PAYMENT', 'COMPLETE', 'PROCESSING', 'PAYMENT_REVIEW',
+                'PENDING', 'ON_HOLD', 'CANCELED', 'SUSPECTED_FRAUD']
+STATES = ['TX', 'CO', 'PR', 'CA', 'NY', 'IL', 'FL', 'OH', 'PA', 'MI']
+CITIES = ['Brownsville', 'Littleton', 'Caguas', 'San Marcos', 'Chicago', 'Los Angeles',
+          'Brooklyn', 'Miami', 'Columbus', 'Philadelphia']
+
+
+def _write(df, path):
+    df.to_csv(path, sep='|', header=False, index=False)
+
+
+def generate_retail(output_dir, scale, seed=0):
+    """
+    Genera los archivos de 1.retail en output_dir/data.
+
+    Returns:
+        dict: Filas generadas por tabla.
+    """
+    rng = np.random.default_rng(seed)
+    data_dir = os.path.join(output_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+
+    # Las dimensiones pequenas no escalan; products, customers y los hechos si
+    rows = {
+        'departments': RETAIL_BASE_ROWS['departments'],
+        'categories': RETAIL_BASE_ROWS['categories'],
+        'products': int(RETAIL_BASE_ROWS['products'] * scale),
+        'customers': int(RETAIL_BASE_ROWS['customers'] * scale),
+        'orders': int(RETAIL_BASE_ROWS['orders'] * scale),
+        'order_items': int(RETAIL_BASE_ROWS['order_items'] * scale),
+    }
+
+    department_ids = np.arange(2, rows['departments'] + 2)
+    _write(pd.DataFrame({
+        'department_id': department_ids,
+        'department_name': [f"Department {i}" for i in department_ids],
+    }), os.path.join(data_dir, 'departments'))
+
+    category_ids = np.arange(1, rows['categories'] + 1)
+    _write(pd.DataFrame({
+        'category_id': category_ids,
+        'category_department_id': rng.choice(department_ids, rows['categories']),
+        'category_name': [f"Category {i}" for i in category_ids],
+    }), os.path.join(data_dir, 'categories'))
+
+    product_ids = np.arange(1, rows['products'] + 1)
+    prices = np.round(rng.uniform(5, 2000, rows['products']), 2)
+    _write(pd.DataFrame({
+        'product_id': product_ids,
+        'product_category_id': rng.choice(category_ids, rows['products']),
+        'product_name': [f"Product {i}" for i in product_ids],
+        'product_description': '',
+        'product_price': prices,
+        'product_image': [f"http://images.acmesports.sports/Product+{i}" for i in product_ids],
+    }), os.path.join(data_dir, 'products'))
+
+    customer_ids = np.arange(1, rows['customers'] + 1)
+    _write(pd.DataFrame({
+        'customer_id': customer_ids,
+        'customer_fname': [f"Name{i % 200}" for i in customer_ids],
+        'customer_lname': [f"Last{i % 1000}" for i in customer_ids],
+        'customer_email': 'XXXXXXXXX',
+        'customer_password': 'XXXXXXXXX',
+        'customer_street': [f"{i} Main Street" for i in customer_ids],
+        'customer_city': rng.choice(CITIES, rows['customers']),
+        'customer_state': rng.choice(STATES, rows['customers']),
+        'customer_zipcode': rng.integers(10000, 99999, rows['customers']),
+    }), os.path.join(data_dir, 'customers'))
+
+    order_ids = np.arange(1, rows['orders'] + 1)
+    dates = pd.Timestamp('2013-07-25') + pd.to_timedelta(np.sort(rng.integers(0, 365, rows['orders'])), unit='D')
+    _write(pd.DataFrame({
+        'order_id': order_ids,
+        'order_date': dates.strftime('%Y-%m-%d %H:%M:%S.0'),
+        'order_customer_id': rng.choice(customer_ids, rows['orders']),
+        'order_status': rng.choice(ORDER_STATUS, rows['orders']),
+    }), os.path.join(data_dir, 'orders'))
+
+    item_products = rng.choice(product_ids, rows['order_items'])
+    item_prices = prices[item_products - 1]
+    quantities = rng.integers(1, 6, rows['order_items'])
+    _write(pd.DataFrame({
+        'order_item_id': np.arange(1, rows['order_items'] + 1),
+        'order_item_order_id': np.sort(rng.choice(order_ids, rows['order_items'])),
+        'order_item_product_id': item_products,
+        'order_item_quantity': quantities,
+        'order_item_subtotal': quantities * item_prices,
+        'order_item_product_price': item_prices,
+    }), os.path.join(data_dir, 'order_items'))
+
+    return rows
+
+
+def generate_netflix(output_dir, scale, seed=0):
+    """
+    Genera los archivos de 2.netflix en output_dir/data y la base de datos
+    transaccional output_dir/transact.db.
+
+    Returns:
+        dict: Filas generadas por tabla.
+    """
+    rng = np.random.default_rng(seed)
+    data_dir = os.path.join(output_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+
+    rows = {name: int(base * scale) for name, base in NETFLIX_BASE_ROWS.items()}
+
+    user_ids = np.arange(1002331, 1002331 + rows['users'])
+    pd.DataFrame({
+        'idUser': user_ids,
+        'username': [f"user{i}" for i in user_ids],
+        'country': rng.choice(['USA', 'Canada', 'Peru', 'Mexico'], rows['users']),
+        'subscription': rng.choice(['Basic', 'Standard', 'Premium'], rows['users']),
+    }).to_csv(os.path.join(data_dir, 'users.csv'), sep='|', index=False)
+
+    movie_ids = np.arange(80000000, 80000000 + rows['movies'])
+    pd.DataFrame({
+        'movieID': movie_ids,
+        'IdAward': np.arange(rows['movies']),
+        'Aware': rng.choice(['Oscar', 'Grammy', 'Emmy'], rows['movies']),
+    }).to_csv(os.path.join(data_dir, 'Awards_movie.csv'), index=False)
+
+    db_path = os.path.join(output_dir, 'transact.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    engine = create_engine(f"sqlite:///{db_path}")
+    movie_keys = [str(i) for i in movie_ids]
+    pd.DataFrame({
+        'movieID': movie_keys,
+        'movieTitle': [f"Movie {i}" for i in movie_ids],
+        'releaseDate': '2020-01-01',
+    }).to_sql('movie', engine, index=False)
+    pd.DataFrame({
+        'personID': movie_keys,
+        'name': [f"Person {i}" for i in movie_ids],
+        'birthday': '1990-01-01',
+    }).to_sql('person', engine, index=False)
+    pd.DataFrame({
+        'movieID': movie_keys,
+        'personID': movie_keys,
+        'participantRole': rng.choice(['Actor', 'Director'], rows['movies']),
+    }).to_sql('participant', engine, index=False)
+    pd.DataFrame({'genderID': [1, 2, 3], 'name': ['Action', 'Drama', 'Comedy']}).to_sql('gender', engine, index=False)
+    pd.DataFrame({
+        'movieID': movie_keys,
+        'genderID': rng.integers(1, 4, rows['movies']),
+    }).to_sql('movie_gender', engine, index=False)
+    engine.dispose()
+
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Genera datos sinteticos para los pipelines de ETL")
+    parser.add_argument('--pipeline', choices=['retail', 'netflix'], required=True)
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    generate = generate_retail if args.pipeline == 'retail' else generate_netflix
+    print(generate(args.output, args.scale, args.seed))
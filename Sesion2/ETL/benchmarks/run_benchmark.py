@@ -0,0 +1,251 @@
+"""
+Benchmark de extremo a extremo de los pipelines de ETL.
+
+Para cada pipeline y factor de escala genera datos sinteticos
+(generate_data.py), ejecuta main.py contra bases de datos SQLite locales y
+registra por etapa (lectura, cada transform_* y cada load_data) el tiempo,
+las filas por segundo y el pico de memoria (RSS). Los resultados se guardan en
+un archivo JSON para comparar entre commits.
+
+El RSS es del proceso completo: cuando varias etapas se ejecutan a la vez
+(carga paralela, --pipelined) el pico de cada una incluye la memoria de las
+demas, por lo que se marca como aproximado (peak_rss_approximate, '~' en el
+resumen). El pico del proceso (peak_rss_bytes de la ejecucion) es exacto.
+
+Cada ejecucion corre en un subproceso propio, ya que los dos pipelines tienen
+modulos config y main con el mismo nombre.
+
+Uso (desde Sesion2/ETL):
+    python benchmarks/run_benchmark.py --pipeline retail netflix --scale 1 10
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ETL_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, ETL_DIR)
+from etl_utils.metrics import current_rss
+
+PIPELINE_DIRS = {
+    'retail': os.path.join(ETL_DIR, '1.retail'),
+    'netflix': os.path.join(ETL_DIR, '2.netflix'),
+}
+
+# Funciones de main.py que se miden como etapas
+STAGES = {
+    'retail': ['read_csv', 'transform_departments', 'transform_customers', 'transform_products',
+               'transform_orders', 'transform_order_items', 'load_data'],
+    'netflix': ['read_csv', 'get_data_from_db', 'transform_movie_award', 'transform_movie_data',
+                'transform_users', 'transform_watch_data', 'load_data'],
+}
+
+
+class RssSampler(threading.Thread):
+    """
+    Muestrea la memoria residente del proceso para obtener el pico de cada etapa.
+    Cada etapa en curso lleva su propio pico, de modo que iniciar una etapa no
+    borra el de las que se ejecutan en paralelo; las etapas que coinciden en el
+    tiempo quedan marcadas como solapadas.
+    """
+
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self._active = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def run(self):
+        while True:
+            rss = current_rss()
+            with self._lock:
+                for stage in self._active.values():
+                    stage['peak'] = max(stage['peak'], rss)
+            time.sleep(self.interval)
+
+    def begin(self):
+        """
+        Inicia la medicion de una etapa y devuelve su identificador.
+        """
+        with self._lock:
+            self._next_id += 1
+            for stage in self._active.values():
+                stage['overlapped'] = True
+            self._active[self._next_id] = {'peak': current_rss(), 'overlapped': bool(self._active)}
+            return self._next_id
+
+    def end(self, stage_id):
+        """
+        Termina la medicion de una etapa.
+
+        Returns:
+            tuple: Pico de RSS durante la etapa y si se solapo con otra etapa.
+        """
+        with self._lock:
+            stage = self._active.pop(stage_id)
+            return max(stage['peak'], current_rss()), stage['overlapped']
+
+
+def _rows(value):
+    return len(value) if hasattr(value, '__len__') and not isinstance(value, (str, bytes)) else None
+
+
+def instrument(module, name, records, sampler):
+    """
+    Reemplaza la funcion name del modulo (y sus referencias en el diccionario
+    TRANSFORMS del modulo, si existe) por una version que registra el tiempo,
+    las filas y el pico de memoria de cada llamada.
+    """
+    original = getattr(module, name)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        table = args[1] if name == 'load_data' else (args[0] if name == 'read_csv' else None)
+        stage_id = sampler.begin()
+        start = time.perf_counter()
+        try:
+            result = original(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            peak, overlapped = sampler.end(stage_id)
+        rows = _rows(args[2]) if name == 'load_data' else _rows(result)
+        records.append({
+            'stage': name if table is None else f"{name}:{table}",
+            'seconds': seconds,
+            'rows': rows,
+            'rows_per_sec': rows / seconds if rows is not None and seconds > 0 else None,
+            'peak_rss_bytes': peak,
+            'peak_rss_approximate': overlapped,
+        })
+        return result
+
+    setattr(module, name, wrapper)
+    transforms = getattr(module, 'TRANSFORMS', {})
+    for table, function in transforms.items():
+        if function is original:
+            transforms[table] = wrapper
+
+
+def run_worker(pipeline, workdir, argv):
+    """
+    Ejecuta un pipeline en este proceso con las etapas instrumentadas y
+    devuelve sus metricas. Se invoca en un subproceso por run_pipeline.
+    """
+    os.chdir(workdir)
+    os.makedirs('logs', exist_ok=True)
+    sys.path.insert(0, PIPELINE_DIRS[pipeline])
+
+    # Las bases de datos destino (y la transaccional de netflix) son SQLite locales
+    import config
+    if pipeline == 'retail':
+        config.DATABASE_CONFIG['url'] = f"sqlite:///{os.path.join(workdir, 'retail.db')}"
+    else:
+        config.DATABASE_CONFIG['transact']['url'] = f"sqlite:///{os.path.join(workdir, 'transact.db')}"
+        config.DATABASE_CONFIG['warehouse']['url'] = f"sqlite:///{os.path.join(workdir, 'warehouse.db')}"
+    # Se mide el parseo y cada transformacion, sin reutilizar resultados guardados
+    config.PARSE_CACHE['enabled'] = False
+    config.STAGE_CACHE['enabled'] = False
+
+    import main
+
+    records = []
+    sampler = RssSampler()
+    sampler.start()
+    for name in STAGES[pipeline]:
+        instrument(main, name, records, sampler)
+
+    start = time.perf_counter()
+    main.main(argv)
+    wall = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'wall_seconds': wall,
+        'peak_rss_bytes': peak if sys.platform == 'darwin' else peak * 1024,
+        'stages': records,
+    }
+
+
+def run_pipeline(pipeline, scale, argv, keep=False):
+    """
+    Genera los datos de una escala y ejecuta el pipeline en un subproceso.
+
+    Returns:
+        dict: Metricas de la ejecucion.
+    """
+    from generate_data import generate_retail, generate_netflix
+
+    workdir = tempfile.mkdtemp(prefix=f"bench_{pipeline}_{scale}x_")
+    generate = generate_retail if pipeline == 'retail' else generate_netflix
+    input_rows = generate(workdir, scale)
+
+    output = os.path.join(workdir, 'metrics.json')
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', pipeline,
+                    '--workdir', workdir, '--output', output, '--'] + argv, check=True)
+    with open(output, encoding='utf-8') as f:
+        metrics = json.load(f)
+
+    if not keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {'pipeline': pipeline, 'scale': scale, 'args': argv, 'input_rows': input_rows, **metrics}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ETL_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo de los pipelines de ETL")
+    parser.add_argument('--pipeline', nargs='+', choices=list(PIPELINE_DIRS), default=list(PIPELINE_DIRS))
+    parser.add_argument('--scale', nargs='+', type=float, default=[1])
+    parser.add_argument('--output', help="Archivo JSON de resultados")
+    parser.add_argument('--keep', action='store_true', help="No elimina los directorios de trabajo")
+    parser.add_argument('--worker', choices=list(PIPELINE_DIRS), help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('pipeline_args', nargs='*', help="Argumentos para main.py (despues de --)")
+    args = parser.parse_args()
+
+    if args.worker:
+        metrics = run_worker(args.worker, args.workdir, args.pipeline_args)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f)
+        sys.exit(0)
+
+    sys.path.insert(0, BENCHMARKS_DIR)
+    results = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': [],
+    }
+    for pipeline in args.pipeline:
+        for scale in args.scale:
+            run = run_pipeline(pipeline, scale, args.pipeline_args, args.keep)
+            results['runs'].append(run)
+            print(f"{pipeline} {scale}x: {run['wall_seconds']:.2f}s, pico RSS {run['peak_rss_bytes'] / 1024 ** 2:.0f} MB")
+            for stage in run['stages']:
+                rate = f"{stage['rows_per_sec']:.0f} filas/s" if stage['rows_per_sec'] else '-'
+                print(f"    {stage['stage']:<45} {stage['seconds']:8.3f}s  {rate:>18}  "
+                      f"{'~' if stage['peak_rss_approximate'] else ' '}{stage['peak_rss_bytes'] / 1024 ** 2:7.0f} MB")
+
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, 'results', f"{datetime.now():%Y%m%d_%H%M%S}_{results['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados guardados en {output}")
@@ -0,0 +1,62 @@
+"""
+Punto de entrada comun de los pipelines ETL.
+
+    python etl.py retail [opciones del pipeline de retail]
+    python etl.py netflix [opciones del pipeline de netflix]
+    python etl.py retail --validate-only
+
+Cada subcomando ejecuta main() de su carpeta (1.retail o 2.netflix) con las
+opciones restantes, desde esa carpeta para que sus rutas relativas (data, logs,
+state, .cache) sean las mismas que al ejecutar su main.py. El modulo del
+pipeline (pandas, NumPy y etl_utils) se importa solo despues de elegir el
+subcomando, y SQLAlchemy solo al conectarse a la base de datos. El tiempo de
+arranque (importacion hasta poder ejecutar) y el total se registran en el log
+del pipeline.
+"""
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PIPELINES = {
+    'retail': ('1.retail', "Pipeline ETL de retail"),
+    'netflix': ('2.netflix', "Pipeline ETL de netflix"),
+}
+
+
+def run(pipeline, argv):
+    """
+    Importa y ejecuta el pipeline con argv desde su carpeta.
+    """
+    directory = os.path.join(BASE_DIR, PIPELINES[pipeline][0])
+    os.chdir(directory)
+    # main.py importa su config.py de la carpeta del pipeline (y agrega etl_utils por su cuenta)
+    sys.path.insert(0, directory)
+    module = importlib.import_module('main')
+    logging.info(f"Arranque del pipeline {pipeline}: {time.perf_counter() - _START:.3f}s "
+                 f"(importacion de modulos)")
+    try:
+        module.main(argv)
+    finally:
+        logging.info(f"Ejecucion del pipeline {pipeline} desde etl.py: {time.perf_counter() - _START:.3f}s en total")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipelines ETL de retail y netflix")
+    subparsers = parser.add_subparsers(dest='pipeline', required=True)
+    for name, (_, description) in PIPELINES.items():
+        # Las opciones (incluido --help) las interpreta el main() del pipeline
+        subparsers.add_parser(name, help=description, add_help=False)
+    args, pipeline_argv = parser.parse_known_args(argv)
+    run(args.pipeline, pipeline_argv)
+
+
+if __name__ == '__main__':
+    main()
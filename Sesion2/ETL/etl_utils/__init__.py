@@ -0,0 +1,3 @@
+"""
+Utilidades compartidas por los pipelines de ETL (1.retail y 2.netflix).
+"""
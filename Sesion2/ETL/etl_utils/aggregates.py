@@ -0,0 +1,152 @@
+"""
+Tablas de agregados mantenidas durante la carga.
+
+AggregateBuilder guarda los atributos de las tablas padre necesarios para
+agregar las tablas de hechos (lookups indexados por llave) y las sumas
+parciales de cada bloque cargado. Las sumas parciales se guardan en un archivo
+de estado por (agregado, bloque), de modo que un bloque que se vuelve a cargar
+al reanudar reemplaza su suma parcial en lugar de duplicarla.
+
+Al final de la ejecucion merge_partitions escribe cada agregado: reemplaza la
+tabla completa o, en cargas incrementales, combina solo las particiones (por
+ejemplo, los dias) que recibieron filas nuevas.
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+
+class AggregateBuilder:
+    """
+    Lookups de tablas padre y sumas parciales por bloque. Es seguro usarlo
+    desde varios hilos.
+    """
+
+    def __init__(self, state_file, resume=False):
+        """
+        Parameters:
+            state_file (str): Archivo donde se guardan las sumas parciales.
+            resume (bool): Conserva las sumas parciales de la ejecucion reanudada.
+        """
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._lookups = {}
+        self._partials = {}
+        if resume and os.path.exists(state_file):
+            with open(state_file, 'rb') as f:
+                self._partials = pickle.load(f)
+            logging.info(f"Se recuperaron {len(self._partials)} sumas parciales de la ejecucion reanudada")
+        else:
+            self.clear()
+
+    def register_lookup(self, table_name, key_column, df):
+        """
+        Guarda las columnas de una tabla padre indexadas por su llave.
+        """
+        lookup = df.drop_duplicates(key_column).set_index(key_column)
+        with self._lock:
+            self._lookups[table_name] = lookup
+
+    def lookup(self, table_name, column, keys):
+        """
+        Devuelve la columna de la tabla padre para cada llave.
+
+        Raises:
+            KeyError: Si alguna llave no existe en la tabla padre.
+        """
+        with self._lock:
+            table = self._lookups[table_name]
+        positions = table.index.get_indexer(keys)
+        if (positions == -1).any():
+            raise KeyError(f"{int((positions == -1).sum())} llaves no existen en {table_name}")
+        return table[column].to_numpy()[positions]
+
+    def add(self, name, chunk, df):
+        """
+        Guarda la suma parcial de un bloque para el agregado name.
+        """
+        with self._lock:
+            self._partials[(name, chunk)] = df
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.state_file}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump(self._partials, f)
+            os.replace(tmp, self.state_file)
+
+    def result(self, name, keys, measures):
+        """
+        Combina las sumas parciales del agregado.
+
+        Returns:
+            pd.DataFrame: Sumas por grupo, o None si no hubo filas.
+        """
+        with self._lock:
+            frames = [df for (partial, _), df in self._partials.items() if partial == name and len(df)]
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True).groupby(keys, as_index=False, observed=True)[measures].sum()
+
+    def clear(self):
+        """
+        Descarta las sumas parciales y su archivo de estado.
+        """
+        with self._lock:
+            self._partials = {}
+            try:
+                os.remove(self.state_file)
+            except FileNotFoundError:
+                pass
+
+
+def merge_partitions(conn, table_name, df, partition_column, keys, measures, replace=False,
+                     batch_size=None):
+    """
+    Escribe un agregado en la tabla. Con replace se reemplaza la tabla completa;
+    si no, solo se leen, suman y reescriben las particiones presentes en df.
+
+    Parameters:
+        conn (sqlalchemy.engine.Connection): Conexion dentro de una transaccion.
+        table_name (str): Tabla del agregado.
+        df (pd.DataFrame): Sumas nuevas por grupo.
+        partition_column (str): Columna de particion (por ejemplo date_key).
+        keys (list): Columnas del grupo.
+        measures (list): Columnas que se suman.
+        replace (bool): Reemplaza la tabla en lugar de combinar particiones.
+        batch_size (int): Filas por lote (por defecto el del bulk loader).
+
+    Returns:
+        int: Filas escritas.
+    """
+    # SQLAlchemy y el bulk loader se importan solo al usar la base de datos (ver etl_utils/db.py)
+    from sqlalchemy import bindparam, inspect, text
+    from etl_utils.bulk_loader import load_executemany, DEFAULT_BATCH_SIZE
+
+    start = time.perf_counter()
+    quote = conn.dialect.identifier_preparer.quote
+    exists = inspect(conn).has_table(table_name)
+    if replace or not exists:
+        if exists:
+            conn.execute(text(f"DELETE FROM {quote(table_name)}"))
+        merged = df
+    else:
+        partitions = [value.item() if hasattr(value, 'item') else value for value in pd.unique(df[partition_column])]
+        where = f"WHERE {quote(partition_column)} IN :partitions"
+        select = text(f"SELECT * FROM {quote(table_name)} {where}").bindparams(bindparam('partitions', expanding=True))
+        delete = text(f"DELETE FROM {quote(table_name)} {where}").bindparams(bindparam('partitions', expanding=True))
+        frames = [df]
+        for i in range(0, len(partitions), 1000):
+            batch = {'partitions': partitions[i:i + 1000]}
+            frames.append(pd.read_sql(select, conn, params=batch))
+            conn.execute(delete, batch)
+        merged = pd.concat(frames, ignore_index=True).groupby(keys, as_index=False)[measures].sum()
+
+    load_executemany(conn, table_name, merged[keys + measures], batch_size or DEFAULT_BATCH_SIZE)
+    mode = 'reemplazada' if replace or not exists else f"combinada en {merged[partition_column].nunique()} particiones"
+    logging.info(f"Tabla de agregados {table_name} {mode}: {len(merged)} filas en {time.perf_counter() - start:.3f}s")
+    return len(merged)
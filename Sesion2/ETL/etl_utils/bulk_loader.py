@@ -0,0 +1,223 @@
+"""
+Carga masiva de DataFrames a la base de datos.
+
+Ofrece varias estrategias de carga y elige la mas rapida que soporte el motor
+de base de datos, pasando a la siguiente si alguna falla:
+
+    - load_data_infile: LOAD DATA LOCAL INFILE desde un archivo temporal
+      separado por '|' (solo MySQL).
+    - executemany: INSERT parametrizado enviado en lotes de batch_size filas.
+    - multi: INSERT de varias filas por sentencia usando DataFrame.to_sql.
+
+Cada estrategia se ejecuta dentro de una transaccion, de modo que si falla no
+deja filas a medias. Solo se pasa a la siguiente estrategia cuando la actual no
+esta disponible (NotImplementedError, por ejemplo si local_infile esta
+deshabilitado); cualquier otro error (llaves duplicadas, datos invalidos) se
+propaga para no reintentar el mismo lote con otra estrategia.
+"""
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Limite de parametros por sentencia en SQLite (versiones antiguas usan 999).
+SQLITE_MAX_VARIABLES = 999
+
+# Errores de MySQL cuando LOAD DATA LOCAL INFILE no esta habilitado en el cliente o en el servidor
+LOCAL_INFILE_DISABLED = {1148, 2068, 3948}
+
+# Secuencias de escape de LOAD DATA (ESCAPED BY '\\'); la barra invertida va primero
+INFILE_ESCAPES = (('\\', '\\\\'), ('"', '\\"'), ('\n', '\\n'), ('\r', '\\r'))
+
+
+def _prepare_rows(df):
+    """
+    Convierte el DataFrame a valores que entienden todos los drivers:
+    fechas como texto ISO, booleanos como 0/1 y nulos como None.
+
+    Returns:
+        pd.DataFrame: Copia del DataFrame con dtype object.
+    """
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S')
+        elif pd.api.types.is_bool_dtype(df[column]):
+            df[column] = df[column].astype('Int8')
+    df = df.astype(object)
+    return df.where(df.notna(), None)
+
+
+def _create_table_if_missing(conn, table_name, df):
+    """
+    Crea la tabla con el esquema del DataFrame si todavia no existe.
+    """
+    df.head(0).to_sql(name=table_name, con=conn, if_exists='append', index=False)
+
+
+def _infile_column(values):
+    """
+    Da formato a una columna para LOAD DATA: los nulos como \\N y los textos entre
+    comillas dobles con sus secuencias de escape (INFILE_ESCAPES).
+
+    Returns:
+        pd.Series: Campos de la columna como texto.
+    """
+    formatted = values.astype(str)
+    is_text = values.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    if is_text.any():
+        escaped = formatted[is_text]
+        for char, replacement in INFILE_ESCAPES:
+            escaped = escaped.str.replace(char, replacement, regex=False)
+        formatted[is_text] = '"' + escaped + '"'
+    formatted[values.isna().to_numpy()] = '\\N'
+    return formatted
+
+
+def load_multi(conn, table_name, df, batch_size):
+    """
+    Carga usando INSERT de multiples filas por sentencia.
+    """
+    chunksize = batch_size
+    if conn.dialect.name == 'sqlite':
+        chunksize = max(1, min(batch_size, SQLITE_MAX_VARIABLES // max(1, len(df.columns))))
+    df.to_sql(name=table_name, con=conn, if_exists='append', index=False,
+              method='multi', chunksize=chunksize)
+
+
+def load_executemany(conn, table_name, df, batch_size):
+    """
+    Carga usando un INSERT parametrizado ejecutado con executemany por lotes.
+    """
+    _create_table_if_missing(conn, table_name, df)
+
+    quote = conn.dialect.identifier_preparer.quote
+    params = [f"p{i}" for i in range(len(df.columns))]
+    stmt = text(
+        f"INSERT INTO {quote(table_name)} ({', '.join(quote(c) for c in df.columns)}) "
+        f"VALUES ({', '.join(':' + p for p in params)})"
+    )
+
+    rows = _prepare_rows(df)
+    for start in range(0, len(rows), batch_size):
+        batch = rows.iloc[start:start + batch_size].itertuples(index=False, name=None)
+        conn.execute(stmt, [dict(zip(params, row)) for row in batch])
+
+
+def load_data_infile(conn, table_name, df, batch_size):
+    """
+    Carga usando LOAD DATA LOCAL INFILE de MySQL a partir de un archivo
+    temporal separado por '|'. Requiere local_infile habilitado en el
+    cliente y en el servidor.
+    """
+    if conn.dialect.name != 'mysql':
+        raise NotImplementedError("LOAD DATA LOCAL INFILE solo esta disponible en MySQL")
+
+    _create_table_if_missing(conn, table_name, df)
+
+    quote = conn.dialect.identifier_preparer.quote
+    rows = _prepare_rows(df)
+    fd, path = tempfile.mkstemp(suffix='.psv')
+    try:
+        # El escape lo hace _infile_column: el escapechar de to_csv tambien escaparia el \N de los nulos
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as tmp:
+            if len(rows):
+                columns = [_infile_column(rows[column]) for column in rows.columns]
+                tmp.write('\n'.join(columns[0].str.cat(columns[1:], sep='|')))
+                tmp.write('\n')
+        # La ruta va dentro de un literal de SQL (en Windows contiene barras invertidas)
+        literal = path.replace('\\', '\\\\').replace("'", "\\'")
+        try:
+            conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{literal}' INTO TABLE {quote(table_name)} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '|' OPTIONALLY ENCLOSED BY '\"' "
+                f"ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(quote(c) for c in df.columns)})"
+            )
+        except DBAPIError as e:
+            code = e.orig.args[0] if e.orig is not None and e.orig.args else None
+            if code in LOCAL_INFILE_DISABLED:
+                raise NotImplementedError(f"LOAD DATA LOCAL INFILE no esta habilitado: {e.orig}") from e
+            raise
+    finally:
+        os.remove(path)
+
+
+STRATEGIES = {
+    'load_data_infile': load_data_infile,
+    'executemany': load_executemany,
+    'multi': load_multi,
+}
+
+
+def strategies_for(engine):
+    """
+    Devuelve las estrategias soportadas por el motor, de la mas rapida a la
+    mas lenta.
+
+    Returns:
+        list: Nombres de las estrategias en orden de preferencia.
+    """
+    if engine.dialect.name == 'mysql':
+        return ['load_data_infile', 'executemany', 'multi']
+    return ['executemany', 'multi']
+
+
+def bulk_load(engine, table_name, df, strategy='auto', batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Carga un DataFrame en la tabla indicada usando la estrategia mas rapida
+    disponible y reporta el rendimiento en filas por segundo.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de base de datos destino.
+        table_name (str): Nombre de la tabla destino.
+        df (pd.DataFrame): Datos a cargar.
+        strategy (str): 'auto' o el nombre de una estrategia de STRATEGIES. Si
+            la estrategia indicada no esta disponible se intenta con las demas.
+        batch_size (int): Numero de filas por lote.
+
+    Returns:
+        dict: Estadisticas de la carga (tabla, estrategia, filas, segundos, filas/s).
+
+    Raises:
+        RuntimeError: Si ninguna estrategia esta disponible.
+        Exception: Cualquier otro error de la estrategia (por ejemplo IntegrityError).
+    """
+    candidates = strategies_for(engine)
+    if strategy != 'auto':
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia de carga desconocida: {strategy}")
+        candidates = [strategy] + [name for name in candidates if name != strategy]
+
+    errors = []
+    for name in candidates:
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                STRATEGIES[name](conn, table_name, df, batch_size)
+        except NotImplementedError as e:
+            logging.warning(f"La estrategia {name} no esta disponible para la tabla {table_name}: {e}")
+            errors.append(f"{name}: {e}")
+            continue
+
+        seconds = time.perf_counter() - start
+        rows_per_sec = len(df) / seconds if seconds > 0 else float('inf')
+        logging.info(
+            f"Tabla {table_name}: {len(df)} filas cargadas en {seconds:.3f}s "
+            f"({rows_per_sec:.0f} filas/s) con la estrategia {name}"
+        )
+        return {
+            'table': table_name,
+            'strategy': name,
+            'rows': len(df),
+            'seconds': seconds,
+            'rows_per_sec': rows_per_sec,
+        }
+
+    raise RuntimeError(f"No se pudo cargar la tabla {table_name}: {'; '.join(errors)}")
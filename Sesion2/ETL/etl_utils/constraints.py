@@ -0,0 +1,186 @@
+"""
+Modo de carga masiva sin verificacion de restricciones fila por fila.
+
+Los pipelines ya validan la integridad referencial en Python antes de cargar,
+por lo que durante la carga la base de datos puede omitir esas verificaciones:
+
+    - MySQL: SET foreign_key_checks = 0 y unique_checks = 0 en cada conexion.
+    - SQLite: PRAGMA foreign_keys = OFF e ignore_check_constraints = ON.
+    - Los indices secundarios (no unicos) de las tablas destino se eliminan
+      antes de la carga y se reconstruyen al terminar, en una sola pasada por
+      indice. En MySQL se conservan los indices que respaldan llaves foraneas.
+
+Al salir del modo se ejecuta una verificacion de integridad basada en
+conjuntos: una consulta por tabla hija con LEFT JOIN a sus tablas padre y una
+consulta de unicidad por llave.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event, inspect, text
+
+
+def _relax(dbapi_connection, dialect_name):
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect_name == 'mysql':
+            cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+        elif dialect_name == 'sqlite':
+            cursor.execute("PRAGMA foreign_keys = OFF")
+            cursor.execute("PRAGMA ignore_check_constraints = ON")
+    finally:
+        cursor.close()
+
+
+def _restore(dbapi_connection, dialect_name):
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect_name == 'mysql':
+            cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        elif dialect_name == 'sqlite':
+            cursor.execute("PRAGMA ignore_check_constraints = OFF")
+    finally:
+        cursor.close()
+
+
+def drop_secondary_indexes(engine, tables):
+    """
+    Elimina los indices no unicos de las tablas que ya existen.
+
+    Returns:
+        list: Tuplas (tabla, indice, columnas) para reconstruirlos.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    dropped = []
+    for table_name in tables:
+        if not inspector.has_table(table_name):
+            continue
+        fk_columns = [fk['constrained_columns'] for fk in inspector.get_foreign_keys(table_name)]
+        for index in inspector.get_indexes(table_name):
+            columns = index['column_names']
+            if index.get('unique') or not index.get('name') or None in columns:
+                continue
+            # MySQL no permite eliminar el indice que usa una llave foranea
+            if engine.dialect.name == 'mysql' and any(columns[:len(fk)] == fk for fk in fk_columns):
+                continue
+            dropped.append((table_name, index['name'], columns))
+
+    with engine.begin() as conn:
+        for table_name, name, _ in dropped:
+            if engine.dialect.name == 'mysql':
+                conn.execute(text(f"DROP INDEX {quote(name)} ON {quote(table_name)}"))
+            else:
+                conn.execute(text(f"DROP INDEX {quote(name)}"))
+    for table_name, name, columns in dropped:
+        logging.info(f"Indice {name} de {table_name} ({', '.join(columns)}) eliminado durante la carga")
+    return dropped
+
+
+def rebuild_indexes(engine, dropped):
+    """
+    Vuelve a crear los indices eliminados por drop_secondary_indexes.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    for table_name, name, columns in dropped:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE INDEX {quote(name)} ON {quote(table_name)} "
+                              f"({', '.join(quote(c) for c in columns)})"))
+        logging.info(f"Indice {name} de {table_name} reconstruido en {time.perf_counter() - start:.3f}s")
+
+
+def verify_integrity(engine, foreign_keys, unique_keys):
+    """
+    Verifica con consultas basadas en conjuntos que las llaves sean unicas y
+    que todas las llaves foraneas existan en su tabla padre.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de base de datos destino.
+        foreign_keys (dict): Tabla hija -> {columna: (tabla padre, columna padre)}.
+        unique_keys (dict): Tabla -> columna llave.
+
+    Returns:
+        dict: Cantidad de violaciones por 'tabla.columna'.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    violations = {}
+    with engine.connect() as conn:
+        for table_name, column in unique_keys.items():
+            if not inspector.has_table(table_name):
+                continue
+            duplicates = conn.execute(text(
+                f"SELECT COUNT(*) - COUNT(DISTINCT {quote(column)}) FROM {quote(table_name)}"
+            )).scalar()
+            violations[f"{table_name}.{column}"] = int(duplicates or 0)
+
+        for table_name, references in foreign_keys.items():
+            if not inspector.has_table(table_name):
+                continue
+            checks, joins = [], []
+            for i, (column, (parent_table, parent_column)) in enumerate(references.items()):
+                alias = f"p{i}"
+                joins.append(f"LEFT JOIN {quote(parent_table)} {alias} "
+                             f"ON {alias}.{quote(parent_column)} = c.{quote(column)}")
+                checks.append(f"SUM(CASE WHEN c.{quote(column)} IS NOT NULL "
+                              f"AND {alias}.{quote(parent_column)} IS NULL THEN 1 ELSE 0 END)")
+            row = conn.execute(text(
+                f"SELECT {', '.join(checks)} FROM {quote(table_name)} c {' '.join(joins)}"
+            )).one()
+            for column, missing in zip(references, row):
+                violations[f"{table_name}.{column}"] = int(missing or 0)
+    return violations
+
+
+@contextmanager
+def relaxed_constraints(engine, tables, foreign_keys, unique_keys):
+    """
+    Ejecuta las cargas del bloque with sin verificaciones de llaves ni indices
+    secundarios; al salir reconstruye los indices y verifica la integridad.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de base de datos destino.
+        tables (list): Tablas destino de la carga.
+        foreign_keys (dict): Tabla hija -> {columna: (tabla padre, columna padre)}.
+        unique_keys (dict): Tabla -> columna llave.
+
+    Raises:
+        RuntimeError: Si la verificacion encuentra llaves duplicadas o huerfanas.
+    """
+    dialect_name = engine.dialect.name
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _relax(dbapi_connection, dialect_name)
+
+    def on_checkin(dbapi_connection, connection_record):
+        if dbapi_connection is not None:
+            _restore(dbapi_connection, dialect_name)
+
+    start = time.perf_counter()
+    dropped = drop_secondary_indexes(engine, tables)
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', on_checkin)
+    try:
+        yield
+        load_seconds = time.perf_counter() - start
+    finally:
+        event.remove(engine, 'checkout', on_checkout)
+        event.remove(engine, 'checkin', on_checkin)
+        rebuild_start = time.perf_counter()
+        rebuild_indexes(engine, dropped)
+        rebuild_seconds = time.perf_counter() - rebuild_start
+
+    verify_start = time.perf_counter()
+    violations = verify_integrity(engine, foreign_keys, unique_keys)
+    verify_seconds = time.perf_counter() - verify_start
+    logging.info(
+        f"Carga sin restricciones: carga {load_seconds:.3f}s, reconstruccion de indices "
+        f"{rebuild_seconds:.3f}s, verificacion de integridad {verify_seconds:.3f}s, "
+        f"total {time.perf_counter() - start:.3f}s"
+    )
+    invalid = {name: count for name, count in violations.items() if count}
+    if invalid:
+        raise RuntimeError(f"Verificacion de integridad fallida: {invalid}")
+    logging.info(f"Verificacion de integridad correcta: {len(violations)} llaves revisadas")
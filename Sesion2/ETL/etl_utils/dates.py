@@ -0,0 +1,67 @@
+"""
+Fechas: parseo de textos con formato fijo y dimension de fechas.
+
+Las columnas de fecha suelen tener pocos valores distintos (cientos de dias en
+decenas de miles de filas). parse_unique_dates convierte solo los valores
+distintos con un formato explicito y los asigna a cada fila mediante los
+codigos de la factorizacion (o de la columna categorica).
+
+build_dim_date genera una tabla de dimension de fechas con una llave entera
+AAAAMMDD; date_keys calcula esa llave para una columna de fechas.
+"""
+import numpy as np
+import pandas as pd
+
+
+def parse_unique_dates(values, date_format):
+    """
+    Convierte una columna de textos de fecha parseando solo los valores distintos.
+
+    Parameters:
+        values (pd.Series): Textos de fecha (object, string o category).
+        date_format (str): Formato de strptime de todos los valores.
+
+    Returns:
+        pd.Series: Fechas (NaT para valores nulos o que no cumplen el formato).
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(uniques, format=date_format, errors='coerce').to_numpy()
+    # El codigo -1 (valor nulo) toma el NaT agregado al final
+    parsed = np.append(parsed, np.array(['NaT'], dtype=parsed.dtype))
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+
+def date_keys(dates):
+    """
+    Calcula la llave entera AAAAMMDD de una columna de fechas. Las fechas nulas toman la
+    llave 0, que no existe en la dimension de fechas.
+
+    Returns:
+        pd.Series: Llaves int32.
+    """
+    dates = dates.dt
+    return (dates.year * 10000 + dates.month * 100 + dates.day).fillna(0).astype('int32')
+
+
+def build_dim_date(start, end):
+    """
+    Genera la dimension de fechas con un dia por fila entre start y end.
+
+    Returns:
+        pd.DataFrame: date_key (AAAAMMDD), date, year, quarter, month, day,
+            weekday (0 = lunes) e is_weekend.
+    """
+    days = pd.Series(pd.date_range(start, end, freq='D'))
+    return pd.DataFrame({
+        'date_key': date_keys(days),
+        'date': days,
+        'year': days.dt.year.astype('int16'),
+        'quarter': days.dt.quarter.astype('int8'),
+        'month': days.dt.month.astype('int8'),
+        'day': days.dt.day.astype('int8'),
+        'weekday': days.dt.weekday.astype('int8'),
+        'is_weekend': days.dt.weekday >= 5,
+    })
@@ -0,0 +1,79 @@
+"""
+Conexiones a la base de datos creadas a demanda.
+
+LazyEngine no resuelve el host, no importa SQLAlchemy ni crea el engine (y su
+pool) hasta la primera vez que se pide con get(); las siguientes llamadas
+devuelven el mismo engine. Asi, las ejecuciones que no llegan a usar la base de
+datos (como --validate-only) no hacen ninguna consulta de red.
+
+Los engines se comparten por URL: dos configuraciones que apuntan a la misma
+base de datos usan un solo pool.
+"""
+import functools
+import socket
+import threading
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def local_host():
+    """
+    IP de esta maquina (host por defecto de DATABASE_CONFIG); se resuelve una sola vez.
+    """
+    return socket.gethostbyname(socket.gethostname())
+
+
+def database_url(config):
+    """
+    URL de SQLAlchemy de una configuracion: 'url' si existe o la URL de MySQL con host, port,
+    user, password y database. Sin 'host' se usa la IP de esta maquina.
+    """
+    if config.get('url'):
+        return config['url']
+    host = config.get('host') or local_host()
+    return f"mysql://{config['user']}:{config['password']}@{host}:{config['port']}/{config['database']}"
+
+
+def get_engine(url, **kwargs):
+    """
+    Devuelve el engine de la URL, creandolo con kwargs la primera vez.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine compartido por todas las llamadas con la misma URL.
+    """
+    from sqlalchemy import create_engine
+
+    with _engines_lock:
+        if url not in _engines:
+            _engines[url] = create_engine(url, **kwargs)
+        return _engines[url]
+
+
+class LazyEngine:
+    """
+    Engine que se crea con create() la primera vez que se pide con get(). Es seguro usarlo desde
+    varios hilos.
+    """
+
+    def __init__(self, create):
+        self._create = create
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Devuelve el engine, creandolo si aun no existe.
+        """
+        with self._lock:
+            if self._engine is None:
+                self._engine = self._create()
+            return self._engine
+
+    @property
+    def created(self):
+        """
+        Indica si el engine ya fue creado.
+        """
+        return self._engine is not None
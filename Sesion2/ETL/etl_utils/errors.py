@@ -0,0 +1,14 @@
+"""
+Errores de los pipelines.
+
+Las etapas (lectura, validacion, transformacion y carga) registran el contexto
+en el mensaje y lanzan PipelineError en lugar de terminar el proceso, de modo
+que el error llega desde los hilos del scheduler y del productor solapado
+hasta main(), el unico lugar que lo registra y termina con sys.exit(1).
+"""
+
+
+class PipelineError(Exception):
+    """
+    Error de una etapa del pipeline; el mensaje ya describe la tabla y la causa.
+    """
@@ -0,0 +1,139 @@
+"""
+Indices de llaves para validar integridad referencial.
+
+Cada tabla padre se indexa una sola vez como un arreglo NumPy ordenado y sin
+duplicados; las tablas hijas verifican sus llaves foraneas con searchsorted,
+sin reconstruir conjuntos de Python en cada validacion. Un mismo indice se
+reutiliza en todas las tablas que referencian a la misma llave.
+
+El registro tambien acumula los valores ya vistos de las reglas unique de cada
+tabla (mark_seen), de modo que una tabla procesada por bloques detecta los
+duplicados que caen en bloques distintos.
+"""
+import threading
+
+import numpy as np
+
+
+class KeyIndex:
+    """
+    Llaves de una columna de una tabla padre, ordenadas y sin duplicados.
+    """
+
+    def __init__(self, values):
+        self.keys = np.unique(np.asarray(values))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def contains(self, values):
+        """
+        Indica, para cada valor, si existe en el indice.
+
+        Returns:
+            np.ndarray: Mascara booleana del mismo largo que values.
+        """
+        values = np.asarray(values)
+        if len(self.keys) == 0:
+            return np.zeros(len(values), dtype=bool)
+        positions = np.searchsorted(self.keys, values)
+        positions[positions == len(self.keys)] = 0
+        return self.keys[positions] == values
+
+
+class KeyIndexRegistry:
+    """
+    Registro de los indices de llaves de las tablas padre, identificados por
+    (tabla, columna). Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._discarded = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def register(self, table_name, column, values):
+        """
+        Construye y guarda el indice de una columna de una tabla padre, sin las llaves
+        descartadas con discard.
+
+        Returns:
+            KeyIndex: Indice construido.
+        """
+        index = KeyIndex(values)
+        with self._lock:
+            discarded = self._discarded.get((table_name, column))
+            if discarded is not None:
+                index.keys = np.setdiff1d(index.keys, discarded, assume_unique=True)
+            self._indexes[(table_name, column)] = index
+        return index
+
+    def discard(self, table_name, column, values):
+        """
+        Quita llaves del indice de una tabla padre (por ejemplo, filas enviadas a cuarentena), ya
+        este registrado o se registre despues.
+        """
+        values = np.unique(np.asarray(values))
+        with self._lock:
+            key = (table_name, column)
+            previous = self._discarded.get(key)
+            self._discarded[key] = values if previous is None else np.union1d(previous, values)
+            # Se reemplaza el indice en lugar de modificarlo: otros hilos pueden estar usandolo
+            if key in self._indexes:
+                self._indexes[key] = KeyIndex(np.setdiff1d(self._indexes[key].keys, values, assume_unique=True))
+
+    def get(self, table_name, column):
+        """
+        Devuelve el indice registrado de una tabla padre.
+
+        Raises:
+            KeyError: Si la tabla padre aun no fue registrada.
+        """
+        with self._lock:
+            return self._indexes[(table_name, column)]
+
+    def mark_seen(self, table_name, columns, values):
+        """
+        Indica que valores ya se vieron en llamadas anteriores para la misma tabla y columnas, y
+        agrega los de esta llamada.
+
+        Parameters:
+            table_name (str): Tabla (procesada por bloques) a la que pertenecen los valores.
+            columns (list): Columnas de la regla unique.
+            values (np.ndarray): Valor (o hash de las columnas) de cada fila del bloque.
+
+        Returns:
+            np.ndarray: Mascara booleana de los valores vistos en llamadas anteriores.
+        """
+        values = np.asarray(values)
+        key = (table_name, tuple(columns))
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is None:
+                self._seen[key] = KeyIndex(values)
+                return np.zeros(len(values), dtype=bool)
+            self._seen[key] = KeyIndex(np.concatenate([seen.keys, values]))
+        return seen.contains(values)
+
+    def check(self, df, foreign_keys):
+        """
+        Valida varias llaves foraneas de un DataFrame en una sola pasada
+        vectorizada.
+
+        Parameters:
+            df (pd.DataFrame): Tabla hija.
+            foreign_keys (dict): Columna de df -> (tabla padre, columna padre).
+
+        Returns:
+            dict: 'rows' con las posiciones de las filas que tienen alguna
+                llave invalida, y 'counts' con la cantidad de llaves invalidas
+                por columna.
+        """
+        invalid = np.zeros(len(df), dtype=bool)
+        counts = {}
+        for column, (table_name, parent_column) in foreign_keys.items():
+            missing = ~self.get(table_name, parent_column).contains(df[column].to_numpy())
+            counts[column] = int(missing.sum())
+            invalid |= missing
+        return {'rows': np.flatnonzero(invalid), 'counts': counts}
@@ -0,0 +1,242 @@
+"""
+Manifiesto de ejecucion para reanudar pipelines fallidos.
+
+Cada ejecucion registra en un archivo JSON las tablas terminadas y, por tabla,
+los bloques confirmados en la base de datos con sus filas y su rango de llaves.
+Si la ejecucion falla, el manifiesto queda en estado 'running' y con --resume
+la siguiente ejecucion omite las tablas terminadas y continua cada tabla
+parcial desde su ultimo bloque confirmado.
+
+La carga de un bloque y su registro en el manifiesto no son atomicos: si la
+ejecucion se interrumpe entre ambos, el bloque queda cargado pero no
+registrado. Por eso, al reanudar, antes de cargar el primer bloque pendiente de
+cada tabla se eliminan las filas con sus llaves (delete_unrecorded): con un solo
+DELETE por el rango de llaves del bloque o, si ese rango se cruza con el de un
+bloque ya confirmado, por la lista de llaves.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+
+def _plain(value):
+    """
+    Convierte escalares de NumPy y pandas a tipos que entiende json.
+    """
+    return value.item() if hasattr(value, 'item') else value
+
+
+class RunManifest:
+    """
+    Estado de una ejecucion del pipeline, guardado en un archivo JSON despues
+    de cada cambio. Es seguro usarlo desde varios hilos.
+    """
+
+    def __init__(self, path, options, resume=False):
+        """
+        Parameters:
+            path (str): Archivo JSON del manifiesto.
+            options (dict): Opciones de la ejecucion que determinan los bloques
+                (modo, tamanos de bloque); al reanudar deben coincidir.
+            resume (bool): Continua la ejecucion incompleta del manifiesto, si existe.
+
+        Raises:
+            ValueError: Si se reanuda con opciones distintas a las de la ejecucion fallida.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._cleaned = set()
+
+        previous = self._read() if resume else None
+        self.resuming = previous is not None and previous['status'] != 'completed'
+        if self.resuming:
+            if previous['options'] != options:
+                raise ValueError(f"La ejecucion a reanudar uso otras opciones: {previous['options']}")
+            self.data = previous
+            self.data['attempts'] += 1
+            logging.info(f"Reanudando la ejecucion iniciada el {self.data['started']} "
+                         f"(intento {self.data['attempts']})")
+        else:
+            if resume:
+                logging.info("No hay una ejecucion incompleta que reanudar; se ejecuta completa")
+            self.data = {
+                'status': 'running',
+                'started': datetime.now().isoformat(timespec='seconds'),
+                'attempts': 1,
+                'options': options,
+                'tables': {},
+            }
+        with self._lock:
+            self._save()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, default=str)
+        os.replace(tmp, self.path)
+
+    def _table(self, table_name):
+        return self.data['tables'].setdefault(table_name, {'status': 'pending', 'rows': 0, 'chunks': {}})
+
+    def table_completed(self, table_name):
+        """
+        Indica si la tabla se termino de cargar en esta ejecucion o en la reanudada.
+        """
+        with self._lock:
+            return self.data['tables'].get(table_name, {}).get('status') == 'completed'
+
+    def chunk_completed(self, table_name, chunk):
+        """
+        Indica si el bloque de la tabla ya fue confirmado en la base de datos.
+        """
+        with self._lock:
+            return str(chunk) in self.data['tables'].get(table_name, {}).get('chunks', {})
+
+    def needs_cleanup(self, table_name):
+        """
+        Indica si, al reanudar, hay que eliminar las filas del primer bloque
+        pendiente de la tabla antes de cargarlo. Devuelve True una sola vez por tabla.
+        """
+        with self._lock:
+            if not self.resuming or table_name in self._cleaned:
+                return False
+            self._cleaned.add(table_name)
+            return True
+
+    def overlaps_chunks(self, table_name, first_key, last_key):
+        """
+        Indica si el rango de llaves se cruza con el rango (first_key, last_key) de algun bloque
+        confirmado de la tabla.
+        """
+        first_key, last_key = _plain(first_key), _plain(last_key)
+        with self._lock:
+            chunks = self.data['tables'].get(table_name, {}).get('chunks', {}).values()
+            return any(chunk['first_key'] is not None and chunk['first_key'] <= last_key
+                       and first_key <= chunk['last_key'] for chunk in chunks)
+
+    def remember(self, name, compute):
+        """
+        Devuelve el valor guardado con name en la ejecucion reanudada o, si no existe, lo calcula
+        con compute() y lo guarda. Sirve para que un reintento use los mismos valores iniciales
+        (por ejemplo las marcas de agua) que el intento fallido.
+        """
+        with self._lock:
+            values = self.data.setdefault('values', {})
+            if name not in values:
+                value = compute()
+                values[name] = {k: _plain(v) for k, v in value.items()} if isinstance(value, dict) else _plain(value)
+                self._save()
+            return values[name]
+
+    def record_chunk(self, table_name, chunk, rows, first_key=None, last_key=None):
+        """
+        Registra un bloque confirmado en la base de datos.
+        """
+        with self._lock:
+            table = self._table(table_name)
+            table['status'] = 'partial'
+            table['rows'] += rows
+            table['chunks'][str(chunk)] = {
+                'rows': rows,
+                'first_key': _plain(first_key),
+                'last_key': _plain(last_key),
+                'committed': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._save()
+
+    def complete_table(self, table_name):
+        """
+        Marca la tabla como terminada.
+        """
+        with self._lock:
+            self._table(table_name)['status'] = 'completed'
+            self._save()
+        logging.info(f"Tabla {table_name} registrada como terminada en el manifiesto")
+
+    def complete(self):
+        """
+        Marca la ejecucion como terminada; una ejecucion terminada no se reanuda.
+        """
+        with self._lock:
+            self.data['status'] = 'completed'
+            self.data['finished'] = datetime.now().isoformat(timespec='seconds')
+            self._save()
+
+
+def delete_keys(engine, table_name, column, keys, batch_size=1000):
+    """
+    Elimina de la tabla las filas con las llaves de un bloque que pudo quedar
+    cargado sin registrarse en el manifiesto.
+
+    Returns:
+        int: Filas eliminadas.
+    """
+    # SQLAlchemy se importa solo al usar la base de datos (ver etl_utils/db.py)
+    from sqlalchemy import bindparam, inspect, text
+
+    if not len(keys) or not inspect(engine).has_table(table_name):
+        return 0
+    quote = engine.dialect.identifier_preparer.quote
+    stmt = text(f"DELETE FROM {quote(table_name)} WHERE {quote(column)} IN :keys").bindparams(
+        bindparam('keys', expanding=True))
+    keys = [_plain(key) for key in pd.unique(keys)]
+    deleted = 0
+    with engine.begin() as conn:
+        for start in range(0, len(keys), batch_size):
+            deleted += conn.execute(stmt, {'keys': keys[start:start + batch_size]}).rowcount
+    if deleted:
+        logging.warning(f"Se eliminaron {deleted} filas de {table_name} cargadas sin registrarse en el manifiesto")
+    return deleted
+
+
+def delete_key_range(engine, table_name, column, first_key, last_key):
+    """
+    Elimina de la tabla, con un solo DELETE, las filas con llaves entre
+    first_key y last_key (inclusive).
+
+    Returns:
+        int: Filas eliminadas.
+    """
+    from sqlalchemy import inspect, text
+
+    if not inspect(engine).has_table(table_name):
+        return 0
+    quote = engine.dialect.identifier_preparer.quote
+    stmt = text(f"DELETE FROM {quote(table_name)} WHERE {quote(column)} BETWEEN :first_key AND :last_key")
+    with engine.begin() as conn:
+        deleted = conn.execute(stmt, {'first_key': _plain(first_key), 'last_key': _plain(last_key)}).rowcount
+    if deleted:
+        logging.warning(f"Se eliminaron {deleted} filas de {table_name} cargadas sin registrarse en el manifiesto")
+    return deleted
+
+
+def delete_unrecorded(engine, manifest, table_name, column, keys):
+    """
+    Elimina las filas de un bloque que pudo quedar cargado sin registrarse en el
+    manifiesto. Si el rango de llaves del bloque no se cruza con el de ningun
+    bloque confirmado se usa un solo DELETE por rango (delete_key_range); si se
+    cruza (archivo no ordenado por la llave) se elimina por lista de llaves
+    (delete_keys) para no borrar filas confirmadas.
+
+    Returns:
+        int: Filas eliminadas.
+    """
+    if not len(keys):
+        return 0
+    first_key, last_key = keys.min(), keys.max()
+    if manifest.overlaps_chunks(table_name, first_key, last_key):
+        return delete_keys(engine, table_name, column, keys)
+    return delete_key_range(engine, table_name, column, first_key, last_key)
@@ -0,0 +1,166 @@
+"""
+Metricas estructuradas por etapa y perfilado opcional.
+
+El decorador track_stage envuelve las etapas de los pipelines (lectura,
+extraccion, transformaciones y carga) y escribe por cada llamada un evento
+JSON en un archivo JSON-lines con: etapa, tabla, filas de entrada y salida,
+tiempo de reloj y de CPU, variacion de memoria y bytes leidos o escritos.
+
+Con configure(profile_stage=...) una etapa se ejecuta ademas bajo cProfile o
+tracemalloc y el resultado se guarda junto al log del pipeline.
+"""
+import cProfile
+import functools
+import inspect
+import json
+import logging
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+_settings = {
+    'file': None,
+    'profile_stage': None,
+    'profiler': 'cprofile',
+}
+_write_lock = threading.Lock()
+_profile_lock = threading.Lock()
+
+
+def configure(file=None, profile_stage=None, profiler='cprofile'):
+    """
+    Configura el destino de los eventos y el perfilado.
+
+    Parameters:
+        file (str): Archivo JSON-lines donde se escriben los eventos (None los desactiva).
+        profile_stage (str): Nombre de la etapa a perfilar (None para no perfilar).
+        profiler (str): 'cprofile' (tiempo por funcion) o 'tracemalloc' (memoria por linea).
+    """
+    if profiler not in ('cprofile', 'tracemalloc'):
+        raise ValueError(f"Perfilador desconocido: {profiler}")
+    _settings.update({'file': file, 'profile_stage': profile_stage, 'profiler': profiler})
+    if file:
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+def current_rss():
+    """
+    Memoria residente actual del proceso en bytes (pico historico si /proc no existe).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _first_dataframe(values):
+    for value in values:
+        if isinstance(value, pd.DataFrame):
+            return value
+    return None
+
+
+def _write_event(event):
+    with _write_lock:
+        with open(_settings['file'], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, default=str) + '\n')
+
+
+def _profile_path(stage, extension):
+    log_dir = os.path.dirname(_settings['file']) or '.'
+    return os.path.join(log_dir, f"profile_{stage}_{datetime.now():%Y%m%d_%H%M%S_%f}.{extension}")
+
+
+def _run_profiled(stage, fn, args, kwargs):
+    """
+    Ejecuta la etapa bajo el perfilador configurado y guarda el resultado.
+    Solo se perfila una llamada a la vez (cProfile y tracemalloc son globales).
+    """
+    with _profile_lock:
+        if _settings['profiler'] == 'tracemalloc':
+            tracemalloc.start()
+            try:
+                result = fn(*args, **kwargs)
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            path = _profile_path(stage, 'txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"Memoria actual: {current} bytes, pico: {peak} bytes\n")
+                for statistic in snapshot.statistics('lineno')[:25]:
+                    f.write(f"{statistic}\n")
+        else:
+            profiler = cProfile.Profile()
+            result = profiler.runcall(fn, *args, **kwargs)
+            path = _profile_path(stage, 'prof')
+            profiler.dump_stats(path)
+            with open(path[:-len('.prof')] + '.txt', 'w', encoding='utf-8') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(30)
+    logging.info(f"Perfil de la etapa {stage} guardado en {path}")
+    return result
+
+
+def track_stage(fn):
+    """
+    Decorador que registra un evento de metricas por cada llamada a la etapa.
+    La tabla se toma del argumento table_name o del nombre del archivo en
+    file_path; las filas de entrada son las del primer DataFrame recibido.
+    """
+    signature = inspect.signature(fn)
+    stage = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _settings['file'] and _settings['profile_stage'] != stage:
+            return fn(*args, **kwargs)
+
+        bound = signature.bind_partial(*args, **kwargs).arguments
+        table = bound.get('table_name')
+        bytes_read = None
+        if table is None and isinstance(bound.get('file_path'), str):
+            table = os.path.basename(bound['file_path'])
+            try:
+                bytes_read = os.path.getsize(bound['file_path'])
+            except OSError:
+                pass
+        df_in = _first_dataframe(bound.values())
+
+        rss_before = current_rss()
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        if _settings['profile_stage'] == stage:
+            result = _run_profiled(stage, fn, args, kwargs)
+        else:
+            result = fn(*args, **kwargs)
+        wall = time.perf_counter() - start
+        cpu = time.thread_time() - cpu_start
+
+        if _settings['file']:
+            _write_event({
+                'timestamp': datetime.now().isoformat(),
+                'stage': stage,
+                'table': table,
+                'rows_in': len(df_in) if df_in is not None else None,
+                'rows_out': len(result) if isinstance(result, pd.DataFrame) else None,
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'memory_delta_bytes': current_rss() - rss_before,
+                'bytes_read': bytes_read,
+                'bytes_written': (int(df_in.memory_usage(index=False, deep=True).sum())
+                                  if 'table_name' in bound and df_in is not None else None),
+            })
+        return result
+
+    return wrapper
@@ -0,0 +1,216 @@
+"""
+Cache en disco de los archivos de texto ya parseados.
+
+La primera vez que se lee un archivo se guarda el DataFrame resultante en un
+formato columnar: Parquet si pyarrow esta instalado, o un directorio con un
+arreglo .npy por columna en caso contrario. Las siguientes lecturas cargan el
+cache (mapeandolo en memoria cuando es posible) en lugar de volver a parsear.
+
+La llave de cada entrada combina la ruta, el tamano, la fecha de modificacion,
+el hash del contenido del archivo y los parametros de lectura (columnas,
+separador), por lo que cualquier cambio invalida el cache automaticamente.
+El tamano total del cache se acota eliminando las entradas usadas hace mas
+tiempo.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+_cache_lock = threading.Lock()
+
+
+def file_fingerprint(file_path, block_size=1024 * 1024):
+    """
+    Calcula el hash del contenido de un archivo.
+
+    Returns:
+        str: Hash blake2b en hexadecimal.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(file_path, params):
+    """
+    Construye la llave de cache de un archivo y sus parametros de lectura.
+
+    Returns:
+        str: Llave en hexadecimal.
+    """
+    stat = os.stat(file_path)
+    payload = json.dumps({
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'hash': file_fingerprint(file_path),
+        'params': params,
+    }, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.parquet" if HAS_PYARROW else f"{key}.npcache")
+
+
+def _entry_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def _write_numpy(df, path):
+    """
+    Guarda cada columna como un arreglo .npy. Las columnas numericas y de
+    fechas se pueden mapear en memoria al leerlas; las de texto se guardan
+    como objetos.
+    """
+    meta = {'columns': [], 'dtypes': []}
+    os.makedirs(path)
+    for i, column in enumerate(df.columns):
+        values = df[column].to_numpy()
+        np.save(os.path.join(path, f"{i}.npy"), values, allow_pickle=values.dtype == object)
+        meta['columns'].append(column)
+        meta['dtypes'].append(str(df[column].dtype))
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def _read_numpy(path):
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    data = {}
+    for i, (column, dtype) in enumerate(zip(meta['columns'], meta['dtypes'])):
+        file_path = os.path.join(path, f"{i}.npy")
+        try:
+            values = np.load(file_path, mmap_mode='r')
+        except ValueError:
+            values = np.load(file_path, allow_pickle=True)
+        series = pd.Series(values, name=column)
+        data[column] = series if str(series.dtype) == dtype else series.astype(dtype)
+    return pd.DataFrame(data)
+
+
+def _write_entry(df, path):
+    tmp_path = f"{path}.tmp{threading.get_ident()}"
+    if HAS_PYARROW:
+        df.to_parquet(tmp_path, index=False)
+    else:
+        _write_numpy(df, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_entry(path):
+    if HAS_PYARROW:
+        return pd.read_parquet(path, memory_map=True)
+    return _read_numpy(path)
+
+
+def evict(cache_dir, max_bytes, name='Cache de parseo'):
+    """
+    Elimina las entradas usadas hace mas tiempo hasta que el cache ocupe como
+    maximo max_bytes.
+    """
+    with _cache_lock:
+        entries = []
+        for entry in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, entry)
+            if '.tmp' in entry:
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _entry_size(path), path))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+            total -= size
+            logging.info(f"{name}: se elimino la entrada {os.path.basename(path)}")
+
+
+def clear_cache(cache_dir, name='Cache de parseo'):
+    """
+    Elimina todas las entradas del cache.
+    """
+    with _cache_lock:
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+    logging.info(f"{name} {cache_dir} eliminado")
+
+
+def cached(key, compute, cache_config, description, name='Cache de parseo'):
+    """
+    Devuelve el DataFrame guardado con la llave, o lo calcula y lo guarda en el
+    cache si no existe una entrada valida.
+
+    Parameters:
+        key (str): Llave de la entrada.
+        compute (callable): Funcion sin argumentos que calcula el DataFrame.
+        cache_config (dict): 'dir' y 'max_bytes'.
+        description (str): Descripcion de la entrada en el log.
+        name (str): Nombre del cache en el log.
+
+    Returns:
+        tuple: (DataFrame, True si se leyo del cache).
+    """
+    cache_dir = cache_config['dir']
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(cache_dir, key)
+
+    if os.path.exists(path):
+        try:
+            df = _read_entry(path)
+            os.utime(path)
+            logging.info(f"{name}: acierto para {description}")
+            return df, True
+        except Exception as e:
+            logging.warning(f"{name}: entrada invalida para {description}, se vuelve a calcular: {e}")
+
+    df = compute()
+    try:
+        _write_entry(df, path)
+        logging.info(f"{name}: {description} no estaba en cache, se guardo una nueva entrada")
+        evict(cache_dir, cache_config['max_bytes'], name)
+    except Exception as e:
+        logging.warning(f"{name}: no se pudo guardar {description}: {e}")
+    return df, False
+
+
+def read_with_cache(file_path, parse, params, cache_config):
+    """
+    Devuelve el DataFrame de un archivo desde el cache, o lo parsea y lo
+    guarda en el cache si no existe una entrada valida.
+
+    Parameters:
+        file_path (str): Archivo de entrada.
+        parse (callable): Funcion sin argumentos que parsea el archivo.
+        params (dict): Parametros de lectura que forman parte de la llave.
+        cache_config (dict): 'enabled', 'dir' y 'max_bytes'.
+
+    Returns:
+        pd.DataFrame: Datos del archivo.
+    """
+    if not cache_config['enabled']:
+        return parse()
+    df, _ = cached(cache_key(file_path, params), parse, cache_config, file_path)
+    return df
@@ -0,0 +1,95 @@
+"""
+Ejecucion solapada de etapas con un esquema productor-consumidor.
+
+Un hilo productor recorre un iterador (por ejemplo, leer y transformar tabla
+por tabla o bloque por bloque) mientras el hilo actual consume cada elemento
+(por ejemplo, cargarlo en la base de datos). Una cola acotada aplica
+contrapresion: el productor se detiene cuando el consumidor va atrasado, de
+modo que la memoria queda acotada por el tamano de la cola.
+
+Los errores del productor se relanzan tal cual en el hilo del consumidor, y un
+error del consumidor detiene al productor.
+"""
+import logging
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def run_pipelined(items, consume, max_queue=2, name='pipeline'):
+    """
+    Consume los elementos de items en el hilo actual mientras un hilo
+    productor genera los siguientes.
+
+    Parameters:
+        items (iterable): Elementos a producir; se recorre en el hilo productor.
+        consume (callable): Funcion que recibe cada elemento.
+        max_queue (int): Elementos producidos que pueden esperar a ser consumidos.
+        name (str): Nombre usado en los mensajes de log.
+
+    Returns:
+        dict: Segundos de produccion, de consumo y totales.
+
+    Raises:
+        BaseException: El primer error del productor o del consumidor.
+    """
+    buffer = queue.Queue(maxsize=max_queue)
+    stop = threading.Event()
+    timings = {'produce': 0.0, 'consume': 0.0}
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            iterator = iter(items)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    timings['produce'] += time.perf_counter() - start
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce, name=f"{name}-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            consume_start = time.perf_counter()
+            consume(item)
+            timings['consume'] += time.perf_counter() - consume_start
+    finally:
+        stop.set()
+        producer.join()
+
+    timings['total'] = time.perf_counter() - start
+    logging.info(
+        f"Ejecucion solapada {name}: produccion {timings['produce']:.3f}s, "
+        f"consumo {timings['consume']:.3f}s, total {timings['total']:.3f}s"
+    )
+    return timings
@@ -0,0 +1,164 @@
+"""
+Reglas declarativas de calidad de datos.
+
+Cada tabla tiene una lista de reglas (diccionarios) que se evalua completa
+sobre el DataFrame, sin detenerse en la primera falla:
+
+    {'rule': 'not_null', 'columns': [...]}
+    {'rule': 'unique', 'columns': [...]}
+    {'rule': 'foreign_key', 'column': c, 'references': (tabla, columna)}
+    {'rule': 'range', 'column': c, 'min': x, 'max': y}
+    {'rule': 'expression', 'expression': 'a == b * c'}
+
+Cada regla puede indicar 'name' y 'severity': 'fail' (por defecto) detiene la
+ejecucion, 'warn' solo se reporta y 'quarantine' separa las filas que no la
+cumplen y las guarda en un archivo de cuarentena por tabla.
+
+Cada regla produce una mascara booleana de filas invalidas con operaciones
+vectorizadas; las reglas not_null de una tabla se resuelven juntas con un solo
+isna sobre todas sus columnas, y las llaves foraneas se buscan en los indices
+de llaves (etl_utils/key_index.py) de las tablas padre. Con un registro de
+indices, las reglas unique tambien marcan los valores que ya aparecieron en
+bloques anteriores de la misma tabla (modos --streaming y --pipelined).
+"""
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+SEVERITIES = ('fail', 'warn', 'quarantine')
+DEFAULT_SAMPLE_SIZE = 5
+
+
+class DataQualityError(ValueError):
+    """
+    Alguna regla con severidad 'fail' no se cumple. El reporte completo queda en .report.
+    """
+
+    def __init__(self, report):
+        failed = [name for name, result in report['violations'].items() if result['severity'] == 'fail']
+        super().__init__(f"La tabla {report['table']} no cumple las reglas {failed}")
+        self.report = report
+
+
+def rule_name(rule):
+    """
+    Nombre de la regla en el reporte: 'name' o el tipo de regla con sus columnas.
+    """
+    if 'name' in rule:
+        return rule['name']
+    columns = rule.get('columns') or [rule.get('column')]
+    return f"{rule['rule']}({', '.join(map(str, columns))})"
+
+
+def evaluate(df, rules, key_indexes=None, table_name=None):
+    """
+    Evalua todas las reglas sobre el DataFrame.
+
+    Parameters:
+        df (pd.DataFrame): Tabla a validar.
+        rules (list): Reglas de la tabla.
+        key_indexes (KeyIndexRegistry): Indices de llaves de las tablas padre
+            (requerido por las reglas foreign_key) y valores ya vistos de las reglas unique.
+        table_name (str): Tabla del DataFrame; con key_indexes, las reglas unique se
+            validan tambien contra los bloques anteriores de la tabla.
+
+    Returns:
+        dict: Nombre de la regla -> (regla, mascara booleana de filas invalidas).
+
+    Raises:
+        ValueError: Si una regla o su severidad no existe.
+    """
+    # Una sola pasada de isna para las columnas de todas las reglas not_null
+    not_null_columns = list(dict.fromkeys(column for rule in rules if rule['rule'] == 'not_null'
+                                          for column in rule['columns']))
+    nulls = dict(zip(not_null_columns, df[not_null_columns].isna().to_numpy().T)) if not_null_columns else {}
+
+    masks = {}
+    for rule in rules:
+        if rule.get('severity', 'fail') not in SEVERITIES:
+            raise ValueError(f"Severidad desconocida en la regla {rule_name(rule)}: {rule['severity']}")
+        kind = rule['rule']
+        if kind == 'not_null':
+            mask = np.logical_or.reduce([nulls[column] for column in rule['columns']])
+        elif kind == 'unique':
+            mask = df.duplicated(subset=rule['columns']).to_numpy()
+            if key_indexes is not None and table_name is not None:
+                hashes = pd.util.hash_pandas_object(df[rule['columns']], index=False).to_numpy()
+                mask = mask | key_indexes.mark_seen(table_name, rule['columns'], hashes)
+        elif kind == 'foreign_key':
+            parent_table, parent_column = rule['references']
+            mask = ~key_indexes.get(parent_table, parent_column).contains(df[rule['column']].to_numpy())
+        elif kind == 'range':
+            values = df[rule['column']]
+            mask = values.isna().to_numpy().copy()
+            if rule.get('min') is not None:
+                mask |= (values < rule['min']).to_numpy()
+            if rule.get('max') is not None:
+                mask |= (values > rule['max']).to_numpy()
+        elif kind == 'expression':
+            mask = ~df.eval(rule['expression']).to_numpy(dtype=bool, na_value=False)
+        else:
+            raise ValueError(f"Regla desconocida: {kind}")
+        masks[rule_name(rule)] = (rule, np.asarray(mask, dtype=bool))
+    return masks
+
+
+def check(df, table_name, rules, key_indexes=None, quarantine_dir=None, sample_size=DEFAULT_SAMPLE_SIZE):
+    """
+    Evalua las reglas de la tabla, registra en el log todas las violaciones (conteo y filas de
+    ejemplo), separa las filas en cuarentena y falla si alguna regla 'fail' no se cumple.
+
+    Parameters:
+        df (pd.DataFrame): Tabla (o bloque) a validar.
+        table_name (str): Nombre de la tabla en el reporte y en el archivo de cuarentena.
+        rules (list): Reglas de la tabla.
+        key_indexes (KeyIndexRegistry): Indices de llaves de las tablas padre y valores
+            ya vistos de las reglas unique en bloques anteriores de la tabla.
+        quarantine_dir (str): Carpeta de los archivos de cuarentena (<tabla>.csv).
+        sample_size (int): Filas de ejemplo por regla en el reporte.
+
+    Returns:
+        tuple: (DataFrame sin las filas en cuarentena, reporte). El reporte tiene 'table',
+            'rows', 'violations' (por regla: 'severity', 'count' y 'sample') y 'quarantined'
+            (DataFrame con las filas separadas).
+
+    Raises:
+        DataQualityError: Si alguna regla con severidad 'fail' no se cumple.
+    """
+    masks = evaluate(df, rules, key_indexes, table_name)
+    report = {'table': table_name, 'rows': len(df), 'violations': {}, 'quarantined': df.iloc[:0]}
+    quarantine = np.zeros(len(df), dtype=bool)
+    for name, (rule, mask) in masks.items():
+        count = int(mask.sum())
+        if not count:
+            continue
+        severity = rule.get('severity', 'fail')
+        positions = np.flatnonzero(mask)
+        sample = df.iloc[positions[:sample_size]].to_dict('records')
+        report['violations'][name] = {'severity': severity, 'count': count, 'sample': sample}
+        log = logging.warning if severity == 'warn' else logging.error if severity == 'fail' else logging.info
+        log(f"Calidad de datos {table_name}: la regla {name} ({severity}) no se cumple en {count} "
+            f"de {len(df)} filas. Ejemplos: {sample}")
+        if severity == 'quarantine':
+            quarantine |= mask
+
+    if any(result['severity'] == 'fail' for result in report['violations'].values()):
+        raise DataQualityError(report)
+
+    if quarantine.any():
+        quarantined = df[quarantine].copy()
+        quarantined['failed_rules'] = [
+            ';'.join(name for name, (rule, mask) in masks.items()
+                     if rule.get('severity', 'fail') == 'quarantine' and mask[position])
+            for position in np.flatnonzero(quarantine)
+        ]
+        if quarantine_dir:
+            os.makedirs(quarantine_dir, exist_ok=True)
+            path = os.path.join(quarantine_dir, f"{table_name}.csv")
+            quarantined.to_csv(path, mode='a', index=False, header=not os.path.exists(path))
+            logging.info(f"{len(quarantined)} filas de {table_name} enviadas a cuarentena en {path}")
+        report['quarantined'] = quarantined.drop(columns='failed_rules')
+        df = df[~quarantine]
+    return df, report
@@ -0,0 +1,120 @@
+"""
+Ejecucion en paralelo de tareas con dependencias (por ejemplo, la carga de
+tablas relacionadas por llaves foraneas).
+
+Cada tarea arranca en cuanto todas las tareas de las que depende terminaron,
+usando un pool de hilos de tamano acotado. Se registra el inicio y el fin de
+cada tarea para poder reconstruir la ruta critica de la ejecucion.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def _validate_graph(tasks, dependencies):
+    """
+    Verifica que todas las dependencias existan y que el grafo no tenga ciclos.
+
+    Raises:
+        ValueError: Si hay dependencias desconocidas o ciclos.
+    """
+    for name in tasks:
+        for parent in dependencies.get(name, []):
+            if parent not in tasks:
+                raise ValueError(f"La tarea {name} depende de {parent}, que no existe")
+
+    visited, in_progress = set(), set()
+
+    def visit(name):
+        if name in in_progress:
+            raise ValueError(f"Ciclo de dependencias detectado en la tarea {name}")
+        if name in visited:
+            return
+        in_progress.add(name)
+        for parent in dependencies.get(name, []):
+            visit(parent)
+        in_progress.remove(name)
+        visited.add(name)
+
+    for name in tasks:
+        visit(name)
+
+
+def critical_path(timeline, dependencies):
+    """
+    Calcula la ruta critica: la cadena de dependencias que termina en la
+    tarea que finalizo al ultimo, siguiendo en cada paso al padre que
+    termino mas tarde.
+
+    Returns:
+        list: Nombres de las tareas de la ruta critica, en orden de ejecucion.
+    """
+    if not timeline:
+        return []
+    name = max(timeline, key=lambda t: timeline[t]['finish'])
+    path = [name]
+    while dependencies.get(name):
+        name = max(dependencies[name], key=lambda t: timeline[t]['finish'])
+        path.append(name)
+    return list(reversed(path))
+
+
+def run_dependency_graph(tasks, dependencies, max_workers=4):
+    """
+    Ejecuta las tareas respetando sus dependencias y en paralelo cuando es
+    posible.
+
+    Parameters:
+        tasks (dict): Nombre de la tarea -> funcion sin argumentos a ejecutar.
+        dependencies (dict): Nombre de la tarea -> lista de tareas de las que depende.
+        max_workers (int): Numero maximo de tareas ejecutandose a la vez.
+
+    Returns:
+        dict: Linea de tiempo por tarea con 'start', 'finish' y 'seconds'
+            (segundos relativos al inicio de la ejecucion).
+
+    Raises:
+        Exception: Propaga el primer error de una tarea; las tareas que aun
+            no iniciaron se cancelan.
+    """
+    _validate_graph(tasks, dependencies)
+
+    timeline = {}
+    pending = dict(tasks)
+    done = set()
+    run_start = time.perf_counter()
+
+    def run(name):
+        start = time.perf_counter() - run_start
+        tasks[name]()
+        finish = time.perf_counter() - run_start
+        timeline[name] = {'start': start, 'finish': finish, 'seconds': finish - start}
+        return name
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            ready = [name for name in pending
+                     if all(parent in done for parent in dependencies.get(name, []))]
+            for name in ready:
+                del pending[name]
+                running[executor.submit(run, name)] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    future.result()
+                except BaseException:
+                    for other in running:
+                        other.cancel()
+                    raise
+                done.add(name)
+
+    for name in sorted(timeline, key=lambda t: timeline[t]['start']):
+        logging.info(
+            f"Tarea {name}: inicio {timeline[name]['start']:.3f}s, "
+            f"fin {timeline[name]['finish']:.3f}s ({timeline[name]['seconds']:.3f}s)"
+        )
+    logging.info(f"Ruta critica: {' -> '.join(critical_path(timeline, dependencies))}")
+    return timeline
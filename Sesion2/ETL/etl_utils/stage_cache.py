@@ -0,0 +1,111 @@
+"""
+Memoizacion de etapas del pipeline (transformaciones).
+
+El resultado de una etapa se guarda en disco (con el mismo formato, llave de
+blake2b y desalojo por tamano de etl_utils/parse_cache.py) bajo una llave que
+combina:
+
+- la huella del contenido de cada entrada (hash de las filas de los
+  DataFrames y de los arreglos, por ejemplo los indices de llaves usados),
+- el hash del codigo fuente de la etapa y de las funciones o modulos de los
+  que depende,
+- su configuracion (texto del query, esquema del archivo, reglas de calidad).
+
+Si nada de eso cambio, la etapa no se ejecuta y se carga su resultado
+anterior. Las etapas deben ser deterministas y devolver un DataFrame; sus
+efectos secundarios (logs, archivos de cuarentena) no se repiten en un
+acierto. log_stats registra los aciertos y fallos de la ejecucion.
+
+Calcular la huella recorre todas las filas de las entradas, lo que cuesta
+tanto como una transformacion sencilla (minusculas, validar nulos). Por eso
+solo se memoizan las etapas listadas en cache_config['stages']; las demas
+se ejecutan siempre.
+"""
+import hashlib
+import inspect
+import json
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from etl_utils.parse_cache import cached
+
+_stats = {'hits': [], 'misses': []}
+_stats_lock = threading.Lock()
+
+
+def _update(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        dtypes = value.dtypes if isinstance(value, pd.DataFrame) else pd.Series([value.dtype], [value.name])
+        digest.update(json.dumps([[str(c) for c in dtypes.index], [str(d) for d in dtypes]]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(str(value.dtype).encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif inspect.isfunction(value) or inspect.ismethod(value) or inspect.ismodule(value):
+        try:
+            digest.update(inspect.getsource(inspect.unwrap(value)).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(inspect.unwrap(value).__code__.co_code)
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(str(key).encode('utf-8'))
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"[{len(value)}]".encode('utf-8'))
+        for item in value:
+            _update(digest, item)
+    else:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+
+
+def fingerprint(value):
+    """
+    Huella de un valor: DataFrames, Series y arreglos por su contenido, funciones y modulos por su
+    codigo fuente, y diccionarios, listas y escalares recursivamente.
+
+    Returns:
+        str: Hash blake2b en hexadecimal.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def memoize(stage, compute, inputs, code, config, cache_config):
+    """
+    Ejecuta una etapa o devuelve su resultado guardado si no cambiaron sus entradas, su codigo ni
+    su configuracion.
+
+    Parameters:
+        stage (str): Nombre de la etapa (por ejemplo transform_customers).
+        compute (callable): Funcion sin argumentos que ejecuta la etapa y devuelve un DataFrame.
+        inputs (dict): Entradas de la etapa (DataFrames, arreglos o valores).
+        code (list): Funciones y modulos cuyo codigo fuente determina el resultado.
+        config (dict): Configuracion de la etapa.
+        cache_config (dict): 'enabled', 'dir', 'max_bytes' y 'stages' (etapas que se memoizan, o None
+            para todas).
+
+    Returns:
+        pd.DataFrame: Resultado de la etapa.
+    """
+    stages = cache_config['stages']
+    if not cache_config['enabled'] or (stages is not None and stage not in stages):
+        return compute()
+    key = fingerprint({'stage': stage, 'inputs': inputs, 'code': code, 'config': config})
+    df, hit = cached(key, compute, cache_config, stage, name='Cache de etapas')
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'].append(stage)
+    return df
+
+
+def log_stats():
+    """
+    Registra los aciertos y fallos del cache de etapas en la ejecucion.
+    """
+    with _stats_lock:
+        hits, misses = list(_stats['hits']), list(_stats['misses'])
+    if hits or misses:
+        logging.info(f"Cache de etapas: {len(hits)} aciertos {hits}, {len(misses)} fallos {misses}")
@@ -0,0 +1,225 @@
+"""
+Carga idempotente (upsert) de tablas de dimensiones.
+
+Las filas se cargan con bulk_load en una tabla de staging y luego se combinan
+con la tabla destino en una sola sentencia:
+
+    - MySQL: INSERT ... SELECT ... ON DUPLICATE KEY UPDATE.
+    - SQLite y otros: INSERT ... SELECT ... ON CONFLICT (llave) DO UPDATE.
+
+Antes de la carga se descartan las filas que no cambiaron desde la ultima
+ejecucion usando un cache local con el hash de cada fila por llave, de modo que
+una reejecucion solo envia a la base de datos las filas nuevas o modificadas.
+El cache se invalida si la tabla destino no existe o tiene menos filas que las
+registradas (por ejemplo, despues de un TRUNCATE).
+"""
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from etl_utils.bulk_loader import bulk_load, DEFAULT_BATCH_SIZE
+
+_cache_lock = threading.Lock()
+
+
+def row_hashes(df, key):
+    """
+    Calcula un hash de 64 bits por fila indexado por la llave.
+
+    Returns:
+        pd.Series: Hash de cada fila con la llave como indice.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return pd.Series(hashes.to_numpy(), index=pd.Index(df[key].to_numpy(), name=key))
+
+
+def _cache_path(cache_dir, table_name):
+    return os.path.join(cache_dir, f"{table_name}.pkl")
+
+
+def read_hash_cache(cache_dir, table_name):
+    """
+    Lee el cache de hashes de una tabla.
+
+    Returns:
+        pd.Series: Hash por llave de las filas ya cargadas (vacia si no hay cache).
+    """
+    path = _cache_path(cache_dir, table_name)
+    with _cache_lock:
+        if not os.path.exists(path):
+            return pd.Series(dtype='uint64')
+        return pd.read_pickle(path)
+
+
+def save_hash_cache(cache_dir, table_name, hashes):
+    """
+    Combina los hashes cargados con el cache de la tabla y lo guarda.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, table_name)
+    with _cache_lock:
+        cached = pd.read_pickle(path) if os.path.exists(path) else pd.Series(dtype='uint64')
+        merged = pd.concat([cached[~cached.index.isin(hashes.index)], hashes])
+        tmp = f"{path}.tmp"
+        merged.to_pickle(tmp)
+        os.replace(tmp, path)
+
+
+def clear_hash_cache(cache_dir, table_name):
+    """
+    Elimina el cache de hashes de una tabla.
+    """
+    with _cache_lock:
+        try:
+            os.remove(_cache_path(cache_dir, table_name))
+        except FileNotFoundError:
+            pass
+
+
+def _table_rows(engine, table_name):
+    """
+    Devuelve las filas de la tabla destino, o None si no existe.
+    """
+    if not inspect(engine).has_table(table_name):
+        return None
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {quote(table_name)}")).scalar()
+
+
+def changed_rows(engine, table_name, df, key, cache_dir):
+    """
+    Filtra las filas nuevas o modificadas respecto al cache de hashes.
+
+    Returns:
+        tuple: (DataFrame con las filas a cargar, hashes de esas filas).
+    """
+    hashes = row_hashes(df, key)
+    cached = read_hash_cache(cache_dir, table_name)
+    if len(cached):
+        rows = _table_rows(engine, table_name)
+        if rows is None or rows < len(cached):
+            logging.warning(f"El cache de hashes de {table_name} no coincide con la tabla destino; se descarta")
+            clear_hash_cache(cache_dir, table_name)
+            cached = cached.iloc[:0]
+
+    # Se compara por posicion para no perder precision convirtiendo los hashes a float
+    positions = cached.index.get_indexer(hashes.index)
+    previous = cached.to_numpy()[positions] if len(cached) else hashes.to_numpy()
+    changed = (positions == -1) | (previous != hashes.to_numpy())
+    return df[changed], hashes[changed]
+
+
+def merge_statement(dialect, table_name, staging_name, columns, key):
+    """
+    Construye la sentencia que combina la tabla de staging con la tabla destino.
+    """
+    quote = dialect.identifier_preparer.quote
+    cols = ', '.join(quote(c) for c in columns)
+    updates = [c for c in columns if c != key]
+    if dialect.name == 'mysql':
+        assignments = ', '.join(f"{quote(c)} = src.{quote(c)}" for c in updates)
+        return (f"INSERT INTO {quote(table_name)} ({cols}) "
+                f"SELECT * FROM (SELECT {cols} FROM {quote(staging_name)}) AS src "
+                f"ON DUPLICATE KEY UPDATE {assignments}")
+    assignments = ', '.join(f"{quote(c)} = excluded.{quote(c)}" for c in updates)
+    # 'WHERE true' evita la ambiguedad de ON CONFLICT despues de un SELECT en SQLite
+    return (f"INSERT INTO {quote(table_name)} ({cols}) "
+            f"SELECT {cols} FROM {quote(staging_name)} WHERE true "
+            f"ON CONFLICT ({quote(key)}) DO "
+            + (f"UPDATE SET {assignments}" if updates else "NOTHING"))
+
+
+def _has_unique_key(inspector, table_name, key):
+    """
+    Indica si la columna es la llave primaria de la tabla o tiene un indice o restriccion unica
+    propia, que es lo que necesitan ON DUPLICATE KEY UPDATE y ON CONFLICT.
+    """
+    if inspector.get_pk_constraint(table_name).get('constrained_columns') == [key]:
+        return True
+    if any(index.get('unique') and index['column_names'] == [key] for index in inspector.get_indexes(table_name)):
+        return True
+    return any(constraint['column_names'] == [key] for constraint in inspector.get_unique_constraints(table_name))
+
+
+def _ensure_unique_key(engine, table_name, df, key):
+    """
+    Crea la tabla destino si todavia no existe (en MySQL la crea el script de la Data Warehouse
+    con su PRIMARY KEY) y, si la llave no es unica en la tabla, le agrega un indice unico; por
+    ejemplo cuando la tabla se creo con una carga sin upsert.
+
+    Raises:
+        ValueError: Si no se puede crear el indice unico (por ejemplo, por llaves duplicadas).
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    exists = inspector.has_table(table_name)
+    if exists and _has_unique_key(inspector, table_name, key):
+        return
+    try:
+        with engine.begin() as conn:
+            if not exists:
+                df.head(0).to_sql(name=table_name, con=conn, if_exists='append', index=False)
+            conn.execute(text(f"CREATE UNIQUE INDEX {quote('ux_' + table_name + '_' + key)} "
+                              f"ON {quote(table_name)} ({quote(key)})"))
+    except Exception as e:
+        raise ValueError(f"La tabla {table_name} no tiene una llave unica en {key} y no se pudo crear "
+                         f"(revise si tiene llaves duplicadas): {e}") from e
+    if exists:
+        logging.info(f"Se creo el indice unico de {table_name}.{key} requerido por el upsert")
+
+
+def upsert(engine, table_name, df, key, cache_dir, strategy='auto', batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserta o actualiza en la tabla destino las filas nuevas o modificadas.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de base de datos destino.
+        table_name (str): Tabla destino, con llave primaria o unica en key.
+        df (pd.DataFrame): Filas de la dimension.
+        key (str): Columna llave.
+        cache_dir (str): Directorio del cache de hashes.
+        strategy (str): Estrategia de bulk_load para la tabla de staging.
+        batch_size (int): Filas por lote.
+
+    Returns:
+        dict: Filas recibidas, filas combinadas, filas omitidas y segundos.
+
+    Raises:
+        ValueError: Si la tabla destino no tiene una llave unica en key y no se puede crear.
+    """
+    start = time.perf_counter()
+    to_load, hashes = changed_rows(engine, table_name, df, key, cache_dir)
+    stats = {'table': table_name, 'rows': len(df), 'upserted': len(to_load),
+             'skipped': len(df) - len(to_load)}
+    if to_load.empty:
+        stats['seconds'] = time.perf_counter() - start
+        logging.info(f"Tabla {table_name}: sin cambios, {stats['skipped']} filas omitidas")
+        return stats
+
+    _ensure_unique_key(engine, table_name, to_load, key)
+    staging_name = f"{table_name}_staging"
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {quote(staging_name)}"))
+    try:
+        bulk_load(engine, staging_name, to_load, strategy=strategy, batch_size=batch_size)
+        with engine.begin() as conn:
+            conn.execute(text(merge_statement(engine.dialect, table_name, staging_name,
+                                              list(to_load.columns), key)))
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {quote(staging_name)}"))
+
+    # El cache solo se actualiza despues de confirmar la combinacion
+    save_hash_cache(cache_dir, table_name, hashes)
+    stats['seconds'] = time.perf_counter() - start
+    logging.info(
+        f"Tabla {table_name}: {stats['upserted']} filas combinadas y {stats['skipped']} "
+        f"sin cambios omitidas en {stats['seconds']:.3f}s"
+    )
+    return stats
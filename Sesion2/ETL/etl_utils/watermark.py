@@ -0,0 +1,207 @@
+"""
+Carga incremental basada en marcas de agua (high-water marks).
+
+Para cada tabla incremental se guarda el valor maximo de una columna creciente
+(por ejemplo order_id u order_date) que ya fue cargado. En la siguiente
+ejecucion solo se transforman y cargan las filas que superan ese valor.
+
+La marca de agua se lee de la base de datos destino (SELECT MAX(...)) o de un
+archivo de estado local en formato JSON, que se actualiza despues de cada carga.
+
+Las tablas sin una columna creciente (por ejemplo una dimension que se genera
+completa en cada ejecucion) se filtran por las llaves que ya estan en la tabla
+destino (read_loaded_keys y filter_loaded_keys).
+"""
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+_state_lock = threading.Lock()
+
+
+def _read_state(state_file):
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_state(state_file, state):
+    # Se escribe en un archivo temporal y se reemplaza, para que una interrupcion no deje el
+    # archivo de estado truncado
+    directory = os.path.dirname(state_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(tmp_file, state_file)
+
+
+def _latest(saved, value):
+    if saved is None:
+        return value
+    if isinstance(saved, str) or isinstance(value, str):
+        return value if pd.Timestamp(value) > pd.Timestamp(saved) else saved
+    return max(saved, value)
+
+
+def read_watermark_from_db(engine, table_name, column):
+    """
+    Obtiene el valor maximo de la columna en la tabla destino.
+
+    Returns:
+        Valor maximo cargado, o None si la tabla esta vacia.
+    """
+    # SQLAlchemy se importa solo al usar la base de datos (ver etl_utils/db.py)
+    from sqlalchemy import text
+
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT MAX({quote(column)}) FROM {quote(table_name)}")).scalar()
+
+
+def read_watermark_from_file(state_file, table_name, column):
+    """
+    Obtiene la marca de agua guardada en el archivo de estado local.
+
+    Returns:
+        Valor guardado, o None si no existe.
+    """
+    with _state_lock:
+        return _read_state(state_file).get(table_name, {}).get(column)
+
+
+def get_watermark(engine, table_name, column, state_file, source='db'):
+    """
+    Obtiene la marca de agua de una tabla. Con source='db' se consulta la base
+    de datos destino y, si la consulta falla (por ejemplo porque la tabla aun
+    no existe), se usa el archivo de estado.
+
+    Parameters:
+        engine (sqlalchemy.engine.Engine): Motor de la base de datos destino.
+        table_name (str): Tabla destino.
+        column (str): Columna creciente usada como marca de agua.
+        state_file (str): Ruta del archivo de estado JSON.
+        source (str): 'db' o 'file'.
+
+    Returns:
+        Valor de la marca de agua o None si la tabla nunca se cargo.
+    """
+    if source == 'db':
+        try:
+            watermark = read_watermark_from_db(engine, table_name, column)
+            logging.info(f"Marca de agua de {table_name}.{column} en base de datos: {watermark}")
+            return watermark
+        except Exception as e:
+            logging.warning(f"No se pudo leer la marca de agua de {table_name} en la base de datos: {e}")
+
+    watermark = read_watermark_from_file(state_file, table_name, column)
+    logging.info(f"Marca de agua de {table_name}.{column} en {state_file}: {watermark}")
+    return watermark
+
+
+def save_watermark(state_file, table_name, column, value):
+    """
+    Guarda la marca de agua de una tabla en el archivo de estado local. La
+    marca nunca retrocede: si el archivo ya tiene un valor mayor (por ejemplo
+    de un bloque anterior cuando la entrada no esta ordenada) se conserva.
+    """
+    if isinstance(value, pd.Timestamp):
+        value = value.isoformat()
+    elif hasattr(value, 'item'):
+        value = value.item()
+
+    with _state_lock:
+        state = _read_state(state_file)
+        columns = state.setdefault(table_name, {})
+        columns[column] = _latest(columns.get(column), value)
+        _write_state(state_file, state)
+
+
+def filter_new_rows(df, column, watermark):
+    """
+    Devuelve solo las filas cuyo valor en la columna supera la marca de agua.
+    Las columnas que no son numericas se comparan como fechas.
+
+    Returns:
+        pd.DataFrame: Filas nuevas.
+    """
+    if watermark is None:
+        return df
+    if pd.api.types.is_numeric_dtype(df[column]):
+        mask = df[column] > watermark
+    else:
+        mask = pd.to_datetime(df[column], errors='coerce') > pd.Timestamp(watermark)
+    return df[mask]
+
+
+def read_loaded_keys(engine, table_name, column):
+    """
+    Lee las llaves ya cargadas en la tabla destino.
+
+    Returns:
+        np.ndarray: Llaves de la tabla (vacio si la tabla aun no existe).
+    """
+    from sqlalchemy import inspect, text
+
+    if not inspect(engine).has_table(table_name):
+        return np.array([])
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.connect() as conn:
+        return np.array(conn.execute(text(f"SELECT {quote(column)} FROM {quote(table_name)}")).scalars().all())
+
+
+def filter_loaded_keys(df, column, loaded_keys):
+    """
+    Devuelve solo las filas cuya llave no esta en loaded_keys.
+
+    Returns:
+        pd.DataFrame: Filas que faltan en la tabla destino.
+    """
+    if not len(loaded_keys):
+        return df
+    return df[~df[column].isin(loaded_keys)]
+
+
+def max_value(df, column):
+    """
+    Calcula el nuevo valor de la marca de agua a partir de las filas cargadas.
+    """
+    if pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_datetime64_any_dtype(df[column]):
+        return df[column].max()
+    return pd.to_datetime(df[column], errors='coerce').max()
+
+
+def reset_tables(engine, tables, state_file):
+    """
+    Elimina todas las filas de las tablas indicadas en una sola transaccion, en
+    el orden recibido (las tablas hijas deben ir antes que las tablas padre), y
+    borra su marca de agua del archivo de estado para forzar una recarga
+    completa. Las tablas que todavia no existen se omiten.
+
+    Raises:
+        sqlalchemy.exc.SQLAlchemyError: Si alguna tabla no se puede vaciar; en
+            ese caso no se elimina ninguna fila ni se cambia el archivo de estado.
+    """
+    from sqlalchemy import inspect, text
+
+    quote = engine.dialect.identifier_preparer.quote
+    inspector = inspect(engine)
+    existing = [table_name for table_name in tables if inspector.has_table(table_name)]
+    with engine.begin() as conn:
+        for table_name in existing:
+            conn.execute(text(f"DELETE FROM {quote(table_name)}"))
+    for table_name in existing:
+        logging.info(f"Se eliminaron las filas de la tabla {table_name} para la recarga completa")
+
+    with _state_lock:
+        state = _read_state(state_file)
+        if state:
+            for table_name in tables:
+                state.pop(table_name, None)
+            _write_state(state_file, state)
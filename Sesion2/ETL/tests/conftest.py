@@ -0,0 +1,28 @@
+"""
+Fixtures compartidas de las pruebas de etl_utils.
+
+Las pruebas usan una base de datos SQLite en un directorio temporal, de modo
+que no requieren el servidor MySQL de docker-compose.
+
+Uso (desde Sesion2/ETL):
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def cache_config(tmp_path):
+    return {'enabled': True, 'dir': str(tmp_path / 'cache'), 'max_bytes': 64 * 1024 * 1024, 'stages': None}
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl_utils.aggregates import AggregateBuilder, merge_partitions
+
+KEYS = ['date_key', 'department_id']
+MEASURES = ['revenue', 'units']
+
+
+def sales(rows):
+    return pd.DataFrame(rows, columns=KEYS + MEASURES)
+
+
+def table(engine):
+    with engine.connect() as conn:
+        return pd.read_sql(text("SELECT * FROM daily_sales ORDER BY date_key, department_id"), conn)
+
+
+def write(engine, df, replace=False):
+    with engine.begin() as conn:
+        return merge_partitions(conn, 'daily_sales', df, 'date_key', KEYS, MEASURES, replace=replace)
+
+
+def test_builder_partials_and_lookups(tmp_path):
+    state_file = str(tmp_path / 'state' / 'aggregates.pkl')
+    builder = AggregateBuilder(state_file)
+    builder.register_lookup('products', 'product_id',
+                            pd.DataFrame({'product_id': [1, 2], 'department_id': [7, 8]}))
+    assert builder.lookup('products', 'department_id', [2, 1, 2]).tolist() == [8, 7, 8]
+    with pytest.raises(KeyError):
+        builder.lookup('products', 'department_id', [3])
+
+    builder.add('daily_sales', 0, sales([(20240101, 7, 10.0, 1)]))
+    builder.add('daily_sales', 1, sales([(20240101, 7, 5.0, 2)]))
+    # Un bloque que se vuelve a cargar reemplaza su suma parcial
+    builder.add('daily_sales', 1, sales([(20240101, 7, 6.0, 2)]))
+    result = builder.result('daily_sales', KEYS, MEASURES)
+    assert result[MEASURES].values.tolist() == [[16.0, 3]]
+
+    # Al reanudar se recuperan las sumas parciales; sin reanudar se descartan
+    assert AggregateBuilder(state_file, resume=True).result('daily_sales', KEYS, MEASURES).equals(result)
+    assert AggregateBuilder(state_file).result('daily_sales', KEYS, MEASURES) is None
+
+
+def test_merge_updates_only_new_partitions(engine):
+    write(engine, sales([(20240101, 7, 10.0, 1), (20240102, 7, 20.0, 2), (20240102, 8, 1.0, 1)]))
+    rows = write(engine, sales([(20240102, 7, 5.0, 1), (20240103, 8, 3.0, 3)]))
+    assert rows == 3
+    assert table(engine).values.tolist() == [
+        [20240101, 7, 10.0, 1],
+        [20240102, 7, 25.0, 3],
+        [20240102, 8, 1.0, 1],
+        [20240103, 8, 3.0, 3],
+    ]
+
+
+def test_merge_matches_full_recompute(engine):
+    first = sales([(20240101, 7, 10.0, 1), (20240102, 7, 20.0, 2)])
+    second = sales([(20240102, 7, 5.0, 1), (20240102, 8, 2.0, 2), (20240103, 8, 3.0, 3)])
+    write(engine, first)
+    write(engine, second)
+    merged = table(engine)
+
+    write(engine, pd.concat([first, second]).groupby(KEYS, as_index=False)[MEASURES].sum(), replace=True)
+    assert table(engine).equals(merged)
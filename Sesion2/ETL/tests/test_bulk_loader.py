@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from etl_utils import bulk_loader
+from etl_utils.bulk_loader import bulk_load, strategies_for
+
+
+def frame(rows=25):
+    return pd.DataFrame({
+        'id': range(rows),
+        'name': [f"fila {i}" for i in range(rows)],
+        'created': pd.date_range('2024-01-01', periods=rows, freq='h'),
+    })
+
+
+def count(engine, table_name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+
+def test_sqlite_uses_executemany_first(engine):
+    assert strategies_for(engine) == ['executemany', 'multi']
+    stats = bulk_load(engine, 'items', frame(), batch_size=10)
+    assert stats['strategy'] == 'executemany'
+    assert stats['rows'] == 25
+    assert count(engine, 'items') == 25
+
+
+def test_requested_strategy_goes_first(engine):
+    stats = bulk_load(engine, 'items', frame(), strategy='multi', batch_size=10)
+    assert stats['strategy'] == 'multi'
+    assert count(engine, 'items') == 25
+
+
+def test_falls_back_when_strategy_is_unavailable(engine, monkeypatch):
+    def unavailable(conn, table_name, df, batch_size):
+        bulk_loader.load_executemany(conn, table_name, df.head(5), batch_size)
+        raise NotImplementedError("estrategia no disponible")
+
+    monkeypatch.setitem(bulk_loader.STRATEGIES, 'executemany', unavailable)
+    stats = bulk_load(engine, 'items', frame())
+    # La transaccion de la estrategia no disponible se revierte: no quedan sus 5 filas
+    assert stats['strategy'] == 'multi'
+    assert count(engine, 'items') == 25
+
+
+def test_data_errors_are_not_retried(engine, monkeypatch):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, created TEXT)"))
+    bulk_load(engine, 'items', frame(5))
+    multi = []
+    monkeypatch.setitem(bulk_loader.STRATEGIES, 'multi', lambda *args: multi.append(args))
+    with pytest.raises(IntegrityError):
+        bulk_load(engine, 'items', frame())
+    assert multi == []
+    assert count(engine, 'items') == 5
+
+
+def test_fails_when_no_strategy_is_available(engine, monkeypatch):
+    def unavailable(conn, table_name, df, batch_size):
+        raise NotImplementedError("estrategia no disponible")
+
+    monkeypatch.setitem(bulk_loader.STRATEGIES, 'executemany', unavailable)
+    monkeypatch.setitem(bulk_loader.STRATEGIES, 'multi', unavailable)
+    with pytest.raises(RuntimeError, match="No se pudo cargar la tabla items"):
+        bulk_load(engine, 'items', frame())
+
+
+def test_prepare_rows_writes_booleans_as_integers():
+    rows = bulk_loader._prepare_rows(pd.DataFrame({'is_weekend': [True, False],
+                                                   'flag': pd.array([True, None], dtype='boolean')}))
+    assert rows.values.tolist() == [[1, 1], [0, None]]
+
+
+def test_infile_fields_are_enclosed_and_escaped():
+    rows = bulk_loader._prepare_rows(pd.DataFrame({
+        'id': [1, 2, 3],
+        'description': ['Caja | 12" \\ azul', 'linea 1\nlinea 2', None],
+    }))
+    assert bulk_loader._infile_column(rows['id']).tolist() == ['1', '2', '3']
+    assert bulk_loader._infile_column(rows['description']).tolist() == [
+        '"Caja | 12\\" \\\\ azul"', '"linea 1\\nlinea 2"', '\\N']
+
+
+def test_unknown_strategy(engine):
+    with pytest.raises(ValueError, match="Estrategia de carga desconocida"):
+        bulk_load(engine, 'items', frame(), strategy='copy')
+
+
+def test_load_data_infile_is_mysql_only(engine):
+    with engine.begin() as conn, pytest.raises(NotImplementedError):
+        bulk_loader.load_data_infile(conn, 'items', frame(), 10)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl_utils.key_index import KeyIndex, KeyIndexRegistry
+
+
+def test_contains():
+    index = KeyIndex([5, 1, 3, 3])
+    assert len(index) == 3
+    assert index.contains(np.array([0, 1, 3, 4, 5, 6])).tolist() == [False, True, True, False, True, False]
+    assert KeyIndex([]).contains(np.array([1, 2])).tolist() == [False, False]
+
+
+def test_check_reports_rows_and_counts():
+    registry = KeyIndexRegistry()
+    registry.register('customers', 'customer_id', [1, 2, 3])
+    registry.register('products', 'product_id', [10, 20])
+    df = pd.DataFrame({'customer_id': [1, 4, 2, 5], 'product_id': [10, 10, 30, 20]})
+    report = registry.check(df, {'customer_id': ('customers', 'customer_id'),
+                                 'product_id': ('products', 'product_id')})
+    assert report['rows'].tolist() == [1, 2, 3]
+    assert report['counts'] == {'customer_id': 2, 'product_id': 1}
+
+
+def test_discard_before_and_after_register():
+    registry = KeyIndexRegistry()
+    registry.discard('orders', 'order_id', [2])
+    registry.register('orders', 'order_id', [1, 2, 3, 4])
+    assert registry.get('orders', 'order_id').keys.tolist() == [1, 3, 4]
+    registry.discard('orders', 'order_id', [4])
+    assert registry.get('orders', 'order_id').keys.tolist() == [1, 3]
+
+
+def test_unregistered_table():
+    with pytest.raises(KeyError):
+        KeyIndexRegistry().get('orders', 'order_id')
+
+
+def test_mark_seen_accumulates_per_table_and_columns():
+    registry = KeyIndexRegistry()
+    assert registry.mark_seen('orders', ['order_id'], [1, 2]).tolist() == [False, False]
+    assert registry.mark_seen('orders', ['order_id'], [3, 2]).tolist() == [False, True]
+    assert registry.mark_seen('orders', ['order_id'], [1, 3]).tolist() == [True, True]
+    assert registry.mark_seen('customers', ['order_id'], [1]).tolist() == [False]
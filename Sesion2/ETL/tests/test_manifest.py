@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl_utils.manifest import RunManifest, delete_key_range, delete_keys, delete_unrecorded
+
+OPTIONS = {'streaming': True, 'chunksize': {'orders': 3}}
+
+
+def load_orders(engine, keys):
+    pd.DataFrame({'order_id': keys}).to_sql('orders', engine, index=False, if_exists='append')
+
+
+def order_ids(engine):
+    with engine.connect() as conn:
+        return sorted(conn.execute(text("SELECT order_id FROM orders")).scalars().all())
+
+
+def test_resume_keeps_completed_tables_and_chunks(tmp_path):
+    path = str(tmp_path / 'state' / 'run_manifest.json')
+    manifest = RunManifest(path, OPTIONS)
+    manifest.complete_table('customers')
+    manifest.record_chunk('orders', 0, 3, first_key=np.int64(1), last_key=np.int64(3))
+
+    resumed = RunManifest(path, OPTIONS, resume=True)
+    assert resumed.resuming
+    assert resumed.data['attempts'] == 2
+    assert resumed.table_completed('customers')
+    assert not resumed.table_completed('orders')
+    assert resumed.chunk_completed('orders', 0)
+    assert not resumed.chunk_completed('orders', 1)
+    # La limpieza del primer bloque pendiente se pide una sola vez por tabla
+    assert resumed.needs_cleanup('orders')
+    assert not resumed.needs_cleanup('orders')
+
+
+def test_completed_run_is_not_resumed(tmp_path):
+    path = str(tmp_path / 'run_manifest.json')
+    manifest = RunManifest(path, OPTIONS)
+    manifest.complete_table('customers')
+    manifest.complete()
+    resumed = RunManifest(path, OPTIONS, resume=True)
+    assert not resumed.resuming
+    assert not resumed.table_completed('customers')
+    assert not resumed.needs_cleanup('customers')
+
+
+def test_resume_with_other_options_fails(tmp_path):
+    path = str(tmp_path / 'run_manifest.json')
+    RunManifest(path, OPTIONS)
+    with pytest.raises(ValueError, match="otras opciones"):
+        RunManifest(path, {**OPTIONS, 'streaming': False}, resume=True)
+
+
+def test_remember_reuses_values_of_failed_run(tmp_path):
+    path = str(tmp_path / 'run_manifest.json')
+    RunManifest(path, OPTIONS).remember('watermarks', lambda: {'orders': np.int64(10)})
+    resumed = RunManifest(path, OPTIONS, resume=True)
+    assert resumed.remember('watermarks', lambda: {'orders': 20}) == {'orders': 10}
+
+
+def test_delete_keys(engine):
+    load_orders(engine, [1, 2, 3, 4, 5])
+    assert delete_keys(engine, 'orders', 'order_id', np.array([2, 4, 4, 9]), batch_size=1) == 2
+    assert order_ids(engine) == [1, 3, 5]
+    assert delete_keys(engine, 'missing', 'order_id', np.array([1])) == 0
+    assert delete_keys(engine, 'orders', 'order_id', np.array([], dtype=int)) == 0
+
+
+def test_delete_key_range(engine):
+    load_orders(engine, [1, 2, 3, 4, 5])
+    assert delete_key_range(engine, 'orders', 'order_id', np.int64(2), np.int64(4)) == 3
+    assert order_ids(engine) == [1, 5]
+
+
+def test_delete_unrecorded_keeps_recorded_chunks(engine, tmp_path):
+    manifest = RunManifest(str(tmp_path / 'run_manifest.json'), OPTIONS)
+    manifest.record_chunk('orders', 0, 3, first_key=1, last_key=3)
+    load_orders(engine, [1, 2, 3, 4, 5, 6, 7])
+
+    # Bloque sin cruce con los confirmados: un solo DELETE por rango
+    assert delete_unrecorded(engine, manifest, 'orders', 'order_id', np.array([6, 4, 5])) == 3
+    assert order_ids(engine) == [1, 2, 3, 7]
+
+    # Bloque de un archivo desordenado cuyo rango cubre el bloque 0: solo sus llaves
+    assert delete_unrecorded(engine, manifest, 'orders', 'order_id', np.array([7, 0])) == 1
+    assert order_ids(engine) == [1, 2, 3]
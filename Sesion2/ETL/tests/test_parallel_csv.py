@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from etl_utils.parallel_csv import read_csv_parallel, split_ranges
+
+OPTIONS = {
+    'sep': '|',
+    'header': None,
+    'names': ['order_id', 'order_date', 'order_customer_id', 'order_status'],
+    'dtype': {'order_id': 'int32', 'order_customer_id': 'int32', 'order_status': 'category'},
+}
+
+
+def write_orders(path, rows=5000):
+    rng = np.random.default_rng(0)
+    statuses = np.array(['CLOSED', 'PENDING', 'COMPLETE', 'ON_HOLD'])
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(rows):
+            f.write(f"{i}|2024-01-{i % 28 + 1:02d} 00:00:00|{rng.integers(1, 500)}|{statuses[i % 4]}\n")
+
+
+def test_ranges_cover_whole_lines(tmp_path):
+    path = tmp_path / 'orders.psv'
+    write_orders(path, 100)
+    ranges = split_ranges(str(path), 4)
+    data = path.read_bytes()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[end - 1:end] == b'\n'
+
+
+def test_parallel_read_equals_serial_read(tmp_path):
+    path = str(tmp_path / 'orders.psv')
+    write_orders(path)
+    serial = pd.read_csv(path, **OPTIONS)
+    parallel = read_csv_parallel(path, OPTIONS, workers=3, min_bytes=0)
+    pd.testing.assert_frame_equal(parallel, serial, check_categorical=False)
+    assert isinstance(parallel['order_status'].dtype, pd.CategoricalDtype)
+
+
+def test_small_files_are_read_serially(tmp_path):
+    path = str(tmp_path / 'orders.psv')
+    write_orders(path, 10)
+    pd.testing.assert_frame_equal(read_csv_parallel(path, OPTIONS, workers=3), pd.read_csv(path, **OPTIONS))
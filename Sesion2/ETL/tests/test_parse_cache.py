@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from etl_utils.parse_cache import clear_cache, evict, read_with_cache
+
+
+def counting(function):
+    calls = []
+
+    def wrapper():
+        calls.append(1)
+        return function()
+    return wrapper, calls
+
+
+def test_parse_cache_hit_and_invalidation(tmp_path, cache_config):
+    path = tmp_path / 'departments.psv'
+    path.write_text("2|Fitness\n3|Footwear\n", encoding='utf-8')
+    options = {'sep': '|', 'header': None, 'names': ['department_id', 'department_name']}
+    parse, calls = counting(lambda: pd.read_csv(path, **options))
+
+    first = read_with_cache(str(path), parse, options, cache_config)
+    second = read_with_cache(str(path), parse, options, cache_config)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    # Otros parametros de lectura u otro contenido invalidan la entrada
+    read_with_cache(str(path), parse, {**options, 'sep': ','}, cache_config)
+    assert len(calls) == 2
+    path.write_text("2|Fitness\n3|Footwear\n4|Apparel\n", encoding='utf-8')
+    assert len(read_with_cache(str(path), parse, options, cache_config)) == 3
+    assert len(calls) == 3
+
+    read_with_cache(str(path), parse, options, {**cache_config, 'enabled': False})
+    assert len(calls) == 4
+
+
+def test_evict_and_clear(tmp_path, cache_config):
+    path = tmp_path / 'data.psv'
+    for i in range(3):
+        path.write_text(f"{i}|{'x' * 1000}\n", encoding='utf-8')
+        read_with_cache(str(path), lambda: pd.read_csv(path, sep='|', header=None), {}, cache_config)
+    assert len(os.listdir(cache_config['dir'])) == 3
+    evict(cache_config['dir'], 0)
+    assert os.listdir(cache_config['dir']) == []
+    clear_cache(cache_config['dir'])
+    assert not os.path.exists(cache_config['dir'])
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from etl_utils import quality
+from etl_utils.key_index import KeyIndexRegistry
+
+
+def orders():
+    return pd.DataFrame({
+        'order_id': [1, 2, 3, 4, 5],
+        'order_customer_id': [10, 11, 99, 10, 11],
+        'order_status': ['CLOSED', None, 'PENDING', 'CLOSED', 'COMPLETE'],
+        'amount': [5.0, 20.0, 7.5, -1.0, 3.0],
+    })
+
+
+def registry():
+    key_indexes = KeyIndexRegistry()
+    key_indexes.register('customers', 'customer_id', [10, 11])
+    return key_indexes
+
+
+def test_fail_rule_raises_with_full_report():
+    rules = [
+        {'rule': 'not_null', 'columns': ['order_status'], 'severity': 'fail'},
+        {'rule': 'foreign_key', 'column': 'order_customer_id', 'references': ('customers', 'customer_id'),
+         'severity': 'warn'},
+    ]
+    with pytest.raises(quality.DataQualityError) as error:
+        quality.check(orders(), 'orders', rules, registry())
+    violations = error.value.report['violations']
+    # Se reportan todas las reglas, no solo la primera que falla
+    assert violations['not_null(order_status)']['count'] == 1
+    assert violations['foreign_key(order_customer_id)']['count'] == 1
+
+
+def test_warn_rule_keeps_rows():
+    rules = [{'rule': 'range', 'column': 'amount', 'min': 0, 'severity': 'warn'}]
+    df, report = quality.check(orders(), 'orders', rules)
+    assert len(df) == 5
+    assert report['violations']['range(amount)']['sample'][0]['order_id'] == 4
+
+
+def test_quarantine_rows_are_removed_and_saved(tmp_path):
+    rules = [
+        {'rule': 'foreign_key', 'column': 'order_customer_id', 'references': ('customers', 'customer_id'),
+         'severity': 'quarantine'},
+        {'rule': 'expression', 'expression': 'amount >= 0', 'name': 'amount_positive', 'severity': 'quarantine'},
+    ]
+    df, report = quality.check(orders(), 'orders', rules, registry(), str(tmp_path))
+    assert df['order_id'].tolist() == [1, 2, 5]
+    assert report['quarantined']['order_id'].tolist() == [3, 4]
+    saved = pd.read_csv(tmp_path / 'orders.csv')
+    assert saved['order_id'].tolist() == [3, 4]
+    assert saved['failed_rules'].tolist() == ['foreign_key(order_customer_id)', 'amount_positive']
+
+
+def test_unknown_rule_and_severity():
+    with pytest.raises(ValueError, match="Regla desconocida"):
+        quality.check(orders(), 'orders', [{'rule': 'regex', 'column': 'order_status'}])
+    with pytest.raises(ValueError, match="Severidad desconocida"):
+        quality.check(orders(), 'orders', [{'rule': 'unique', 'columns': ['order_id'], 'severity': 'ignore'}])
+
+
+def test_unique_rule_across_chunks():
+    rules = [{'rule': 'unique', 'columns': ['order_id'], 'severity': 'fail'}]
+    key_indexes = KeyIndexRegistry()
+    quality.check(orders().iloc[:3], 'orders', rules, key_indexes)
+    # El order_id 2 ya aparecio en el bloque anterior
+    with pytest.raises(quality.DataQualityError) as error:
+        quality.check(pd.DataFrame({'order_id': [2, 6]}), 'orders', rules, key_indexes)
+    assert error.value.report['violations']['unique(order_id)']['sample'] == [{'order_id': 2}]
+    # Otra tabla con la misma columna no comparte los valores vistos
+    quality.check(pd.DataFrame({'order_id': [1, 2]}), 'order_items', rules, key_indexes)
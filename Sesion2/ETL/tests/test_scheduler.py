@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from etl_utils.scheduler import critical_path, run_dependency_graph
+
+DEPENDENCIES = {
+    'categories': ['departments'],
+    'products': ['categories'],
+    'orders': ['customers'],
+    'order_items': ['orders', 'products'],
+}
+TABLES = ['departments', 'categories', 'products', 'customers', 'orders', 'order_items']
+
+
+def recording_tasks(order, fail=None):
+    lock = threading.Lock()
+
+    def task(name):
+        def run():
+            if name == fail:
+                raise ValueError(f"fallo en {name}")
+            with lock:
+                order.append(name)
+        return run
+
+    return {name: task(name) for name in TABLES}
+
+
+def test_parents_run_before_children():
+    order = []
+    timeline = run_dependency_graph(recording_tasks(order), DEPENDENCIES, max_workers=3)
+    assert sorted(order) == sorted(TABLES)
+    for child, parents in DEPENDENCIES.items():
+        for parent in parents:
+            assert order.index(parent) < order.index(child)
+            assert timeline[parent]['finish'] <= timeline[child]['start']
+    assert critical_path(timeline, DEPENDENCIES)[-1] == 'order_items'
+
+
+def test_task_error_propagates_and_skips_dependents():
+    order = []
+    with pytest.raises(ValueError, match="fallo en orders"):
+        run_dependency_graph(recording_tasks(order, fail='orders'), DEPENDENCIES, max_workers=1)
+    assert 'orders' not in order
+    assert 'order_items' not in order
+
+
+def test_invalid_graphs():
+    tasks = {'a': lambda: None, 'b': lambda: None}
+    with pytest.raises(ValueError, match="no existe"):
+        run_dependency_graph(tasks, {'a': ['c']})
+    with pytest.raises(ValueError, match="Ciclo"):
+        run_dependency_graph(tasks, {'a': ['b'], 'b': ['a']})
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from etl_utils import stage_cache
+
+
+def counting(function):
+    calls = []
+
+    def wrapper():
+        calls.append(1)
+        return function()
+    return wrapper, calls
+
+
+def test_stage_cache_invalidation(cache_config):
+    df = pd.DataFrame({'customer_id': [1, 2], 'customer_email': ['A@X.COM', 'B@X.COM']})
+
+    def transform(df):
+        return df.assign(customer_email=df['customer_email'].str.lower())
+
+    def run(df, config, code=(transform,)):
+        compute, calls = counting(lambda: transform(df))
+        result = stage_cache.memoize('transform_customers', compute, {'df': df}, list(code), config, cache_config)
+        return result, len(calls)
+
+    result, calls = run(df, {'rules': ['unique']})
+    assert calls == 1
+    assert result['customer_email'].tolist() == ['a@x.com', 'b@x.com']
+    assert run(df, {'rules': ['unique']})[1] == 0
+
+    # Cambian las entradas, la configuracion o el codigo de la etapa
+    assert run(df.assign(customer_id=[1, 3]), {'rules': ['unique']})[1] == 1
+    assert run(df, {'rules': ['unique', 'not_null']})[1] == 1
+
+    def transform_v2(df):
+        return df
+    assert run(df, {'rules': ['unique']}, (transform, transform_v2))[1] == 1
+
+
+def test_fingerprint_depends_on_content_and_dtype():
+    values = np.array([1, 2, 3])
+    assert stage_cache.fingerprint(values) == stage_cache.fingerprint(values.copy())
+    assert stage_cache.fingerprint(values) != stage_cache.fingerprint(values.astype('int32'))
+    df = pd.DataFrame({'a': [1, 2]})
+    assert stage_cache.fingerprint(df) != stage_cache.fingerprint(df.astype('float64'))
+
+
+def test_only_listed_stages_are_memoized(cache_config):
+    cache_config['stages'] = {'transform_orders'}
+    df = pd.DataFrame({'order_id': [1, 2]})
+    for stage, expected in [('transform_orders', [1, 0]), ('transform_customers', [1, 1])]:
+        runs = []
+        for _ in range(2):
+            compute, calls = counting(lambda: df)
+            stage_cache.memoize(stage, compute, {'df': df}, [], {}, cache_config)
+            runs.append(len(calls))
+        assert runs == expected
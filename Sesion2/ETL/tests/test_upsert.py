@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl_utils.upsert import upsert
+
+
+def customers(names):
+    return pd.DataFrame({'customer_id': range(1, len(names) + 1), 'name': names})
+
+
+def rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT customer_id, name FROM customers ORDER BY customer_id")).all()
+
+
+def test_insert_skip_and_update(engine, tmp_path):
+    cache_dir = str(tmp_path / 'upsert')
+    stats = upsert(engine, 'customers', customers(['ana', 'beto', 'caro']), 'customer_id', cache_dir)
+    assert (stats['upserted'], stats['skipped']) == (3, 0)
+
+    # Sin cambios no se envia ninguna fila
+    stats = upsert(engine, 'customers', customers(['ana', 'beto', 'caro']), 'customer_id', cache_dir)
+    assert (stats['upserted'], stats['skipped']) == (0, 3)
+
+    # Solo la fila modificada y la nueva
+    stats = upsert(engine, 'customers', customers(['ana', 'BETO', 'caro', 'dani']), 'customer_id', cache_dir)
+    assert (stats['upserted'], stats['skipped']) == (2, 2)
+    assert rows(engine) == [(1, 'ana'), (2, 'BETO'), (3, 'caro'), (4, 'dani')]
+
+
+def test_cache_is_discarded_when_table_was_emptied(engine, tmp_path):
+    cache_dir = str(tmp_path / 'upsert')
+    upsert(engine, 'customers', customers(['ana', 'beto']), 'customer_id', cache_dir)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM customers"))
+    stats = upsert(engine, 'customers', customers(['ana', 'beto']), 'customer_id', cache_dir)
+    assert stats['upserted'] == 2
+    assert rows(engine) == [(1, 'ana'), (2, 'beto')]
+
+
+def test_creates_unique_index_on_existing_table(engine, tmp_path):
+    customers(['ana', 'beto']).to_sql('customers', engine, index=False)
+    upsert(engine, 'customers', customers(['ANA', 'beto', 'caro']), 'customer_id', str(tmp_path / 'upsert'))
+    assert rows(engine) == [(1, 'ANA'), (2, 'beto'), (3, 'caro')]
+
+
+def test_duplicated_keys_in_existing_table(engine, tmp_path):
+    pd.concat([customers(['ana']), customers(['ana'])]).to_sql('customers', engine, index=False)
+    with pytest.raises(ValueError, match="no tiene una llave unica en customer_id"):
+        upsert(engine, 'customers', customers(['ANA']), 'customer_id', str(tmp_path / 'upsert'))
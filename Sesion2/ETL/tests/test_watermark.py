@@ -0,0 +1,87 @@
+import json
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from etl_utils.watermark import (filter_loaded_keys, filter_new_rows, get_watermark, max_value,
+                                 read_loaded_keys, reset_tables, save_watermark)
+
+
+def orders():
+    return pd.DataFrame({
+        'order_id': [1, 2, 3, 4],
+        'order_date': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04']),
+    })
+
+
+def test_filter_new_rows_numeric_and_dates():
+    df = orders()
+    assert filter_new_rows(df, 'order_id', 2)['order_id'].tolist() == [3, 4]
+    assert filter_new_rows(df, 'order_date', '2024-01-03')['order_id'].tolist() == [4]
+    assert filter_new_rows(df, 'order_id', None) is df
+    # Fechas guardadas como texto
+    text_dates = df.assign(order_date=df['order_date'].dt.strftime('%Y-%m-%d'))
+    assert filter_new_rows(text_dates, 'order_date', '2024-01-02')['order_id'].tolist() == [3, 4]
+    assert max_value(text_dates, 'order_date') == pd.Timestamp('2024-01-04')
+
+
+def test_watermark_from_db_and_file(engine, tmp_path):
+    state_file = str(tmp_path / 'state' / 'watermarks.json')
+    assert get_watermark(engine, 'orders', 'order_id', state_file) is None
+    orders().to_sql('orders', engine, index=False)
+    assert get_watermark(engine, 'orders', 'order_id', state_file) == 4
+
+    save_watermark(state_file, 'orders', 'order_id', 3)
+    assert get_watermark(engine, 'orders', 'order_id', state_file, source='file') == 3
+
+
+def test_loaded_keys(engine):
+    df = orders()
+    assert len(read_loaded_keys(engine, 'orders', 'order_id')) == 0
+    df.iloc[:2].to_sql('orders', engine, index=False)
+    loaded = read_loaded_keys(engine, 'orders', 'order_id')
+    assert sorted(loaded.tolist()) == [1, 2]
+    assert filter_loaded_keys(df, 'order_id', loaded)['order_id'].tolist() == [3, 4]
+
+
+def test_reset_tables(engine, tmp_path):
+    state_file = str(tmp_path / 'watermarks.json')
+    save_watermark(state_file, 'orders', 'order_id', 4)
+    save_watermark(state_file, 'customers', 'customer_id', 9)
+    orders().to_sql('orders', engine, index=False)
+
+    # Las tablas que no existen se omiten
+    reset_tables(engine, ['order_items', 'orders'], state_file)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM orders")).scalar() == 0
+    with open(state_file, encoding='utf-8') as f:
+        assert list(json.load(f)) == ['customers']
+
+
+def test_reset_tables_failure_keeps_rows_and_state(engine, tmp_path):
+    state_file = str(tmp_path / 'watermarks.json')
+    save_watermark(state_file, 'orders', 'order_id', 4)
+    orders().to_sql('orders', engine, index=False)
+    pd.DataFrame({'id': [1]}).to_sql('locked', engine, index=False)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TRIGGER keep BEFORE DELETE ON locked BEGIN SELECT RAISE(ABORT, 'no'); END"))
+
+    with pytest.raises(Exception):
+        reset_tables(engine, ['orders', 'locked'], state_file)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM orders")).scalar() == 4
+    with open(state_file, encoding='utf-8') as f:
+        assert 'orders' in json.load(f)
+
+
+def test_saved_watermark_never_moves_backwards(tmp_path):
+    state_file = str(tmp_path / 'watermarks.json')
+    # Bloques de una entrada desordenada
+    for order_id in [5, 3, 7, 6]:
+        save_watermark(state_file, 'orders', 'order_id', order_id)
+    for order_date in ['2024-01-03', '2024-01-01']:
+        save_watermark(state_file, 'orders', 'order_date', pd.Timestamp(order_date))
+    with open(state_file, encoding='utf-8') as f:
+        assert json.load(f) == {'orders': {'order_id': 7, 'order_date': '2024-01-03T00:00:00'}}
+    assert not (tmp_path / 'watermarks.json.tmp').exists()
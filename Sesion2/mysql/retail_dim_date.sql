@@ -0,0 +1,20 @@
+#usamos la base de datos de retail (creada por retail_db.sql)
+USE retail_db;
+
+
+/*creamos la dimension de fechas que genera el pipeline de retail*/
+CREATE TABLE dimDate (
+	date_key INTEGER PRIMARY KEY,
+    date DATE,
+    year SMALLINT,
+    quarter TINYINT,
+    month TINYINT,
+    day TINYINT,
+    weekday TINYINT,
+    is_weekend BOOLEAN
+);
+
+
+/*llave entera (AAAAMMDD) de la fecha de cada orden*/
+ALTER TABLE orders ADD COLUMN order_date_key INTEGER;
+ALTER TABLE orders ADD CONSTRAINT fk_order_date_key FOREIGN KEY (order_date_key) REFERENCES dimDate (date_key);
@@ -0,0 +1,26 @@
+#usamos la base de datos de retail (creada por retail_db.sql)
+USE retail_db;
+
+
+/*ventas por dia, departamento, categoria y estado de la orden, calculadas por el pipeline de retail*/
+CREATE TABLE agg_daily_revenue (
+	date_key INTEGER NOT NULL,
+    department_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    order_status VARCHAR(45) NOT NULL,
+    revenue DOUBLE,
+    quantity BIGINT,
+    items BIGINT,
+    PRIMARY KEY (date_key, department_id, category_id, order_status),
+    CONSTRAINT fk_agg_revenue_date_key FOREIGN KEY (date_key) REFERENCES dimDate (date_key)
+);
+
+
+/*ordenes por dia y estado*/
+CREATE TABLE agg_daily_orders (
+	date_key INTEGER NOT NULL,
+    order_status VARCHAR(45) NOT NULL,
+    orders BIGINT,
+    PRIMARY KEY (date_key, order_status),
+    CONSTRAINT fk_agg_orders_date_key FOREIGN KEY (date_key) REFERENCES dimDate (date_key)
+);